@@ -6,22 +6,7 @@ settings = Settings()
 import openai
 openai.api_key = settings.OPENAI_API_KEY
 
-# Initialize database connection (load connection string from environment variable)
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.ext.declarative import declarative_base
-
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# Database session factory (for dependency injection)
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# The database engine, session factories and get_db live in core/db/config.py
 
 # Set up FastAPI app (import from main.py)
 from fastapi import FastAPI
@@ -1,28 +1,163 @@
-from pydantic import BaseSettings
+from pydantic import BaseModel, BaseSettings
 import os
-from typing import List
+from typing import Dict, List, Optional
 from functools import lru_cache
 
+class ModelConfig(BaseModel):
+    name: str
+    # Admission control: completions running at once, requests allowed to wait for a slot,
+    # and how long (seconds) a request may wait before it is rejected with 429
+    max_concurrency: int = 8
+    max_queue: int = 32
+    queue_timeout: float = 10.0
+
 class Settings(BaseSettings):
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Emails of the users allowed to call the /admin endpoints (none by default)
+    ADMIN_EMAILS: List[str] = []
     
+    # Completion backend: "openai", or "fake" for a deterministic local backend used in load tests
+    LLM_BACKEND: str = "openai"
+
+    # Fake backend: canned response (generated from the prompt when unset), mean latency and its
+    # distribution (constant, uniform, exponential or lognormal), error rate and token throughput
+    FAKE_BACKEND_RESPONSE: Optional[str] = None
+    FAKE_BACKEND_LATENCY_MS: float = 200.0
+    FAKE_BACKEND_LATENCY_DISTRIBUTION: str = "constant"
+    FAKE_BACKEND_ERROR_RATE: float = 0.0
+    FAKE_BACKEND_TOKENS_PER_SECOND: float = 0.0
+    FAKE_BACKEND_COMPLETION_TOKENS: int = 64
+    FAKE_BACKEND_SEED: int = 0
+
+    # OpenAI client settings (one pooled HTTP connection shared by all requests)
+    OPENAI_BASE_URL: Optional[str] = os.getenv("OPENAI_BASE_URL")
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    # Retries are handled by the resilience layer (LLM_* settings below)
+    OPENAI_MAX_RETRIES: int = 0
+
+    # Resilience settings for completion calls: retries with jittered exponential backoff,
+    # a per-attempt timeout, and optional hedging once an attempt passes a latency percentile
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BACKOFF_BASE: float = 0.25
+    LLM_RETRY_BACKOFF_MAX: float = 4.0
+    LLM_ATTEMPT_TIMEOUT: float = 30.0
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+
+    # Circuit breaker per model: consecutive failures that open the circuit, seconds before a
+    # half-open probe, and probe calls allowed at once
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_RECOVERY_TIMEOUT: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS: int = 1
+
+    # Batch query settings
+    QUERY_BATCH_MAX_SIZE: int = 100
+    QUERY_BATCH_CONCURRENCY: int = 8
+
+    # Micro-batching: pack concurrent prompts for the same model and params into one call
+    MICRO_BATCH_ENABLED: bool = False
+    MICRO_BATCH_MAX_SIZE: int = 16
+    MICRO_BATCH_MAX_WAIT_MS: float = 10.0
+
+    # Connection pool of every database engine (see core/db/config.py); recycle is in seconds
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+
+    # Optional read replica: read-only handlers use it, except for users who wrote in the last
+    # READ_YOUR_WRITES_SECONDS (0 sends every read to the replica)
+    DATABASE_REPLICA_URL: Optional[str] = None
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # Write-behind persistence: query responses are queued and inserted in batches off the request path
+    WRITE_BEHIND_ENABLED: bool = False
+    WRITE_BEHIND_BATCH_SIZE: int = 100
+    WRITE_BEHIND_FLUSH_INTERVAL_MS: float = 50.0
+    WRITE_BEHIND_MAX_QUEUE: int = 10000
+    # Rows that fail on their own, while the rest of their batch inserts, in this many flushes, or are
+    # still queued when shutdown gives up draining, are appended to this NDJSON file instead of being lost
+    WRITE_BEHIND_MAX_ATTEMPTS: int = 5
+    WRITE_BEHIND_DEAD_LETTER_PATH: str = "write_behind_dead_letter.ndjson"
+    ID_WORKER_ID: Optional[int] = None # Required with WRITE_BEHIND_ENABLED; otherwise derived from the host name and process ID
+
+    # Keyset pagination of listing endpoints: page size when `limit` is omitted, and its maximum
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 500
+
+    # Characters of the response returned as `response_preview` by `view=summary` listings
+    SUMMARY_PREVIEW_CHARS: int = 200
+
+    # Reuse a stored answer to the same (model, prompt, params) before calling the model, if it was
+    # stored at most PROMPT_HASH_MAX_AGE seconds ago (0 reuses answers of any age)
+    PROMPT_HASH_LOOKUP_ENABLED: bool = True
+    PROMPT_HASH_MAX_AGE: float = 86400.0
+
+    # Compression of stored response bodies: "none", "zlib" or "zstd" (needs the zstandard package).
+    # Turning it on requires converting the column first with scripts/compress_responses.py.
+    RESPONSE_COMPRESSION: str = "none"
+    RESPONSE_COMPRESSION_LEVEL: int = 6
+    RESPONSE_COMPRESSION_DICT_PATH: Optional[str] = None # zstd dictionary from `compress_responses.py train`
+    RESPONSE_COMPRESSION_MIN_BYTES: int = 64
+
+    # Deduplicated response bodies: a body no query response points at any more is deleted by the
+    # retention job once it has not been stored or reused for this long
+    RESPONSE_BODY_GC_GRACE_SECONDS: float = 3600.0
+
+    # Full-text search: text search configuration used by the PostgreSQL index
+    SEARCH_LANGUAGE: str = "english"
+
+    # Streaming exports: rows fetched from the server-side cursor at a time
+    EXPORT_BATCH_SIZE: int = 1000
+
+    # Retention of query responses: rows older than RETENTION_DAYS are deleted (0 keeps them forever).
+    # RETENTION_USER_DAYS overrides it per user ID, e.g. {"42": 365}; 0 keeps that user's rows forever.
+    RETENTION_DAYS: int = 0
+    RETENTION_USER_DAYS: Dict[int, int] = {}
+    # Background pruning job: runs every RETENTION_INTERVAL_SECONDS when enabled, deleting at most
+    # RETENTION_BATCH_SIZE rows per transaction and pausing between batches
+    RETENTION_ENABLED: bool = False
+    RETENTION_INTERVAL_SECONDS: float = 3600.0
+    RETENTION_BATCH_SIZE: int = 500
+    RETENTION_BATCH_PAUSE_MS: float = 50.0
+    # Pruned rows are appended to gzip-compressed NDJSON files in this directory first (unset: not archived)
+    RETENTION_ARCHIVE_DIR: Optional[str] = None
+
     #  Cache Settings
     CACHE_TTL: int = 60 * 5 # 5 minutes
     CACHE_SIZE: int = 100
 
+    # Principal cache: users behind JWT subjects, so authenticated requests skip the users lookup.
+    # Entries are dropped when the user is changed or deleted in this process; the TTL bounds
+    # how long other processes may see the old user. A size of 0 disables it.
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: float = 60.0
+
     # OpenAI model configurations (you can add more models here)
-    OPENAI_MODELS: List[str] = [
-        "text-davinci-003",
-        "text-curie-001",
+    OPENAI_MODELS: List[ModelConfig] = [
+        ModelConfig(name="text-davinci-003"),
+        ModelConfig(name="text-curie-001"),
     ]
 
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
 
+    def get_model_config(self, name: str) -> ModelConfig:
+        for model_config in self.OPENAI_MODELS:
+            if model_config.name == name:
+                return model_config
+        return ModelConfig(name=name)
+
 @lru_cache(maxsize=Settings().CACHE_SIZE)
 def get_settings():
     return Settings()
\ No newline at end of file
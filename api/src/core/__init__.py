@@ -1,8 +1,10 @@
 from fastapi import FastAPI
 
+from .admin import admin_router
 from .auth import auth_router
 from .db import db_router
 from .query import query_router
+from .usage import usage_router
 
 def get_core_app():
     """Initialize the core application."""
@@ -11,6 +13,8 @@ def get_core_app():
     app.include_router(auth_router)
     app.include_router(db_router)
     app.include_router(query_router)
+    app.include_router(usage_router)
+    app.include_router(admin_router)
 
     return app
 
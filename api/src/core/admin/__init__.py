@@ -0,0 +1,155 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+
+from ..query.services.query_service import admission, circuit_breakers, in_flight, micro_batcher, response_cache
+from ..utils.openai_utils import resilience
+from ..db.utils.write_behind import write_behind
+from ..db.utils.retention import response_archive, retention
+from ..db.config import get_pool_stats
+from ..auth.utils.principal_cache import principal_cache
+from ..auth.services.auth_service import get_admin_user
+
+# Every endpoint exposes other users' data or changes shared state, so all require an administrator.
+admin_router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_admin_user)])
+
+@admin_router.get("/cache")
+async def get_cache():
+    """Reports response cache counters and the live entries.
+
+    Returns:
+        A dict with the cache stats and one item per cached (model, prompt, params) key.
+    """
+    entries = [
+        {
+            "key": entry["key"],
+            "model": entry["value"]["model"],
+            "query": entry["value"]["query"],
+            "age": round(entry["age"], 3),
+            "expires_in": round(entry["expires_in"], 3),
+        }
+        for entry in response_cache.entries()
+    ]
+    return {"stats": response_cache.stats(), "entries": entries}
+
+@admin_router.delete("/cache")
+async def clear_cache():
+    """Invalidates every response cache entry.
+
+    Returns:
+        A dict with the number of entries removed.
+    """
+    return {"invalidated": response_cache.clear()}
+
+@admin_router.delete("/cache/{key}")
+async def invalidate_cache_entry(key: str):
+    """Invalidates a single response cache entry.
+
+    Args:
+        key: Cache key as listed by GET /admin/cache.
+
+    Returns:
+        A dict with the number of entries removed.
+    """
+    if not response_cache.invalidate(key):
+        raise HTTPException(status_code=404, detail="Cache entry not found")
+    return {"invalidated": 1}
+
+@admin_router.get("/principals")
+async def get_principal_cache_stats():
+    """Reports principal cache counters and the users lookups it saved.
+
+    Returns:
+        A dict with the cache stats, the database lookups made on misses and the estimated time saved.
+    """
+    return principal_cache.stats()
+
+@admin_router.delete("/principals")
+async def clear_principal_cache():
+    """Invalidates every cached principal, e.g. after users were changed outside the API.
+
+    Returns:
+        A dict with the number of entries removed.
+    """
+    return {"invalidated": principal_cache.clear()}
+
+@admin_router.get("/llm")
+async def get_llm_stats():
+    """Reports counters for the layers between query processing and the model.
+
+    Returns:
+        A dict with one entry per layer.
+    """
+    return {
+        "single_flight": in_flight.stats(),
+        "micro_batcher": micro_batcher.stats(),
+        "admission": admission.stats(),
+        "resilience": resilience.stats(),
+        "circuit_breakers": circuit_breakers.stats(),
+    }
+
+@admin_router.get("/write_behind")
+async def get_write_behind_stats():
+    """Reports the write-behind queue depth and flush counters.
+
+    Returns:
+        A dict with the queue stats.
+    """
+    return write_behind.stats()
+
+@admin_router.get("/db/pool")
+async def get_db_pool_stats():
+    """Reports live connection pool state and checkout metrics of every database engine.
+
+    Returns:
+        A dict with one entry per engine: checked-out connections, overflow, checkout wait times and timeouts.
+    """
+    return get_pool_stats()
+
+@admin_router.get("/retention")
+async def get_retention_stats():
+    """Reports the retention periods and pruning counters.
+
+    Returns:
+        A dict with the retention job stats.
+    """
+    return retention.stats()
+
+@admin_router.post("/retention/run")
+async def run_retention():
+    """Prunes every expired query response now, in batches, archiving them first if configured.
+
+    Returns:
+        A dict with the number of rows deleted.
+    """
+    if not retention.enabled:
+        raise HTTPException(status_code=409, detail="No retention period is configured")
+    return {"deleted": await retention.run_once()}
+
+@admin_router.get("/archive")
+async def list_archive():
+    """Lists the days of pruned query responses in the archive.
+
+    Returns:
+        A dict with one item per archived creation day and the size of its file.
+    """
+    if response_archive is None:
+        raise HTTPException(status_code=404, detail="Archiving is not configured")
+    return {"days": response_archive.days()}
+
+@admin_router.get("/archive/{day}")
+async def read_archive(day: date, user_id: Optional[int] = None):
+    """Streams the archived query responses created on one day (UTC) as NDJSON.
+
+    Args:
+        day: Creation day, as YYYY-MM-DD.
+        user_id: Only rows of this user.
+
+    Returns:
+        A streaming response with one JSON object per line.
+    """
+    if response_archive is None or not response_archive.has(day):
+        raise HTTPException(status_code=404, detail="Nothing archived for this day")
+    return StreamingResponse(response_archive.read(day, user_id), media_type="application/x-ndjson")
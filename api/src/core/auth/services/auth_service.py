@@ -2,15 +2,18 @@ from fastapi import HTTPException, Depends
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 
 from ..config.settings import Settings
 from ..exceptions.base_exception import AuthenticationError
+from ...db.utils.db_utils import get_db, get_user_by_email
 from ..models.auth_model import User
+from ..utils.principal_cache import principal_cache
 from ..schemas import Token
 
-JWT_SECRET_KEY = Settings().JWT_SECRET_KEY
+settings = Settings()
+JWT_SECRET_KEY = settings.JWT_SECRET_KEY
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
@@ -26,21 +29,49 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def authenticate_user(user: User, db: Session):
-    user_db = db.query(User).filter(User.email == user.email).first()
+async def authenticate_user(user: User, db: AsyncSession):
+    user_db = await get_user_by_email(db, user.email)
     if not user_db or not user_db.check_password(user.password):
         raise AuthenticationError(status_code=401, detail="Incorrect email or password")
     return user_db
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if not username:
             raise AuthenticationError(detail="Could not validate credentials", status_code=401)
-        user = db.query(User).filter(User.email == username).first()
+        user = await principal_cache.get_user(db, username)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
     except JWTError:
-        raise AuthenticationError(detail="Could not validate credentials", status_code=401)
\ No newline at end of file
+        raise AuthenticationError(detail="Could not validate credentials", status_code=401)
+
+def is_admin(user: User) -> bool:
+    return user.email in settings.ADMIN_EMAILS
+
+def visible_user_id(current_user: User, user_id: Optional[int]) -> Optional[int]:
+    """Returns the user whose rows a request may read.
+
+    Administrators may read any user's rows, or everyone's when `user_id` is None; other users
+    only their own, whether or not they pass their ID.
+
+    Raises:
+        HTTPException: 403 if a non-administrator asks for another user's rows.
+    """
+    if is_admin(current_user):
+        return user_id
+    if user_id is not None and user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed to read this user's query responses")
+    return current_user.id
+
+async def get_admin_user(current_user: User = Depends(get_current_user)):
+    """Returns the authenticated user if their email is listed in `ADMIN_EMAILS`.
+
+    Raises:
+        HTTPException: 403 if the user is not an administrator.
+    """
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return current_user
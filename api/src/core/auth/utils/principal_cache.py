@@ -0,0 +1,157 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import Any, Dict, Optional, Set
+import time
+
+#  Third-party:
+from sqlalchemy import event, inspect  # Version 2.0.36
+from sqlalchemy.ext.asyncio import AsyncSession  # Version 2.0.36
+from sqlalchemy.orm import Session, make_transient_to_detached, object_session  # Version 2.0.36
+
+#  Internal:
+from ...config.settings import Settings  # Version 2.9.2
+from ...db.utils.db_utils import get_user_by_email
+from ...utils.cache import TTLCache
+from ..models.auth_model import User
+
+settings = Settings()
+
+# Key of Session.info holding the emails of users changed in the open transaction;
+# None stands for every user, after a bulk UPDATE or DELETE on users
+PENDING_KEY = "principal_cache_invalidate"
+
+
+def _snapshot(user: User) -> Dict[str, Any]:
+    return {column.key: getattr(user, column.key) for column in inspect(User).column_attrs}
+
+
+def _detached(snapshot: Dict[str, Any]) -> User:
+    # A fresh instance per request, so one request attaching it to its session cannot affect another.
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return user
+
+
+class PrincipalCache:
+    """
+    Caches the users behind JWT subjects, so authenticated requests skip the users SELECT.
+
+    Entries are keyed by the token subject (the user's email) and expire after `ttl` seconds.
+    They are invalidated when a user is updated or deleted through the ORM in this process
+    (see the listeners below). A lookup that raced with an invalidation is not cached.
+
+    Args:
+        maxsize (int): Maximum number of users cached. A size of 0 disables the cache.
+        ttl (float): Seconds a user stays cached.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._generation = 0
+        self.lookups = 0
+        self.lookup_seconds = 0.0
+
+    async def get_user(self, db: AsyncSession, email: str) -> Optional[User]:
+        """
+        Returns the user with this email, from the cache or else from the database.
+
+        Args:
+            db (AsyncSession): Database session used on a miss.
+            email (str): The token subject.
+
+        Returns:
+            Optional[User]: The user, detached when it comes from the cache; None if there is no such user.
+        """
+        snapshot = self.cache.get(email)
+        if snapshot is not None:
+            return _detached(snapshot)
+        generation = self._generation
+        started = time.perf_counter()
+        user = await get_user_by_email(db, email)
+        self.lookups += 1
+        self.lookup_seconds += time.perf_counter() - started
+        if user is not None and generation == self._generation:
+            self.cache.set(email, _snapshot(user))
+        return user
+
+    def invalidate(self, email: str) -> bool:
+        """
+        Drops the cached user with this email.
+
+        Args:
+            email (str): The user's email.
+
+        Returns:
+            bool: True if an entry was removed.
+        """
+        self._generation += 1
+        return self.cache.invalidate(email)
+
+    def clear(self) -> int:
+        """Drops every cached user; returns the number of entries removed."""
+        self._generation += 1
+        return self.cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports the cache counters and the database time hits saved.
+
+        Returns:
+            Dict[str, Any]: The TTLCache stats, plus database lookups, their mean latency, and
+            the estimated time saved (hits times the mean lookup latency).
+        """
+        stats = self.cache.stats()
+        mean_lookup_ms = self.lookup_seconds / self.lookups * 1000 if self.lookups else 0.0
+        requests = stats["hits"] + stats["misses"]
+        return {
+            **stats,
+            "hit_rate": round(stats["hits"] / requests, 4) if requests else 0.0,
+            "lookups": self.lookups,
+            "mean_lookup_ms": round(mean_lookup_ms, 3),
+            "saved_ms": round(stats["hits"] * mean_lookup_ms, 1),
+        }
+
+
+principal_cache = PrincipalCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
+
+def invalidate_changed_user(mapper, connection, target: User) -> None:
+    """
+    Drops a user from the principal cache when it is updated or deleted, under its current and
+    previous email. Dropped again on commit, since a request may cache the old row meanwhile.
+    """
+    emails: Set[str] = {target.email, *inspect(target).attrs.email.history.deleted} - {None}
+    for email in emails:
+        principal_cache.invalidate(email)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_KEY, set()).update(emails)
+
+
+def invalidate_bulk_changed_users(orm_execute_state) -> None:
+    """Drops every cached user on a bulk UPDATE or DELETE of users, which skips the mapper events."""
+    if (orm_execute_state.is_update or orm_execute_state.is_delete) and orm_execute_state.bind_mapper is inspect(User):
+        principal_cache.clear()
+        orm_execute_state.session.info.setdefault(PENDING_KEY, set()).add(None)
+
+
+def invalidate_committed_users(session: Session) -> None:
+    emails = session.info.pop(PENDING_KEY, ())
+    if None in emails:
+        principal_cache.clear()
+        return
+    for email in emails:
+        principal_cache.invalidate(email)
+
+
+def discard_pending_users(session: Session) -> None:
+    session.info.pop(PENDING_KEY, None)
+
+
+event.listen(User, "after_update", invalidate_changed_user)
+event.listen(User, "after_delete", invalidate_changed_user)
+# AsyncSession runs on a Session, so these cover both.
+event.listen(Session, "do_orm_execute", invalidate_bulk_changed_users)
+event.listen(Session, "after_commit", invalidate_committed_users)
+event.listen(Session, "after_rollback", discard_pending_users)
@@ -1,31 +1,53 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional, Union
 
 from ..config.settings import Settings
-from ..database import get_db
+from ..exceptions.base_exception import PaginationError
+from ..utils.pagination import Page, decode_cursor, make_page
 from .models import QueryResponse, User
 from .schemas import QueryResponse as QueryResponseSchema, User as UserSchema
-from .utils.db_utils import get_db
+from ..query.schemas import QueryResponseSummary
+from .utils import db_utils
+from .utils.db_utils import get_read_db
+
+settings = Settings()
 
 db_router = APIRouter(prefix="/db", tags=["database"])
 
-@db_router.get("/query_responses", response_model=list[QueryResponseSchema])
-async def get_query_responses(db: Session = Depends(get_db), user_id: Optional[int] = None):
-    """Retrieves a list of query responses.
+@db_router.get("/query_responses", response_model=Union[Page[QueryResponseSchema], Page[QueryResponseSummary]])
+async def get_query_responses(
+    db: AsyncSession = Depends(get_read_db),
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    view: str = Query("full", pattern="^(full|summary)$"),
+):
+    """Retrieves a page of query responses in ascending ID order.
 
     Args:
         db: Database session.
         user_id: Optional user ID to filter responses by.
+        since: Optional lower bound (inclusive) on the creation time.
+        until: Optional upper bound (exclusive) on the creation time.
+        cursor: `next_cursor` of the previous page; omit for the first page.
+        limit: Maximum number of items in the page.
+        view: "full", or "summary" for QueryResponseSummary items without the full response text.
 
     Returns:
-        A list of QueryResponseSchema objects.
+        A page of QueryResponseSchema (or QueryResponseSummary) objects with the cursor of the next page.
     """
-    if user_id:
-        return db.query(QueryResponse).filter(QueryResponse.user_id == user_id).all()
-    return db.query(QueryResponse).all()
+    try:
+        after_id = decode_cursor(cursor)
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    return make_page(await db_utils.list_query_responses(db, view, user_id, after_id=after_id, limit=limit + 1, since=since, until=until), limit)
 
 @db_router.get("/query_responses/{query_id}", response_model=QueryResponseSchema)
-async def get_query_response(query_id: int, db: Session = Depends(get_db)):
+async def get_query_response(query_id: int, db: AsyncSession = Depends(get_read_db)):
     """Retrieves a specific query response by ID.
 
     Args:
@@ -35,25 +57,35 @@ async def get_query_response(query_id: int, db: Session = Depends(get_db)):
     Returns:
         A QueryResponseSchema object.
     """
-    query_response = db.query(QueryResponse).filter(QueryResponse.id == query_id).first()
+    query_response = await db_utils.get_query_response(db, query_id)
     if not query_response:
         raise HTTPException(status_code=404, detail="Query response not found")
     return query_response
 
-@db_router.get("/users", response_model=list[UserSchema])
-async def get_users(db: Session = Depends(get_db)):
-    """Retrieves a list of users.
+@db_router.get("/users", response_model=Page[UserSchema])
+async def get_users(
+    db: AsyncSession = Depends(get_read_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+):
+    """Retrieves a page of users in ascending ID order.
 
     Args:
         db: Database session.
+        cursor: `next_cursor` of the previous page; omit for the first page.
+        limit: Maximum number of items in the page.
 
     Returns:
-        A list of UserSchema objects.
+        A page of UserSchema objects with the cursor of the next page.
     """
-    return db.query(User).all()
+    try:
+        after_id = decode_cursor(cursor)
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    return make_page(await db_utils.get_users(db, after_id=after_id, limit=limit + 1), limit)
 
 @db_router.get("/users/{user_id}", response_model=UserSchema)
-async def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_read_db)):
     """Retrieves a specific user by ID.
 
     Args:
@@ -63,7 +95,7 @@ async def get_user(user_id: int, db: Session = Depends(get_db)):
     Returns:
         A UserSchema object.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db_utils.get_user(db, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
\ No newline at end of file
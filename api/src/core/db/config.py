@@ -1,29 +1,159 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from typing import Any, Dict, Optional, Union
+from fastapi import Request
 from sqlalchemy.ext.declarative import declarative_base
 import os
 
 # Import the configuration settings from src/config/settings.py
 from ..config.settings import Settings
+from .utils.pool_metrics import PoolMetrics, instrumented_pool_class
+from .utils.read_routing import RecentWriters
 
 settings = Settings()
 
+# asyncio drivers used for each database backend
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Returns the connection string for the asyncio driver of the same database.
+
+    `sqlite://` URLs use aiosqlite and `postgresql://` URLs (with or without a sync driver
+    such as psycopg2) use asyncpg. URLs that already name an asyncio driver are kept.
+
+    Args:
+        url: A SQLAlchemy connection string.
+
+    Returns:
+        str: The connection string for create_async_engine.
+    """
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    parsed = make_url(url)
+    if parsed.get_dialect().is_async:
+        return url
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for database backend: {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+# Metrics of every engine built by create_db_engine, by name
+pool_metrics: Dict[str, PoolMetrics] = {}
+engines: Dict[str, Union[Engine, AsyncEngine]] = {}
+
+def create_db_engine(name: str, url: str, is_async: bool = False) -> Union[Engine, AsyncEngine]:
+    """Creates an engine whose pool is sized from Settings and reports to `pool_metrics[name]`.
+
+    This is the only place engines are created, so every pool in the process is configured
+    by DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE and DB_POOL_PRE_PING.
+    Size, overflow and timeout only apply to queue pools; in-memory SQLite keeps its
+    single-connection pool.
+
+    Args:
+        name: Name the engine and its metrics are registered under.
+        url: A sync SQLAlchemy connection string.
+        is_async: Create an AsyncEngine on the asyncio driver of the same database.
+
+    Returns:
+        Engine | AsyncEngine: The new engine.
+    """
+    if is_async:
+        url = to_async_url(url)
+    parsed = make_url(url)
+    base_pool_class = parsed.get_dialect().get_pool_class(parsed)
+    metrics = PoolMetrics()
+    options: Dict[str, Any] = {
+        "poolclass": instrumented_pool_class(base_pool_class, metrics),
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if issubclass(base_pool_class, QueuePool):
+        options.update(pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW, pool_timeout=settings.DB_POOL_TIMEOUT)
+    db_engine = create_async_engine(url, **options) if is_async else create_engine(url, **options)
+    pool_metrics[name] = metrics
+    engines[name] = db_engine
+    return db_engine
+
+def get_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """Returns live pool state and checkout metrics of every engine, by name."""
+    return {
+        name: pool_metrics[name].stats(db_engine.sync_engine.pool if isinstance(db_engine, AsyncEngine) else db_engine.pool)
+        for name, db_engine in engines.items()
+    }
+
 # Define the database connection string using the DATABASE_URL environment variable
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-# Create the SQLAlchemy engine for connecting to the database
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Create the SQLAlchemy engine for connecting to the database (scripts and migrations)
+engine = create_db_engine("sync", SQLALCHEMY_DATABASE_URL)
 
 # Create a session factory for creating database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory used by the request handlers. Objects stay usable after
+# commit, since lazy refreshes are not possible outside an await.
+async_engine = create_db_engine("async", SQLALCHEMY_DATABASE_URL, is_async=True)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Optional read replica for read-only handlers. Its sessions are tagged so reads that miss
+# a row the replica has not received yet can retry on the primary.
+replica_engine = create_db_engine("replica", settings.DATABASE_REPLICA_URL, is_async=True) if settings.DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = (
+    async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False, info={"replica": True})
+    if replica_engine is not None
+    else None
+)
+
+# Users whose reads stay on the primary for a while after they write
+recent_writes = RecentWriters(settings.READ_YOUR_WRITES_SECONDS)
+
 # Define the base class for SQLAlchemy models
 Base = declarative_base()
 
 # Create a dependency function to get a database session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    """
+    Dependency function to get an async database session.
+
+    Yields:
+        AsyncSession: A database session object.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def read_sessionmaker(user_id: Optional[int] = None) -> async_sessionmaker:
+    """Returns the session factory for read-only work on behalf of `user_id`.
+
+    That is the replica, unless none is configured or the user wrote within
+    READ_YOUR_WRITES_SECONDS, in which case the primary is used.
+
+    Args:
+        user_id: The user the data is read for, if the request names one.
+
+    Returns:
+        async_sessionmaker: The replica or primary session factory.
+    """
+    if ReplicaSessionLocal is None or recent_writes.is_recent(user_id):
+        return AsyncSessionLocal
+    return ReplicaSessionLocal
+
+# Dependency of read-only handlers
+async def get_read_db(request: Request):
+    """
+    Dependency function to get an async database session for a read-only request.
+
+    The session reads from the replica when one is configured. Requests naming a `user_id`
+    that wrote within READ_YOUR_WRITES_SECONDS read from the primary instead.
+
+    Yields:
+        AsyncSession: A database session object.
+    """
+    user_id = request.query_params.get("user_id")
+    async with read_sessionmaker(int(user_id) if user_id and user_id.isdigit() else None)() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -1,14 +1,13 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, Integer, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
-from ..config import settings
-
 Base = declarative_base()
 
 class Base(Base):
     __abstract__ = True
 
     id = Column(Integer, primary_key=True, index=True)
-    created_at = Column(String, nullable=False, default=settings.get_current_datetime())
-    updated_at = Column(String, nullable=False, default=settings.get_current_datetime(), onupdate=settings.get_current_datetime())
\ No newline at end of file
+    # Set by the database on insert and update (UTC), so every row gets its own time.
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
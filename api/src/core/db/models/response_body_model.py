@@ -0,0 +1,12 @@
+from sqlalchemy import Column, String
+
+from .base import Base
+from ..utils.compression import response_text_type
+
+class ResponseBody(Base):
+    """A response text stored once, however many query responses share it (see core/db/utils/response_bodies.py)."""
+    __tablename__ = "response_bodies"
+    # sha256 of the UTF-8 text; query_responses.response_hash points here
+    hash = Column(String(64), nullable=False, unique=True)
+    # Text, or compressed bytes when RESPONSE_COMPRESSION is on (see core/db/utils/compression.py)
+    body = Column(response_text_type(), nullable=False)
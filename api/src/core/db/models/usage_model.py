@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, Date, ForeignKey, Integer, String, UniqueConstraint
+
+from .base import Base
+
+class UsageDaily(Base):
+    """Queries and tokens per user, UTC day and model, kept up to date as responses are stored (see core/db/utils/usage.py)."""
+    __tablename__ = "usage_daily"
+    __table_args__ = (
+        # Upsert key; also serves range reads: WHERE user_id = ? AND day >= ? AND day < ?
+        UniqueConstraint("user_id", "day", "model", name="uq_usage_daily_user_id_day_model"),
+    )
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)
+    model = Column(String, nullable=False)
+    queries = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(BigInteger, nullable=False, default=0)
+    completion_tokens = Column(BigInteger, nullable=False, default=0)
@@ -0,0 +1,151 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import Optional
+import zlib
+
+#  Third-party:
+from sqlalchemy import LargeBinary, Text  # Version 2.0.36
+from sqlalchemy.types import TypeDecorator, TypeEngine  # Version 2.0.36
+
+try:
+    import zstandard  # Optional: only needed for RESPONSE_COMPRESSION=zstd
+except ImportError:
+    zstandard = None
+
+#  Internal:
+from ...config.settings import Settings  # Version 2.9.2
+
+settings = Settings()
+
+# First byte of every stored value: how the rest is encoded
+RAW = b"\x00"
+ZLIB = b"\x01"
+ZSTD = b"\x02"
+
+METHODS = ("zlib", "zstd")
+
+
+class ResponseCodec:
+    """
+    Encodes response text as a one-byte header followed by the (possibly compressed) UTF-8 bytes.
+
+    Values shorter than `min_bytes`, or that do not shrink, are stored raw. Every header can be
+    decoded whatever method is configured, so rows written under other settings stay readable.
+
+    Args:
+        method (str): "zlib" or "zstd".
+        level (int, optional): Compression level. Defaults to 6.
+        dictionary (Optional[bytes], optional): zstd dictionary trained on stored responses. Defaults to None.
+        min_bytes (int, optional): Values shorter than this are not compressed. Defaults to 64.
+
+    Raises:
+        ValueError: If the method is unknown, or zstd is requested without the zstandard package.
+    """
+
+    def __init__(self, method: str, level: int = 6, dictionary: Optional[bytes] = None, min_bytes: int = 64):
+        if method not in METHODS:
+            raise ValueError(f"Unknown response compression method: {method}")
+        if (method == "zstd" or dictionary) and zstandard is None:
+            raise ValueError("Response compression with zstd requires the zstandard package.")
+        self.method = method
+        self.level = level
+        self.min_bytes = min_bytes
+        self._dictionary = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+
+    def encode(self, text: str) -> bytes:
+        """
+        Encodes response text for storage.
+
+        Args:
+            text (str): The response text.
+
+        Returns:
+            bytes: The header byte and payload.
+        """
+        data = text.encode("utf-8")
+        if len(data) < self.min_bytes:
+            return RAW + data
+        if self.method == "zstd":
+            header, compressed = ZSTD, zstandard.ZstdCompressor(level=self.level, dict_data=self._dictionary).compress(data)
+        else:
+            header, compressed = ZLIB, zlib.compress(data, self.level)
+        return header + compressed if len(compressed) < len(data) else RAW + data
+
+    def decode(self, value: bytes) -> str:
+        """
+        Decodes a stored value.
+
+        Args:
+            value (bytes): The header byte and payload.
+
+        Returns:
+            str: The response text.
+        """
+        header, payload = value[:1], value[1:]
+        if header == ZLIB:
+            return zlib.decompress(payload).decode("utf-8")
+        if header == ZSTD:
+            if zstandard is None:
+                raise ValueError("Stored response is zstd-compressed but the zstandard package is not installed.")
+            return zstandard.ZstdDecompressor(dict_data=self._dictionary).decompress(payload).decode("utf-8")
+        if header == RAW:
+            return payload.decode("utf-8")
+        # Written before the column was converted: plain UTF-8 without a header.
+        return value.decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """
+    A text column stored as compressed bytes (BLOB/BYTEA).
+
+    Values are encoded when they are bound and decoded when the column is fetched, so queries
+    that do not select the column never pay for decompression. Values that are still plain
+    text, not yet converted by scripts/compress_responses.py, are returned as they are.
+
+    Args:
+        codec (ResponseCodec): Encodes and decodes the values.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def __init__(self, codec: ResponseCodec):
+        super().__init__()
+        self.codec = codec
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.codec.encode(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return self.codec.decode(bytes(value))
+
+
+def load_dictionary(path: Optional[str]) -> Optional[bytes]:
+    """Reads a zstd dictionary file, or returns None if no path is configured."""
+    if not path:
+        return None
+    with open(path, "rb") as dictionary_file:
+        return dictionary_file.read()
+
+
+def make_response_codec() -> Optional[ResponseCodec]:
+    """Returns the codec configured by the RESPONSE_COMPRESSION settings, or None when compression is off."""
+    if settings.RESPONSE_COMPRESSION == "none":
+        return None
+    return ResponseCodec(
+        settings.RESPONSE_COMPRESSION,
+        level=settings.RESPONSE_COMPRESSION_LEVEL,
+        dictionary=load_dictionary(settings.RESPONSE_COMPRESSION_DICT_PATH),
+        min_bytes=settings.RESPONSE_COMPRESSION_MIN_BYTES,
+    )
+
+
+response_codec = make_response_codec()
+
+
+def response_text_type() -> TypeEngine:
+    """Returns the type of QueryResponse.response: CompressedText when compression is on, Text otherwise."""
+    return Text() if response_codec is None else CompressedText(response_codec)
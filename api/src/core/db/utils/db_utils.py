@@ -1,41 +1,54 @@
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..config import settings
-from ..database import SessionLocal, get_db
+from ..config import AsyncSessionLocal, get_db, get_read_db, recent_writes, settings
 
 # Specify version and import
-from typing import Optional # Version: 2.9.2
+from datetime import datetime, timedelta, timezone # No specific version required
+from types import SimpleNamespace # No specific version required
+from typing import AsyncIterator, List, Mapping, Optional, Sequence, Tuple # Version: 2.9.2
 from fastapi.responses import JSONResponse # Version: 0.115.2
-from ..exceptions.base_exception import DatabaseError # Version: 2.9.2
+from ..exceptions.base_exception import DatabaseError, SearchUnavailableError # Version: 2.9.2
 from ..models import QueryResponse, User # Version: 2.9.2
 from ..schemas import QueryResponse as QueryResponseSchema, User as UserSchema # Version: 2.9.2
+from .write_behind import id_generator, write_behind
+from .compression import response_codec
+from .search import index_query_responses, search
+from .usage import record_usage
+from .response_bodies import store_response_bodies
+from ...utils.cache import TTLCache
 
+# IDs of users known to exist, so queued rows do not need a lookup each; a row whose user is
+# deleted within the TTL fails on insert and is dead-lettered by the write-behind queue.
+known_user_ids = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
 
-# Database Utility Functions
 
-def get_db():
-    """
-    Dependency function to get a database session.
+async def _user_exists(db: AsyncSession, user_id: int) -> bool:
+    if known_user_ids.get(user_id):
+        return True
+    exists = (await db.execute(select(User.id).where(User.id == user_id))).first() is not None
+    if exists:
+        known_user_ids.set(user_id, True)
+    return exists
 
-    Yields:
-        Session: A database session object.
-    """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
 
+# Database Utility Functions
 
-def create_query_response(db: Session, query_request: QueryRequest, response: str):
+async def create_query_response(db: AsyncSession, query_request: QueryRequest, response: str, prompt_hash: Optional[str] = None):
     """
     Creates a new QueryResponse object in the database.
 
+    With `WRITE_BEHIND_ENABLED` the row gets its ID up front and is handed to the write-behind
+    queue; the returned object is transient until the queue flushes it. If the queue is full
+    or not running, or the user does not exist, the row is inserted immediately instead, so
+    the request fails rather than returning an ID that will never be stored.
+
     Args:
         db: Database session.
         query_request: The QueryRequest object containing the user's query.
         response: The AI-generated response.
+        prompt_hash: Hash of the model, normalized prompt and generation params, for prior-answer lookups.
 
     Returns:
         QueryResponse: The newly created QueryResponse object.
@@ -43,21 +56,105 @@ def create_query_response(db: Session, query_request: QueryRequest, response: st
     Raises:
         DatabaseError: If an error occurs during database interaction.
     """
+    recent_writes.mark(query_request.user_id)
+    if settings.WRITE_BEHIND_ENABLED:
+        row = _new_query_response_row(query_request, response, prompt_hash)
+        if await _user_exists(db, query_request.user_id) and write_behind.enqueue(row):
+            return QueryResponse(**row)
+        return (await _insert_query_response_rows(db, [row]))[0]
     try:
-        db_query = QueryResponse(query=query_request.query, model=query_request.model, response=response, user_id=query_request.user_id)
+        db_query = QueryResponse(query=query_request.query, model=query_request.model, response=response, user_id=query_request.user_id, prompt_hash=prompt_hash)
+        await store_response_bodies(db, [db_query])
         db.add(db_query)
-        db.commit()
-        db.refresh(db_query)
+        await db.flush()
+        await index_query_responses(db, [db_query])
+        await record_usage(db, [db_query])
+        await db.commit()
+        await db.refresh(db_query)
         return db_query
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise DatabaseError(detail=f"Error creating query response: {e}")
 
 
-def get_query_response(db: Session, query_id: int):
+async def create_query_responses(db: AsyncSession, items: List[Tuple[QueryRequest, str, Optional[str]]]) -> List[int]:
+    """
+    Creates several QueryResponse objects in a single transaction.
+
+    Args:
+        db: Database session.
+        items: (QueryRequest, AI-generated response, prompt hash) triples to store.
+
+    Returns:
+        list[int]: The IDs of the new query responses, in input order.
+
+    Raises:
+        DatabaseError: If an error occurs during database interaction.
+    """
+    for query_request, _, _ in items:
+        recent_writes.mark(query_request.user_id)
+    if settings.WRITE_BEHIND_ENABLED:
+        rows = [_new_query_response_row(query_request, response, prompt_hash) for query_request, response, prompt_hash in items]
+        existing = {user_id for user_id in {row["user_id"] for row in rows} if await _user_exists(db, user_id)}
+        overflow = [row for row in rows if row["user_id"] not in existing or not write_behind.enqueue(row)]
+        if overflow:
+            await _insert_query_response_rows(db, overflow)
+        return [row["id"] for row in rows]
+    try:
+        db_queries = [
+            QueryResponse(query=query_request.query, model=query_request.model, response=response, user_id=query_request.user_id, prompt_hash=prompt_hash)
+            for query_request, response, prompt_hash in items
+        ]
+        await store_response_bodies(db, db_queries)
+        db.add_all(db_queries)
+        await db.flush()
+        query_ids = [db_query.id for db_query in db_queries]
+        await index_query_responses(db, db_queries)
+        await record_usage(db, db_queries)
+        await db.commit()
+        return query_ids
+    except Exception as e:
+        await db.rollback()
+        raise DatabaseError(detail=f"Error creating query responses: {e}")
+
+
+def _new_query_response_row(query_request: QueryRequest, response: str, prompt_hash: Optional[str]) -> dict:
+    # Timestamped here rather than by the server default, since a queued row may be written later.
+    now = datetime.now(timezone.utc)
+    return {
+        "id": id_generator.next_id(),
+        "query": query_request.query,
+        "model": query_request.model,
+        "response": response,
+        "user_id": query_request.user_id,
+        "prompt_hash": prompt_hash,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+async def _insert_query_response_rows(db: AsyncSession, rows: List[dict]) -> List[QueryResponse]:
+    try:
+        db_queries = [QueryResponse(**row) for row in rows]
+        await store_response_bodies(db, db_queries)
+        db.add_all(db_queries)
+        await db.flush()
+        await index_query_responses(db, rows)
+        await record_usage(db, rows)
+        await db.commit()
+        return db_queries
+    except Exception as e:
+        await db.rollback()
+        raise DatabaseError(detail=f"Error creating query responses: {e}")
+
+
+async def get_query_response(db: AsyncSession, query_id: int):
     """
     Retrieves a specific query response from the database by ID.
 
+    On a replica session, a miss is retried on the primary, since the row may have been
+    written too recently to have been replicated.
+
     Args:
         db: Database session.
         query_id: The ID of the query response.
@@ -66,34 +163,259 @@ def get_query_response(db: Session, query_id: int):
         QueryResponse: The QueryResponse object if found, otherwise None.
     """
     try:
-        return db.query(QueryResponse).filter(QueryResponse.id == query_id).first()
+        db_query = (await db.execute(select(QueryResponse).where(QueryResponse.id == query_id))).scalars().first()
+    except Exception as e:
+        raise DatabaseError(detail=f"Error retrieving query response: {e}")
+    if db_query is None and db.info.get("replica"):
+        async with AsyncSessionLocal() as primary:
+            return await get_query_response(primary, query_id)
+    if db_query is None:
+        # Not committed yet if it is still waiting in the write-behind queue.
+        row = write_behind.pending(query_id)
+        if row is not None:
+            return QueryResponse(**row)
+    return db_query
+
+
+async def get_latest_query_response(db: AsyncSession, model: str, prompt_hash: str, max_age: Optional[float] = None):
+    """
+    Retrieves the most recent stored response to a prompt.
+
+    The lookup is a seek on the (model, prompt_hash, id) index, so its cost does not grow
+    with the table. Rows stored before prompt hashes existed only match once
+    `scripts/backfill_prompt_hash.py` has filled them in.
+
+    Args:
+        db: Database session.
+        model: The OpenAI model the prompt was sent to.
+        prompt_hash: Hash of the model, normalized prompt and generation params.
+        max_age: Only responses created at most this many seconds ago; any age if None.
+
+    Returns:
+        QueryResponse: The newest matching QueryResponse object if found, otherwise None.
+    """
+    try:
+        statement = select(QueryResponse).where(QueryResponse.model == model, QueryResponse.prompt_hash == prompt_hash)
+        if max_age is not None:
+            statement = statement.where(QueryResponse.created_at >= datetime.now(timezone.utc) - timedelta(seconds=max_age))
+        result = await db.execute(statement.order_by(QueryResponse.id.desc()).limit(1))
+        return result.scalars().first()
     except Exception as e:
         raise DatabaseError(detail=f"Error retrieving query response: {e}")
 
 
-def get_query_responses(db: Session, user_id: Optional[int] = None):
+def _in_time_range(statement, since: Optional[datetime], until: Optional[datetime]):
+    # Naive bounds are taken as UTC, the zone the timestamps are stored in.
+    if since:
+        statement = statement.where(QueryResponse.created_at >= _as_utc(since))
+    if until:
+        statement = statement.where(QueryResponse.created_at < _as_utc(until))
+    return statement
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+async def get_query_responses(
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
     """
-    Retrieves a list of query responses from the database.
+    Retrieves a list of query responses from the database in ascending ID order.
+
+    Pages are read by keyset: rows with an ID greater than `after_id`, which the primary key
+    (or the (user_id, id) index when filtering by user) serves as an index seek. A time
+    range on a user's responses is served by the (user_id, created_at) index.
 
     Args:
         db: Database session.
         user_id: Optional user ID to filter responses by.
+        after_id: Optional ID after which to start, from the previous page.
+        limit: Optional maximum number of rows.
+        since: Optional lower bound (inclusive) on `created_at`.
+        until: Optional upper bound (exclusive) on `created_at`.
 
     Returns:
         list[QueryResponse]: A list of QueryResponse objects, or an empty list if none are found.
     """
     try:
-        if user_id:
-            return db.query(QueryResponse).filter(QueryResponse.user_id == user_id).all()
-        return db.query(QueryResponse).all()
+        statement = _listing(select(QueryResponse), user_id, after_id, limit, since, until)
+        return (await db.execute(statement)).scalars().all()
     except Exception as e:
         raise DatabaseError(detail=f"Error retrieving query responses: {e}")
 
 
-def get_user(db: Session, user_id: int):
+# Columns loaded by summary listings; `response` is replaced by a preview cut by the database
+SUMMARY_COLUMNS = ("id", "user_id", "model", "query", "created_at")
+
+
+async def get_query_response_summaries(
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    preview_chars: int = 200,
+):
+    """
+    Retrieves query responses like `get_query_responses`, without their full response text.
+
+    Only SUMMARY_COLUMNS and the first `preview_chars` characters of the response are
+    selected, so the full text is neither sent by the database nor loaded into ORM objects.
+    Compressed responses cannot be cut by the database, so with RESPONSE_COMPRESSION on they
+    are fetched, decompressed and cut here.
+
+    Args:
+        db: Database session.
+        user_id: Optional user ID to filter responses by.
+        after_id: Optional ID after which to start, from the previous page.
+        limit: Optional maximum number of rows.
+        since: Optional lower bound (inclusive) on `created_at`.
+        until: Optional upper bound (exclusive) on `created_at`.
+        preview_chars: Length of `response_preview`.
+
+    Returns:
+        list: Rows with SUMMARY_COLUMNS and `response_preview` attributes.
+    """
+    columns = [getattr(QueryResponse, column) for column in SUMMARY_COLUMNS]
+    if response_codec is None:
+        preview = func.substr(QueryResponse.response, 1, preview_chars).label("response_preview")
+    else:
+        preview = QueryResponse.response.label("response_preview")
+    try:
+        statement = _listing(select(*columns, preview), user_id, after_id, limit, since, until)
+        rows = (await db.execute(statement)).all()
+    except Exception as e:
+        raise DatabaseError(detail=f"Error retrieving query responses: {e}")
+    if response_codec is None:
+        return rows
+    return [SimpleNamespace(**{**row._asdict(), "response_preview": row.response_preview[:preview_chars]}) for row in rows]
+
+
+async def list_query_responses(
+    db: AsyncSession,
+    view: str = "full",
+    user_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+    limit: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+):
+    """
+    Retrieves query responses for a listing endpoint in the requested view.
+
+    Args:
+        db: Database session.
+        view: "full" for QueryResponse objects, or "summary" for rows from `get_query_response_summaries`.
+        user_id: Optional user ID to filter responses by.
+        after_id: Optional ID after which to start, from the previous page.
+        limit: Optional maximum number of rows.
+        since: Optional lower bound (inclusive) on `created_at`.
+        until: Optional upper bound (exclusive) on `created_at`.
+
+    Returns:
+        list: The rows, in ascending ID order.
+    """
+    if view == "summary":
+        return await get_query_response_summaries(db, user_id, after_id, limit, since, until, preview_chars=settings.SUMMARY_PREVIEW_CHARS)
+    return await get_query_responses(db, user_id, after_id, limit, since, until)
+
+
+def _listing(statement, user_id: Optional[int], after_id: Optional[int], limit: Optional[int], since: Optional[datetime], until: Optional[datetime]):
+    if user_id:
+        statement = statement.where(QueryResponse.user_id == user_id)
+    if after_id is not None:
+        statement = statement.where(QueryResponse.id > after_id)
+    statement = _in_time_range(statement, since, until).order_by(QueryResponse.id)
+    if limit is not None:
+        statement = statement.limit(limit)
+    return statement
+
+
+async def search_query_responses(db: AsyncSession, terms: str, user_id: Optional[int] = None, limit: int = 50, offset: int = 0):
+    """
+    Searches stored queries and responses through the full-text index, best match first.
+
+    Args:
+        db: Database session.
+        terms: The search terms; all of them must match.
+        user_id: Optional user ID to filter responses by.
+        limit: Maximum number of rows.
+        offset: Number of best matches to skip, from the previous pages.
+
+    Returns:
+        list[Row]: Rows with id, user_id, model, query, created_at, rank and snippet.
+
+    Raises:
+        SearchUnavailableError: If the database has no full-text index.
+        DatabaseError: If an error occurs during database interaction.
+    """
+    try:
+        return await search(db, terms, user_id, limit=limit, offset=offset)
+    except SearchUnavailableError:
+        raise
+    except Exception as e:
+        raise DatabaseError(detail=f"Error searching query responses: {e}")
+
+
+# Columns written by query response exports, in output order
+EXPORT_COLUMNS = ("id", "user_id", "model", "query", "response", "created_at")
+
+
+async def stream_query_responses(
+    db: AsyncSession,
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: int = 1000,
+) -> AsyncIterator[Sequence[Mapping]]:
+    """
+    Streams query responses in ascending ID order, `batch_size` rows at a time.
+
+    The rows are read through a server-side cursor (`yield_per`) as plain column mappings
+    rather than ORM objects, so neither the driver nor the session holds more than one
+    batch, however many rows match.
+
+    Args:
+        db: Database session; its connection stays busy until the stream is exhausted or closed.
+        user_id: Optional user ID to filter responses by.
+        since: Optional lower bound (inclusive) on `created_at`.
+        until: Optional upper bound (exclusive) on `created_at`.
+        batch_size: Number of rows fetched from the cursor at a time.
+
+    Yields:
+        list[RowMapping]: The next batch of rows, keyed by EXPORT_COLUMNS.
+
+    Raises:
+        DatabaseError: If an error occurs during database interaction.
+    """
+    statement = select(*(getattr(QueryResponse, column) for column in EXPORT_COLUMNS))
+    if user_id:
+        statement = statement.where(QueryResponse.user_id == user_id)
+    statement = _in_time_range(statement, since, until).order_by(QueryResponse.id).execution_options(yield_per=batch_size)
+    try:
+        result = await db.stream(statement)
+        try:
+            async for partition in result.mappings().partitions():
+                yield partition
+        finally:
+            await result.close()
+    except Exception as e:
+        raise DatabaseError(detail=f"Error exporting query responses: {e}")
+
+
+async def get_user(db: AsyncSession, user_id: int):
     """
     Retrieves a specific user from the database by ID.
 
+    On a replica session, a miss is retried on the primary.
+
     Args:
         db: Database session.
         user_id: The ID of the user.
@@ -102,22 +424,51 @@ def get_user(db: Session, user_id: int):
         User: The User object if found, otherwise None.
     """
     try:
-        return db.query(User).filter(User.id == user_id).first()
+        user = (await db.execute(select(User).where(User.id == user_id))).scalars().first()
     except Exception as e:
         raise DatabaseError(detail=f"Error retrieving user: {e}")
+    if user is None and db.info.get("replica"):
+        async with AsyncSessionLocal() as primary:
+            return await get_user(primary, user_id)
+    return user
 
 
-def get_users(db: Session):
+async def get_users(db: AsyncSession, after_id: Optional[int] = None, limit: Optional[int] = None):
     """
-    Retrieves a list of all users from the database.
+    Retrieves a list of users from the database in ascending ID order.
 
     Args:
         db: Database session.
+        after_id: Optional ID after which to start, from the previous page.
+        limit: Optional maximum number of rows.
 
     Returns:
         list[User]: A list of User objects, or an empty list if none are found.
     """
     try:
-        return db.query(User).all()
+        statement = select(User)
+        if after_id is not None:
+            statement = statement.where(User.id > after_id)
+        statement = statement.order_by(User.id)
+        if limit is not None:
+            statement = statement.limit(limit)
+        return (await db.execute(statement)).scalars().all()
+    except Exception as e:
+        raise DatabaseError(detail=f"Error retrieving users: {e}")
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    """
+    Retrieves a specific user from the database by email address.
+
+    Args:
+        db: Database session.
+        email: The user's email address.
+
+    Returns:
+        User: The User object if found, otherwise None.
+    """
+    try:
+        return (await db.execute(select(User).where(User.email == email))).scalars().first()
     except Exception as e:
-        raise DatabaseError(detail=f"Error retrieving users: {e}")
\ No newline at end of file
+        raise DatabaseError(detail=f"Error retrieving user: {e}")
\ No newline at end of file
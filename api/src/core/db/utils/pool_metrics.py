@@ -0,0 +1,151 @@
+#  Import Statements:
+
+#  Core modules:
+from collections import deque
+from typing import Any, Deque, Dict, Type
+import threading
+import time
+
+#  Third-party:
+from sqlalchemy import event  # Version 2.0.36
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError  # Version 2.0.36
+from sqlalchemy.pool import Pool  # Version 2.0.36
+
+# Key under which a new connection's record carries how long opening it took, until its checkout is timed
+_CONNECT_SECONDS = "pool_metrics_connect_seconds"
+
+
+class PoolMetrics:
+    """
+    Counters for one connection pool: checkouts, time spent waiting for a checked-in
+    connection, checkout timeouts, connections opened and those beyond `pool_size` (overflow).
+
+    Wait percentiles are computed over the last `window` checkouts.
+
+    Args:
+        window (int, optional): Number of recent checkout waits kept for percentiles. Defaults to 1000.
+    """
+
+    def __init__(self, window: int = 1000):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.overflow_events = 0
+        self.connects = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            self._waits.append(seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def record_connect(self) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def record_overflow(self) -> None:
+        with self._lock:
+            self.overflow_events += 1
+
+    def _percentile(self, waits: list, percentile: float) -> float:
+        if not waits:
+            return 0.0
+        return waits[min(len(waits) - 1, int(len(waits) * percentile / 100))]
+
+    def stats(self, pool: Pool) -> Dict[str, Any]:
+        """
+        Reports the counters together with the pool's live state.
+
+        Args:
+            pool (Pool): The pool the counters belong to.
+
+        Returns:
+            Dict[str, Any]: Live connection counts, event counters and checkout wait times in ms.
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            counters = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "overflow_events": self.overflow_events,
+                "connects": self.connects,
+                "wait_ms": {
+                    "mean": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                    "p50": round(self._percentile(waits, 50) * 1000, 3),
+                    "p95": round(self._percentile(waits, 95) * 1000, 3),
+                    "max": round(self.wait_max * 1000, 3),
+                },
+            }
+        live = {"pool": type(pool).__mro__[1].__name__}
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            # SingletonThreadPool keeps `size` as a plain attribute
+            if callable(getattr(pool, name, None)):
+                live[name] = getattr(pool, name)()
+        return {**live, **counters}
+
+
+def instrumented_pool_class(base: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    Returns a subclass of `base` that records every checkout into `metrics`: the time spent
+    waiting for a checked-in connection, timeouts, connections opened, and new connections
+    beyond `pool_size` (overflow).
+
+    Connections are counted by the pool's `connect` event, so every pool class reports them.
+    Opening a new connection during a checkout is not waiting, so its duration is left out
+    of the checkout wait.
+
+    The subclass is passed to create_engine as `poolclass`. Pools recreated on dispose are
+    built from the same class, so they keep reporting to the same metrics.
+
+    Args:
+        base (Type[Pool]): The pool class the engine would use otherwise.
+        metrics (PoolMetrics): Where checkout waits and timeouts are recorded.
+
+    Returns:
+        Type[Pool]: The instrumented pool class.
+    """
+
+    def _create_connection(self):
+        # A queue pool counts a new connection before opening it, so checked now, before concurrent
+        # checkouts add theirs, a positive overflow means this one is beyond pool_size.
+        if hasattr(self, "overflow") and self.overflow() > 0:
+            metrics.record_overflow()
+        started = time.perf_counter()
+        record = base._create_connection(self)
+        record.info[_CONNECT_SECONDS] = time.perf_counter() - started
+        return record
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            record = base._do_get(self)
+        except PoolTimeoutError:
+            metrics.record_timeout()
+            raise
+        connecting = record.info.pop(_CONNECT_SECONDS, 0.0)
+        metrics.record_wait(max(0.0, time.perf_counter() - started - connecting))
+        return record
+
+    def _on_connect(dbapi_connection, connection_record):
+        metrics.record_connect()
+
+    def __init__(self, *args, **kwargs):
+        base.__init__(self, *args, **kwargs)
+        # A pool recreated on dispose is given the listeners of the one it replaces.
+        if "_dispatch" not in kwargs:
+            event.listen(self, "connect", _on_connect)
+
+    return type(f"Instrumented{base.__name__}", (base,), {
+        "__init__": __init__,
+        "_create_connection": _create_connection,
+        "_do_get": _do_get,
+        "metrics": metrics,
+    })
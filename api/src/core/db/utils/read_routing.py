@@ -0,0 +1,63 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import Any, Dict, Optional
+import threading
+import time
+
+
+class RecentWriters:
+    """
+    Remembers which users wrote in the last `window` seconds, so their reads can be sent to
+    the primary until a replica has had time to catch up ("read your own writes").
+
+    Args:
+        window (float): Seconds after a write during which the user's reads go to the primary.
+            0 turns read-your-writes off.
+        max_entries (int, optional): Entries kept before expired ones are pruned. Defaults to 10000.
+    """
+
+    def __init__(self, window: float, max_entries: int = 10000):
+        self.window = window
+        self.max_entries = max_entries
+        self._written_at: Dict[Any, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, user_id: Optional[Any]) -> None:
+        """
+        Records that `user_id` just wrote.
+
+        Args:
+            user_id (Optional[Any]): The writing user's ID; anonymous writes are not tracked.
+        """
+        if user_id is None or self.window <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._written_at.pop(user_id, None)
+            self._written_at[user_id] = now
+            if len(self._written_at) > self.max_entries:
+                self._prune(now)
+
+    def is_recent(self, user_id: Optional[Any]) -> bool:
+        """
+        Tells whether `user_id` wrote within the window.
+
+        Args:
+            user_id (Optional[Any]): The reading user's ID, or None if the request names no user.
+
+        Returns:
+            bool: True if the user's reads should go to the primary.
+        """
+        if user_id is None:
+            return False
+        with self._lock:
+            written_at = self._written_at.get(user_id)
+        return written_at is not None and time.monotonic() - written_at < self.window
+
+    def _prune(self, now: float) -> None:
+        # Entries are kept in write order, so expired ones are at the front.
+        for user_id, written_at in list(self._written_at.items()):
+            if now - written_at < self.window:
+                break
+            del self._written_at[user_id]
@@ -0,0 +1,108 @@
+#  Import Statements:
+
+#  Core modules:
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping
+import hashlib
+
+#  Third-party:
+from sqlalchemy import delete, exists, func, insert, select  # Version 2.0.36
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert  # Version 2.0.36
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # Version 2.0.36
+from sqlalchemy.ext.asyncio import AsyncSession  # Version 2.0.36
+
+#  Internal:
+from ...config.settings import Settings  # Version 2.9.2
+from ..models.query_model import QueryResponse
+from ..models.response_body_model import ResponseBody
+
+settings = Settings()
+
+# INSERT ... ON CONFLICT, by dialect; others insert only the hashes not stored yet
+_UPSERT = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def body_hash(text: str) -> str:
+    """Returns the content address of a response: the sha256 hex digest of its UTF-8 text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _response(row: Any) -> str:
+    return row["response"] if isinstance(row, Mapping) else row.response
+
+
+def _set_hash(row: Any, value: str) -> None:
+    if isinstance(row, dict):
+        row["response_hash"] = value
+    else:
+        row.response_hash = value
+
+
+async def store_response_bodies(db: AsyncSession, rows: Iterable[Any]) -> None:
+    """
+    Stores the responses of new rows in response_bodies, once per distinct text, and points the
+    rows at them by setting their response_hash. Runs in the caller's transaction, before the
+    rows are inserted.
+
+    A body that is already stored is not written again; only its `updated_at` is refreshed,
+    at most every half `RESPONSE_BODY_GC_GRACE_SECONDS`, so garbage collection cannot remove
+    it while the new row is being written.
+
+    Args:
+        db (AsyncSession): The session the rows will be written with.
+        rows (Iterable[Any]): QueryResponse objects or row dicts with a response.
+    """
+    bodies: Dict[str, str] = {}
+    for row in rows:
+        text = _response(row)
+        digest = body_hash(text)
+        bodies[digest] = text
+        _set_hash(row, digest)
+    if not bodies:
+        return
+    # Sorted so concurrent writers lock existing bodies in the same order.
+    values = [{"hash": digest, "body": bodies[digest]} for digest in sorted(bodies)]
+    dialect = db.get_bind().dialect.name
+    if dialect in _UPSERT:
+        touch_before = datetime.now(timezone.utc) - timedelta(seconds=settings.RESPONSE_BODY_GC_GRACE_SECONDS / 2)
+        statement = _UPSERT[dialect](ResponseBody).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=["hash"],
+            set_={"updated_at": func.now()},
+            where=ResponseBody.updated_at < touch_before,
+        )
+        await db.execute(statement)
+        return
+    stored = set((await db.execute(select(ResponseBody.hash).where(ResponseBody.hash.in_(list(bodies))))).scalars())
+    missing = [value for value in values if value["hash"] not in stored]
+    if missing:
+        await db.execute(insert(ResponseBody), missing)
+
+
+async def collect_response_bodies(db: AsyncSession, batch_size: int, grace_seconds: float) -> int:
+    """
+    Deletes response bodies no query response points at, in batches of at most `batch_size`,
+    each committed on its own. Bodies stored or reused in the last `grace_seconds` are kept.
+
+    Args:
+        db (AsyncSession): A session on the primary database.
+        batch_size (int): Maximum bodies deleted per transaction.
+        grace_seconds (float): Minimum time since a body was last stored or reused.
+
+    Returns:
+        int: The number of bodies deleted.
+    """
+    unused_before = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+    orphaned = (ResponseBody.updated_at < unused_before) & ~exists().where(QueryResponse.response_hash == ResponseBody.hash)
+    deleted, after_id = 0, 0
+    while True:
+        ids: List[int] = list((await db.execute(
+            select(ResponseBody.id).where(ResponseBody.id > after_id, orphaned).order_by(ResponseBody.id).limit(batch_size)
+        )).scalars())
+        if not ids:
+            return deleted
+        # Checked again on delete, in case a writer reused a body since it was selected.
+        result = await db.execute(delete(ResponseBody).where(ResponseBody.id.in_(ids), orphaned).execution_options(synchronize_session=False))
+        await db.commit()
+        deleted += result.rowcount
+        after_id = ids[-1]
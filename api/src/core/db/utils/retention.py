@@ -0,0 +1,334 @@
+#  Import Statements:
+
+#  Core modules:
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+import asyncio
+import gzip
+import json
+import os
+
+#  Third-party:
+from sqlalchemy import and_, delete, select  # Version 2.0.36
+from sqlalchemy.ext.asyncio import async_sessionmaker  # Version 2.0.36
+
+#  Internal:
+from ...config.settings import Settings  # Version 2.9.2
+from ..config import AsyncSessionLocal
+from ..models.query_model import QueryResponse
+from .response_bodies import collect_response_bodies
+from .search import remove_from_index
+
+settings = Settings()
+
+# Fields of archived rows. The response is read through the model, so deduplicated and
+# compressed bodies are archived as text.
+ARCHIVE_COLUMNS = (
+    QueryResponse.id,
+    QueryResponse.user_id,
+    QueryResponse.model,
+    QueryResponse.query,
+    QueryResponse.response,
+    QueryResponse.prompt_hash,
+    QueryResponse.created_at,
+    QueryResponse.updated_at,
+)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite returns naive datetimes; every stored timestamp is UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return _as_utc(value).isoformat()
+    return str(value)
+
+
+class ResponseArchive:
+    """
+    Append-only archive of pruned query responses: one gzip-compressed NDJSON file per
+    creation day (UTC), named query_responses-YYYY-MM-DD.ndjson.gz.
+
+    Each `append` adds a new gzip member to the end of the file, so nothing already written is
+    rewritten, and `gzip` reads all members back as one stream. Rows are archived before they
+    are deleted; a batch that is archived but fails to delete is archived again on the next
+    run, so `read` skips repeated IDs.
+
+    Args:
+        directory (str): Directory of the archive files; created if missing.
+    """
+
+    PREFIX = "query_responses-"
+    SUFFIX = ".ndjson.gz"
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, day: date) -> str:
+        return os.path.join(self.directory, f"{self.PREFIX}{day.isoformat()}{self.SUFFIX}")
+
+    def append(self, rows: Sequence[Mapping[str, Any]]) -> int:
+        """
+        Appends rows to the files of their creation days and syncs them to disk.
+
+        Args:
+            rows (Sequence[Mapping[str, Any]]): Column values of the rows, including created_at.
+
+        Returns:
+            int: The number of rows written.
+        """
+        by_day: Dict[date, List[Mapping[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_day[_as_utc(row["created_at"]).date()].append(row)
+        os.makedirs(self.directory, exist_ok=True)
+        for day, day_rows in by_day.items():
+            lines = "".join(json.dumps(dict(row), default=_json_default) + "\n" for row in day_rows)
+            member = gzip.compress(lines.encode("utf-8"))
+            with open(self.path(day), "ab") as archive_file:
+                size = archive_file.tell()
+                try:
+                    archive_file.write(member)
+                    archive_file.flush()
+                    os.fsync(archive_file.fileno())
+                except BaseException:
+                    # Never leave half a member behind: it would hide every member appended after it.
+                    archive_file.truncate(size)
+                    raise
+        return len(rows)
+
+    def days(self) -> List[Dict[str, Any]]:
+        """Lists the archived days, oldest first, with the size of each file in bytes."""
+        if not os.path.isdir(self.directory):
+            return []
+        days = []
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith(self.PREFIX) and name.endswith(self.SUFFIX):
+                day = name[len(self.PREFIX):-len(self.SUFFIX)]
+                days.append({"day": day, "bytes": os.path.getsize(os.path.join(self.directory, name))})
+        return days
+
+    def has(self, day: date) -> bool:
+        return os.path.isfile(self.path(day))
+
+    def read(self, day: date, user_id: Optional[int] = None) -> Iterator[str]:
+        """
+        Reads one day of archived rows back, in the order they were archived.
+
+        Args:
+            day (date): Creation day of the rows.
+            user_id (Optional[int], optional): Only rows of this user. Defaults to None.
+
+        Yields:
+            str: One NDJSON line per row.
+        """
+        if not self.has(day):
+            return
+        seen = set()
+        with gzip.open(self.path(day), "rt", encoding="utf-8") as archive_file:
+            for line in archive_file:
+                row = json.loads(line)
+                if row["id"] in seen or (user_id is not None and row["user_id"] != user_id):
+                    continue
+                seen.add(row["id"])
+                yield line
+
+
+class RetentionJob:
+    """
+    Deletes query responses older than their retention period, in small batches.
+
+    A row expires `user_days[user_id]` days after it was created, or `days` days after for
+    users without their own period; 0 keeps rows forever. Each batch selects at most
+    `batch_size` expired rows, archives them if an archive is configured, then deletes them
+    and their search index entries in its own short transaction, so locks are held briefly.
+    On PostgreSQL, rows are selected with SKIP LOCKED, so several processes may run the job.
+    Each run ends by deleting the response bodies no row points at any more.
+
+    Args:
+        session_factory (async_sessionmaker): Sessions on the primary database.
+        days (int): Retention period in days for every user; 0 keeps rows forever.
+        user_days (Dict[int, int]): Retention period per user ID, overriding `days`.
+        batch_size (int): Maximum rows deleted per transaction.
+        interval_seconds (float): Time between runs of the background task.
+        pause_ms (float): Pause between batches, so pruning leaves room for other writes.
+        archive (Optional[ResponseArchive], optional): Where rows are archived before deletion. Defaults to None.
+        body_grace_seconds (Optional[float], optional): How long an unused response body is kept
+            (see core/db/utils/response_bodies.py); None never deletes bodies. Defaults to None.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, days: int, user_days: Dict[int, int], batch_size: int, interval_seconds: float, pause_ms: float, archive: Optional[ResponseArchive] = None, body_grace_seconds: Optional[float] = None):
+        self.session_factory = session_factory
+        self.days = days
+        self.user_days = dict(user_days)
+        self.batch_size = batch_size
+        self.interval = interval_seconds
+        self.pause = pause_ms / 1000
+        self.archive = archive
+        self.body_grace_seconds = body_grace_seconds
+        self._lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.runs = 0
+        self.deleted = 0
+        self.archived = 0
+        self.bodies_collected = 0
+        self.failures = 0
+        self.last_run_at: Optional[datetime] = None
+        self.last_run_deleted = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any rows can expire under the configured periods."""
+        return self.days > 0 or any(days > 0 for days in self.user_days.values())
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def conditions(self, now: datetime) -> list:
+        """
+        Builds one WHERE condition per retention period matching the rows expired at `now`.
+
+        Args:
+            now (datetime): The current time.
+
+        Returns:
+            list: SQL conditions; empty if nothing expires.
+        """
+        conditions = [
+            and_(QueryResponse.user_id == user_id, QueryResponse.created_at < now - timedelta(days=days))
+            for user_id, days in sorted(self.user_days.items())
+            if days > 0
+        ]
+        if self.days > 0:
+            condition = QueryResponse.created_at < now - timedelta(days=self.days)
+            if self.user_days:
+                condition = and_(condition, QueryResponse.user_id.not_in(list(self.user_days)))
+            conditions.append(condition)
+        return conditions
+
+    async def prune_batch(self, condition) -> int:
+        """
+        Archives and deletes at most `batch_size` rows matching `condition`, oldest first.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        columns = ARCHIVE_COLUMNS if self.archive is not None else (QueryResponse.id,)
+        statement = (
+            select(*columns)
+            .where(condition)
+            .order_by(QueryResponse.created_at, QueryResponse.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with self.session_factory() as db:
+            if self.archive is not None:
+                rows = (await db.execute(statement)).mappings().all()
+                ids = [row["id"] for row in rows]
+            else:
+                rows, ids = [], list((await db.execute(statement)).scalars().all())
+            if not ids:
+                return 0
+            if rows:
+                self.archived += await asyncio.to_thread(self.archive.append, rows)
+            await remove_from_index(db, ids)
+            await db.execute(delete(QueryResponse).where(QueryResponse.id.in_(ids)).execution_options(synchronize_session=False))
+            await db.commit()
+        return len(ids)
+
+    async def run_once(self) -> int:
+        """
+        Deletes every expired row, one batch at a time, then the response bodies left unused.
+        Runs do not overlap: a run started while another is in progress waits for it.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        async with self._lock:
+            deleted = 0
+            try:
+                for condition in self.conditions(datetime.now(timezone.utc)):
+                    while not self._stopping:
+                        count = await self.prune_batch(condition)
+                        deleted += count
+                        self.deleted += count
+                        if count < self.batch_size:
+                            break
+                        await asyncio.sleep(self.pause)
+                if self.body_grace_seconds is not None and not self._stopping:
+                    async with self.session_factory() as db:
+                        self.bodies_collected += await collect_response_bodies(db, self.batch_size, self.body_grace_seconds)
+            except Exception as e:
+                self.failures += 1
+                self.last_error = str(e)
+                raise
+            finally:
+                self.runs += 1
+                self.last_run_at = datetime.now(timezone.utc)
+                self.last_run_deleted = deleted
+            return deleted
+
+    async def start(self) -> None:
+        """Starts the background pruning task. Called on application startup."""
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops the background task after the batch in progress. Called on application shutdown."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await self.run_once()
+            except Exception:
+                pass  # Counted in run_once; retried on the next run.
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "days": self.days,
+            "user_days": self.user_days,
+            "batch_size": self.batch_size,
+            "archive": self.archive.directory if self.archive is not None else None,
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "archived": self.archived,
+            "bodies_collected": self.bodies_collected,
+            "failures": self.failures,
+            "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+            "last_run_deleted": self.last_run_deleted,
+            "last_error": self.last_error,
+        }
+
+
+response_archive = ResponseArchive(settings.RETENTION_ARCHIVE_DIR) if settings.RETENTION_ARCHIVE_DIR else None
+retention = RetentionJob(
+    AsyncSessionLocal,
+    days=settings.RETENTION_DAYS,
+    user_days=settings.RETENTION_USER_DAYS,
+    batch_size=settings.RETENTION_BATCH_SIZE,
+    interval_seconds=settings.RETENTION_INTERVAL_SECONDS,
+    pause_ms=settings.RETENTION_BATCH_PAUSE_MS,
+    archive=response_archive,
+    body_grace_seconds=settings.RESPONSE_BODY_GC_GRACE_SECONDS,
+)
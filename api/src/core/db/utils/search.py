@@ -0,0 +1,183 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import Any, Dict, Iterable, List, Optional
+
+#  Third-party:
+from sqlalchemy import DateTime, bindparam, text  # Version 2.0.36
+from sqlalchemy.engine import Connection  # Version 2.0.36
+from sqlalchemy.ext.asyncio import AsyncSession  # Version 2.0.36
+from sqlalchemy.sql.elements import TextClause  # Version 2.0.36
+
+#  Internal:
+from ...config.settings import Settings  # Version 2.9.2
+from ...exceptions.base_exception import SearchUnavailableError  # Version 2.9.2
+from .compression import response_codec
+
+settings = Settings()
+
+# Full-text index of query_responses, created with the table (see core/db/models/query_model.py).
+# SQLite keeps its own copy of the text in an FTS5 table, so snippets work even when responses
+# are compressed. PostgreSQL keeps only a weighted tsvector per row, with a GIN index.
+SEARCH_DDL: Dict[str, List[str]] = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS query_responses_fts USING fts5(query, response, tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS query_responses_fts_delete AFTER DELETE ON query_responses "
+        "BEGIN DELETE FROM query_responses_fts WHERE rowid = old.id; END",
+    ],
+    "postgresql": [
+        "CREATE TABLE IF NOT EXISTS query_responses_search ("
+        "id BIGINT PRIMARY KEY REFERENCES query_responses (id) ON DELETE CASCADE, "
+        "user_id INTEGER NOT NULL, "
+        "document TSVECTOR NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_query_responses_search_document ON query_responses_search USING GIN (document)",
+        "CREATE INDEX IF NOT EXISTS ix_query_responses_search_user_id ON query_responses_search (user_id)",
+    ],
+}
+
+# Query returning the IDs already in the index, by dialect
+INDEXED_IDS = {
+    "sqlite": "SELECT rowid FROM query_responses_fts",
+    "postgresql": "SELECT id FROM query_responses_search",
+}
+
+_INSERT = {
+    "sqlite": "INSERT INTO query_responses_fts (rowid, query, response) VALUES (:id, :query, :response)",
+    # Matches in the query rank above matches in the response.
+    "postgresql": (
+        "INSERT INTO query_responses_search (id, user_id, document) VALUES (:id, :user_id, "
+        "setweight(to_tsvector(CAST(:language AS regconfig), :query), 'A') || "
+        "setweight(to_tsvector(CAST(:language AS regconfig), :response), 'B')) "
+        "ON CONFLICT (id) DO NOTHING"
+    ),
+}
+
+# SQLite removes deleted rows from the index with a trigger. PostgreSQL cascades from the foreign
+# key, which a partitioned query_responses cannot have (see scripts/partition_query_responses.py).
+_DELETE = {
+    "postgresql": "DELETE FROM query_responses_search WHERE id IN :ids",
+}
+
+
+def create_search_index(target, connection: Connection, **kwargs) -> None:
+    """
+    Creates the full-text index of query_responses. Registered as an `after_create` listener of
+    the table, so `Base.metadata.create_all` creates it too; safe to call again.
+
+    Args:
+        target: The table that was created.
+        connection (Connection): The connection the table was created on.
+    """
+    for statement in SEARCH_DDL.get(connection.dialect.name, []):
+        connection.execute(text(statement))
+
+
+def index_statement(dialect: str) -> Optional[TextClause]:
+    """Returns the INSERT adding rows to the index, or None if the dialect has no index."""
+    return text(_INSERT[dialect]) if dialect in _INSERT else None
+
+
+def index_params(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Builds the parameters of `index_statement` from QueryResponse objects or row mappings."""
+    return [
+        {
+            "id": _get(row, "id"),
+            "user_id": _get(row, "user_id"),
+            "query": _get(row, "query"),
+            "response": _get(row, "response"),
+            "language": settings.SEARCH_LANGUAGE,
+        }
+        for row in rows
+    ]
+
+
+def _get(row: Any, name: str) -> Any:
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+async def index_query_responses(db: AsyncSession, rows: Iterable[Any]) -> None:
+    """
+    Adds new query responses to the full-text index, in the caller's transaction so the index
+    commits or rolls back with the rows. The rows must already be flushed.
+
+    Args:
+        db (AsyncSession): The session the rows were written with.
+        rows (Iterable[Any]): QueryResponse objects or mappings with id, user_id, query and response.
+    """
+    statement = index_statement(db.get_bind().dialect.name)
+    params = index_params(rows)
+    if statement is not None and params:
+        await db.execute(statement, params)
+
+
+async def remove_from_index(db: AsyncSession, ids: List[int]) -> None:
+    """
+    Removes query responses from the full-text index, in the caller's transaction. Call it
+    when deleting rows with bulk statements.
+
+    Args:
+        db (AsyncSession): The session deleting the rows.
+        ids (List[int]): IDs of the deleted rows.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in _DELETE and ids:
+        await db.execute(text(_DELETE[dialect]).bindparams(bindparam("ids", expanding=True)), {"ids": list(ids)})
+
+
+def _match_expression(terms: str) -> str:
+    # Each whitespace-separated term becomes a quoted FTS5 string, so user input cannot use
+    # (or break on) the query syntax; terms are ANDed.
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms.split())
+
+
+async def search(db: AsyncSession, terms: str, user_id: Optional[int] = None, limit: int = 50, offset: int = 0) -> list:
+    """
+    Runs a ranked full-text search over stored queries and responses.
+
+    Args:
+        db (AsyncSession): Database session.
+        terms (str): The search terms; all of them must match.
+        user_id (Optional[int], optional): Only search this user's responses. Defaults to None.
+        limit (int, optional): Maximum number of rows. Defaults to 50.
+        offset (int, optional): Number of best matches to skip. Defaults to 0.
+
+    Returns:
+        list[Row]: Rows with id, user_id, model, query, created_at, rank (higher is better)
+        and snippet, best match first.
+
+    Raises:
+        SearchUnavailableError: If the database has no full-text index.
+    """
+    dialect = db.get_bind().dialect.name
+    params = {"user_id": user_id, "limit": limit, "offset": offset, "language": settings.SEARCH_LANGUAGE}
+    user_filter = "AND qr.user_id = :user_id" if user_id else ""
+    if dialect == "sqlite":
+        statement = text(
+            "SELECT qr.id, qr.user_id, qr.model, qr.query, qr.created_at, "
+            "-bm25(query_responses_fts) AS rank, "
+            "snippet(query_responses_fts, 1, '[', ']', '...', 16) AS snippet "
+            "FROM query_responses_fts JOIN query_responses qr ON qr.id = query_responses_fts.rowid "
+            f"WHERE query_responses_fts MATCH :match {user_filter} "
+            "ORDER BY bm25(query_responses_fts), qr.id DESC LIMIT :limit OFFSET :offset"
+        )
+        params["match"] = _match_expression(terms)
+    elif dialect == "postgresql":
+        # ts_headline needs the response text, which is not available in SQL once compressed.
+        snippet = "NULL" if response_codec is not None else (
+            "ts_headline(CAST(:language AS regconfig), "
+            "COALESCE(qr.response, (SELECT body FROM response_bodies WHERE hash = qr.response_hash)), search_query, "
+            "'StartSel=[, StopSel=], MaxWords=24, MinWords=8, MaxFragments=1')"
+        )
+        statement = text(
+            "SELECT qr.id, qr.user_id, qr.model, qr.query, qr.created_at, "
+            "ts_rank_cd(s.document, search_query) AS rank, "
+            f"{snippet} AS snippet "
+            "FROM query_responses_search s JOIN query_responses qr ON qr.id = s.id, "
+            "websearch_to_tsquery(CAST(:language AS regconfig), :terms) search_query "
+            f"WHERE s.document @@ search_query {user_filter.replace('qr.', 's.')} "
+            "ORDER BY rank DESC, qr.id DESC LIMIT :limit OFFSET :offset"
+        )
+        params["terms"] = terms
+    else:
+        raise SearchUnavailableError(detail=f"Full-text search is not supported on {dialect}.")
+    return (await db.execute(statement.columns(created_at=DateTime(timezone=True)), params)).all()
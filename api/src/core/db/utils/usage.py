@@ -0,0 +1,129 @@
+#  Import Statements:
+
+#  Core modules:
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+#  Third-party:
+from sqlalchemy import and_, func, insert, select, update  # Version 2.0.36
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert  # Version 2.0.36
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # Version 2.0.36
+from sqlalchemy.ext.asyncio import AsyncSession  # Version 2.0.36
+
+#  Internal:
+from ..models.usage_model import UsageDaily
+from ...utils.token_utils import count_tokens
+
+# Counters of usage_daily, added to on every stored response
+COUNTERS = ("queries", "prompt_tokens", "completion_tokens")
+
+# INSERT ... ON CONFLICT DO UPDATE, by dialect; others update, then insert if nothing matched
+_UPSERT = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+UsageKey = Tuple[int, date, str]
+
+
+def _get(row: Any, name: str) -> Any:
+    return row[name] if isinstance(row, Mapping) else getattr(row, name)
+
+
+def _created_at(row: Any) -> Optional[datetime]:
+    # Set by the database on insert; reading an ORM object's attribute before it is loaded would need IO.
+    return row.get("created_at") if isinstance(row, Mapping) else vars(row).get("created_at")
+
+
+def usage_day(created_at: Optional[datetime]) -> date:
+    """Returns the UTC day a response counts towards; rows not written yet count towards today."""
+    if created_at is None:
+        return datetime.now(timezone.utc).date()
+    # SQLite returns naive datetimes; every stored timestamp is UTC.
+    return created_at.date() if created_at.tzinfo is None else created_at.astimezone(timezone.utc).date()
+
+
+def usage_deltas(rows: Iterable[Any]) -> Dict[UsageKey, Dict[str, int]]:
+    """
+    Adds up the usage of query responses per (user ID, day, model).
+
+    Args:
+        rows (Iterable[Any]): QueryResponse objects or mappings with user_id, model, query,
+            response and created_at. Rows without a user are not counted.
+
+    Returns:
+        Dict[UsageKey, Dict[str, int]]: The counters of each key.
+    """
+    deltas: Dict[UsageKey, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for row in rows:
+        if _get(row, "user_id") is None:
+            continue
+        model = _get(row, "model")
+        counters = deltas[(_get(row, "user_id"), usage_day(_created_at(row)), model)]
+        counters["queries"] += 1
+        counters["prompt_tokens"] += count_tokens(_get(row, "query"), model)
+        counters["completion_tokens"] += count_tokens(_get(row, "response"), model)
+    return dict(deltas)
+
+
+def usage_values(deltas: Dict[UsageKey, Dict[str, int]]) -> List[Dict[str, Any]]:
+    """Turns `usage_deltas` into usage_daily rows, sorted by key so concurrent upserts lock rows in the same order."""
+    return [{"user_id": user_id, "day": day, "model": model, **deltas[(user_id, day, model)]} for user_id, day, model in sorted(deltas)]
+
+
+async def record_usage(db: AsyncSession, rows: Iterable[Any]) -> None:
+    """
+    Adds newly stored query responses to the usage aggregates, in the caller's transaction so
+    usage commits or rolls back with the rows.
+
+    Args:
+        db (AsyncSession): The session the rows were written with.
+        rows (Iterable[Any]): QueryResponse objects or row mappings.
+    """
+    values = usage_values(usage_deltas(rows))
+    if not values:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in _UPSERT:
+        statement = _UPSERT[dialect](UsageDaily).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=["user_id", "day", "model"],
+            set_={
+                **{counter: getattr(UsageDaily, counter) + statement.excluded[counter] for counter in COUNTERS},
+                "updated_at": func.now(),
+            },
+        )
+        await db.execute(statement)
+        return
+    for value in values:
+        result = await db.execute(
+            update(UsageDaily)
+            .where(UsageDaily.user_id == value["user_id"], UsageDaily.day == value["day"], UsageDaily.model == value["model"])
+            .values({counter: getattr(UsageDaily, counter) + value[counter] for counter in COUNTERS})
+        )
+        if result.rowcount == 0:
+            await db.execute(insert(UsageDaily).values(value))
+
+
+async def get_usage(db: AsyncSession, user_id: int, since: Optional[date] = None, until: Optional[date] = None, model: Optional[str] = None) -> List[UsageDaily]:
+    """
+    Retrieves a user's usage per day and model. Reads only the aggregate rows, so the cost
+    depends on the number of days and models, not on how many responses were stored.
+
+    Args:
+        db (AsyncSession): Database session.
+        user_id (int): The user.
+        since (Optional[date], optional): First day (inclusive). Defaults to None.
+        until (Optional[date], optional): Last day (exclusive). Defaults to None.
+        model (Optional[str], optional): Only this model. Defaults to None.
+
+    Returns:
+        List[UsageDaily]: Rows ordered by day, then model.
+    """
+    conditions = [UsageDaily.user_id == user_id]
+    if since is not None:
+        conditions.append(UsageDaily.day >= since)
+    if until is not None:
+        conditions.append(UsageDaily.day < until)
+    if model is not None:
+        conditions.append(UsageDaily.model == model)
+    result = await db.execute(select(UsageDaily).where(and_(*conditions)).order_by(UsageDaily.day, UsageDaily.model))
+    return list(result.scalars().all())
@@ -0,0 +1,347 @@
+#  Import Statements:
+
+#  Core modules:
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+
+#  Third-party:
+from sqlalchemy import insert  # Version 2.0.36
+
+#  Internal:
+from ...config.settings import Settings  # Version 2.9.2
+from ..config import AsyncSessionLocal
+from ..models.query_model import QueryResponse
+from .id_utils import IdGenerator, default_worker_id
+from .search import index_query_responses
+from .usage import record_usage
+from .response_bodies import store_response_bodies
+
+settings = Settings()
+logger = logging.getLogger(__name__)
+
+# Longest pause between flushes while inserts keep failing.
+RETRY_BACKOFF_MAX = 5.0
+
+
+async def insert_query_responses(rows: List[Dict[str, Any]]) -> None:
+    """
+    Inserts query response rows with one multi-row INSERT, after their response bodies, and
+    adds them to the full-text index and the usage aggregates, in a single transaction.
+
+    Args:
+        rows (List[Dict[str, Any]]): Column values of the rows, including their IDs.
+    """
+    async with AsyncSessionLocal() as db:
+        await store_response_bodies(db, rows)
+        # The response itself is in response_bodies; the row only points at it.
+        await db.execute(insert(QueryResponse), [{key: value for key, value in row.items() if key != "response"} for row in rows])
+        await index_query_responses(db, rows)
+        await record_usage(db, rows)
+        await db.commit()
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+class DeadLetterFile:
+    """
+    Append-only NDJSON file of rows the write-behind queue could not insert.
+
+    Each line holds the row, the error and the time it was given up on, so the rows can be
+    inspected and re-inserted once the cause is fixed.
+
+    Args:
+        path (str): Path of the file; its directory is created if missing.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, rows: List[Dict[str, Any]], error: str) -> None:
+        """
+        Appends rows to the file and syncs it to disk.
+
+        Args:
+            rows (List[Dict[str, Any]]): Column values of the rows.
+            error (str): Why the rows could not be inserted.
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        failed_at = datetime.now(timezone.utc)
+        with open(self.path, "a", encoding="utf-8") as dead_letter:
+            for row in rows:
+                dead_letter.write(json.dumps({"row": row, "error": error, "failed_at": failed_at}, default=_json_default) + "\n")
+            dead_letter.flush()
+            os.fsync(dead_letter.fileno())
+
+    def read(self) -> List[Dict[str, Any]]:
+        """
+        Returns the dead-lettered entries, oldest first.
+
+        Returns:
+            List[Dict[str, Any]]: One dict per row, with its "row", "error" and "failed_at".
+        """
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, encoding="utf-8") as dead_letter:
+            return [json.loads(line) for line in dead_letter if line.strip()]
+
+
+class WriteBehindQueue:
+    """
+    In-process queue that persists rows in batches off the request path.
+
+    Rows are flushed by a background task once `batch_size` rows are waiting or
+    `flush_interval_ms` has passed. When a batch fails to insert, it is bisected: every part
+    that inserts is written, so a row that cannot be inserted (e.g. one whose user was
+    deleted) does not hold up the others. A row whose failure is isolated this way in
+    `max_attempts` flushes goes to the dead letter, as does every row `stop` cannot drain.
+    When no part of a batch can be written the database is taken to be down: every row stays
+    queued, no attempts are counted, and flushes back off until it recovers.
+
+    Args:
+        flush_rows (Callable[[List[Dict[str, Any]]], Awaitable[None]]): Inserts a batch of rows in one transaction.
+        batch_size (int): Maximum rows per insert; reaching it triggers a flush.
+        flush_interval_ms (float): Longest time a row waits before a flush.
+        max_queue (int): Rows that may wait at once; `enqueue` refuses more.
+        id_field (str, optional): Key of the row's ID, used by `pending`. Defaults to "id".
+        dead_letter (DeadLetterFile, optional): Where rows that cannot be inserted are kept. Defaults to None (logged only).
+        max_attempts (int, optional): Flushes in which a row fails on its own before it is dead-lettered. Defaults to 5.
+    """
+
+    def __init__(
+        self,
+        flush_rows: Callable[[List[Dict[str, Any]]], Awaitable[None]],
+        batch_size: int,
+        flush_interval_ms: float,
+        max_queue: int,
+        id_field: str = "id",
+        dead_letter: Optional[DeadLetterFile] = None,
+        max_attempts: int = 5,
+    ):
+        self.flush_rows = flush_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_queue = max_queue
+        self.id_field = id_field
+        self.dead_letter = dead_letter
+        self.max_attempts = max_attempts
+        self._rows: Deque[Dict[str, Any]] = deque()
+        self._pending: Dict[Any, Dict[str, Any]] = {}
+        self._attempts: Dict[Any, int] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopped: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.rejected = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.dead_lettered = 0
+        self.last_error: Optional[str] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    def enqueue(self, row: Dict[str, Any]) -> bool:
+        """
+        Queues a row for insertion.
+
+        Args:
+            row (Dict[str, Any]): Column values of the row, including its ID.
+
+        Returns:
+            bool: False if the queue is not running or full; the caller must then write the row itself.
+        """
+        if not self.running or len(self._rows) >= self.max_queue:
+            self.rejected += 1
+            return False
+        self._rows.append(row)
+        self._pending[row[self.id_field]] = row
+        self.enqueued += 1
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def pending(self, row_id: Any) -> Optional[Dict[str, Any]]:
+        """
+        Returns a queued row that is not yet committed, so reads can see it.
+
+        Args:
+            row_id (Any): The row's ID.
+
+        Returns:
+            Optional[Dict[str, Any]]: The row, or None if it is not waiting in the queue.
+        """
+        return self._pending.get(row_id)
+
+    async def start(self) -> None:
+        """Starts the background flush task. Called on application startup."""
+        if self._task is None:
+            self._stopping = False
+            self._wakeup = asyncio.Event()
+            self._stopped = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stops accepting rows and waits until every queued row is written. Called on application shutdown."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        self._stopped.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    async def flush(self) -> bool:
+        """
+        Writes queued rows in batches of at most `batch_size`.
+
+        Returns:
+            bool: False if rows failed and are still queued for the next flush.
+        """
+        retry: List[Dict[str, Any]] = []
+        outage = False
+        while self._rows and not outage:
+            batch = [self._rows.popleft() for _ in range(min(self.batch_size, len(self._rows)))]
+            if await self._write(batch) is None:
+                continue
+            failed = await self._isolate(batch)
+            if failed is None:
+                # Nothing could be written: the database is failing, not the rows. Keep them all.
+                self._rows.extendleft(reversed(batch))
+                outage = True
+                continue
+            for row, error in failed:
+                row_id = row[self.id_field]
+                self._attempts[row_id] = self._attempts.get(row_id, 0) + 1
+                if self._attempts[row_id] >= self.max_attempts:
+                    self._give_up([row], error)
+                else:
+                    retry.append(row)
+        # Rows that failed on their own wait for the next flush, ahead of everything queued after them.
+        self._rows.extendleft(reversed(retry))
+        return not retry and not outage
+
+    async def _isolate(self, batch: List[Dict[str, Any]]) -> Optional[List[Tuple[Dict[str, Any], str]]]:
+        # Bisects a failed batch, writing every part that inserts, down to the rows that fail on
+        # their own. Gives up (None, nothing written) once as many parts as it takes to reach a
+        # single row twice have failed before any part was written, as happens while the database is down.
+        budget = 2 * max(1, (len(batch) - 1).bit_length()) + 1
+        failed: List[Tuple[Dict[str, Any], str]] = []
+        progress = {"written": False, "failures": 0}
+
+        async def bisect(rows: List[Dict[str, Any]]) -> bool:
+            if not progress["written"] and progress["failures"] >= budget:
+                return False
+            error = await self._write(rows)
+            if error is None:
+                progress["written"] = True
+                return True
+            progress["failures"] += 1
+            if len(rows) == 1:
+                failed.append((rows[0], error))
+                return True
+            middle = len(rows) // 2
+            return await bisect(rows[:middle]) and await bisect(rows[middle:])
+
+        if len(batch) == 1 or not await bisect(batch[:len(batch) // 2]) or not await bisect(batch[len(batch) // 2:]):
+            return None
+        return failed if progress["written"] else None
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> Optional[str]:
+        try:
+            await self.flush_rows(batch)
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            return self.last_error
+        for row in batch:
+            self._pending.pop(row[self.id_field], None)
+            self._attempts.pop(row[self.id_field], None)
+        self.flushed += len(batch)
+        self.batches += 1
+        return None
+
+    def _give_up(self, rows: List[Dict[str, Any]], error: str) -> None:
+        # Dead-lettered rows are no longer pending: reads must not return rows that were never stored.
+        for row in rows:
+            self._pending.pop(row[self.id_field], None)
+            self._attempts.pop(row[self.id_field], None)
+        self.dead_lettered += len(rows)
+        if self.dead_letter is not None:
+            try:
+                self.dead_letter.write(rows, error)
+            except OSError as e:
+                logger.error("Could not write %d query response rows to the dead letter %s: %s; rows: %r", len(rows), self.dead_letter.path, e, rows)
+                return
+            logger.error("Wrote %d query response rows that could not be inserted to %s: %s", len(rows), self.dead_letter.path, error)
+        else:
+            logger.error("Dropped %d query response rows that could not be inserted: %s; rows: %r", len(rows), error, rows)
+
+    async def _run(self) -> None:
+        delay = self.flush_interval
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if await self.flush():
+                delay = self.flush_interval
+                continue
+            # Back off while inserts fail, instead of retrying on every enqueue; `stop` cuts the wait short.
+            delay = min(max(2 * delay, 0.05), RETRY_BACKOFF_MAX)
+            try:
+                await asyncio.wait_for(self._stopped.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        # Drain on shutdown, backing off between attempts if the database is failing.
+        delay = self.flush_interval or 0.05
+        for _ in range(5):
+            if await self.flush():
+                return
+            await asyncio.sleep(delay)
+            delay *= 2
+        # Whatever is left would be lost with the process.
+        if self._rows:
+            rows = list(self._rows)
+            self._rows.clear()
+            self._give_up(rows, f"not written before shutdown: {self.last_error}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "depth": len(self._rows),
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "flushed": self.flushed,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+            "last_error": self.last_error,
+        }
+
+
+id_generator = IdGenerator(default_worker_id(settings.ID_WORKER_ID))
+write_behind = WriteBehindQueue(
+    insert_query_responses,
+    batch_size=settings.WRITE_BEHIND_BATCH_SIZE,
+    flush_interval_ms=settings.WRITE_BEHIND_FLUSH_INTERVAL_MS,
+    max_queue=settings.WRITE_BEHIND_MAX_QUEUE,
+    dead_letter=DeadLetterFile(settings.WRITE_BEHIND_DEAD_LETTER_PATH),
+    max_attempts=settings.WRITE_BEHIND_MAX_ATTEMPTS,
+)
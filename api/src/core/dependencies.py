@@ -1,6 +1,7 @@
 from fastapi import Depends, HTTPException
-from sqlalchemy.orm import Session
-from .database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from .db.utils.db_utils import get_db
+from .auth.utils.principal_cache import principal_cache
 
 # Specify version and import
 from fastapi.security import OAuth2PasswordBearer # Version: 0.115.2
@@ -46,22 +47,15 @@ from .schemas import Token # Version: 2.9.2
 # Specify version and import
 from .exceptions.base_exception import AuthenticationError # Version: 2.9.2
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
         username: str = payload.get("sub")
         if not username:
             raise AuthenticationError(detail="Could not validate credentials", status_code=401)
-        user = db.query(User).filter(User.email == username).first()
+        user = await principal_cache.get_user(db, username)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         return user
     except JWTError:
         raise AuthenticationError(detail="Could not validate credentials", status_code=401)
-
-def get_db():
-    db = get_db()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
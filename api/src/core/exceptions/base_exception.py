@@ -29,4 +29,31 @@ class DatabaseError(BaseException):
 
 
 class QueryError(BaseException):
-    """Exception raised when a query processing operation fails."""
\ No newline at end of file
+    """Exception raised when a query processing operation fails."""
+
+
+class PaginationError(BaseException):
+    """Exception raised when a pagination cursor is invalid."""
+
+
+class SearchUnavailableError(BaseException):
+    """Exception raised when the database has no full-text search support."""
+
+    def __init__(self, detail: str = "Full-text search is not available."):
+        super().__init__(status_code=501, detail=detail)
+
+
+class OverloadedError(BaseException):
+    """Exception raised when a request is rejected to shed load."""
+
+    def __init__(self, detail: str = "Too many requests, please retry later.", retry_after: int = 1):
+        super().__init__(status_code=429, detail=detail)
+        self.retry_after = retry_after
+
+
+
+class CircuitOpenError(BaseException):
+    """Exception raised when a model's circuit breaker is open."""
+
+    def __init__(self, detail: str = "The model is temporarily unavailable."):
+        super().__init__(status_code=503, detail=detail)
@@ -1,28 +1,101 @@
-from fastapi import APIRouter
-from typing import Optional
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional, Union
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..db.utils import db_utils
+from ..auth.models.auth_model import User
+from ..auth.services.auth_service import get_current_user, visible_user_id
+from ..db.utils.db_utils import get_db, get_read_db
 from .services import query_service
-from .schemas import QueryRequest, QueryResponse
-from ..exceptions.base_exception import QueryError
+from .schemas import BatchQueryResult, QueryRequest, QueryResponse, QueryResponseSummary, QuerySearchResult
+from ..exceptions.base_exception import CircuitOpenError, OverloadedError, PaginationError, QueryError, SearchUnavailableError
+from ..config.settings import Settings
+from ..utils.pagination import Page, decode_cursor, decode_offset_cursor, make_offset_page, make_page
+
+settings = Settings()
+
+# Content types of the export formats
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
 
 query_router = APIRouter(prefix="/query", tags=["query"])
 
-@query_router.get("/responses", response_model=list[QueryResponse])
-async def get_query_responses(db: Session = Depends(get_db), user_id: Optional[int] = None):
-    """Retrieves a list of query responses, optionally filtered by user ID."""
+@query_router.get("/responses", response_model=Union[Page[QueryResponse], Page[QueryResponseSummary]])
+async def get_query_responses(
+    db: AsyncSession = Depends(get_read_db),
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    view: str = Query("full", pattern="^(full|summary)$"),
+):
+    """Retrieves a page of query responses, optionally filtered by user ID and creation time.
+
+    `since` is inclusive and `until` exclusive. Pass the returned `next_cursor` as `cursor`
+    to get the next page. `view=summary` returns QueryResponseSummary items, with a preview
+    instead of the full response text.
+    """
+    try:
+        after_id = decode_cursor(cursor)
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
     try:
-        if user_id:
-            return db.query(QueryResponse).filter(QueryResponse.user_id == user_id).all()
-        return db.query(QueryResponse).all()
+        return make_page(await db_utils.list_query_responses(db, view, user_id, after_id=after_id, limit=limit + 1, since=since, until=until), limit)
     except Exception as e:
         raise QueryError(detail=f"Error retrieving query responses: {e}")
 
+@query_router.get("/responses/export")
+async def export_query_responses(
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    current_user: User = Depends(get_current_user),
+):
+    """Streams query responses as NDJSON or CSV, optionally filtered by user ID and creation time.
+
+    Users only export their own responses; administrators export anyone's, or everyone's
+    without `user_id`.
+    """
+    user_id = visible_user_id(current_user, user_id)
+    return StreamingResponse(
+        query_service.export_query_responses(user_id, since, until, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="query_responses.{export_format}"'},
+    )
+
+@query_router.get("/responses/search", response_model=Page[QuerySearchResult])
+async def search_query_responses(
+    q: str = Query(..., min_length=1, max_length=256),
+    db: AsyncSession = Depends(get_read_db),
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT),
+    current_user: User = Depends(get_current_user),
+):
+    """Searches stored queries and responses, best matches first, optionally for one user.
+
+    Every term in `q` must match. Pass the returned `next_cursor` as `cursor` to get the next page.
+    Users only search their own responses; administrators search anyone's, or everyone's
+    without `user_id`.
+    """
+    user_id = visible_user_id(current_user, user_id)
+    try:
+        offset = decode_offset_cursor(cursor)
+    except PaginationError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    try:
+        rows = await db_utils.search_query_responses(db, q, user_id, limit=limit + 1, offset=offset)
+    except SearchUnavailableError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return make_offset_page(rows, limit, offset)
+
 @query_router.get("/responses/{query_id}", response_model=QueryResponse)
-async def get_query_response(query_id: int, db: Session = Depends(get_db)):
+async def get_query_response(query_id: int, db: AsyncSession = Depends(get_read_db)):
     """Retrieves a specific query response by ID."""
     try:
-        query_response = db.query(QueryResponse).filter(QueryResponse.id == query_id).first()
+        query_response = await db_utils.get_query_response(db, query_id)
         if not query_response:
             raise HTTPException(status_code=404, detail="Query response not found")
         return query_response
@@ -30,10 +103,38 @@ async def get_query_response(query_id: int, db: Session = Depends(get_db)):
         raise QueryError(detail=f"Error retrieving query response: {e}")
 
 @query_router.post("/", response_model=QueryResponse)
-async def process_query(query_request: QueryRequest, db: Session = Depends(get_db)):
-    """Processes a user query using OpenAI's API and stores the response."""
+async def process_query(query_request: QueryRequest, stream: bool = False, db: AsyncSession = Depends(get_db)):
+    """Processes a user query using OpenAI's API and stores the response.
+
+    With `stream=true` the response is relayed as Server-Sent Events while it is generated.
+    """
+    if stream:
+        return StreamingResponse(
+            query_service.stream_query(query_request),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+    try:
+        db_query = await query_service.process_query(query_request, db)
+        return QueryResponse(
+            id=db_query.id,
+            query=db_query.query,
+            model=db_query.model,
+            response=db_query.response,
+            user_id=db_query.user_id,
+            fallback=db_query.fallback,
+        )
+    except OverloadedError as e:
+        raise HTTPException(status_code=429, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=e.detail)
+    except Exception as e:
+        raise QueryError(detail=f"Error processing query: {e}")
+
+@query_router.post("/batch", response_model=list[BatchQueryResult])
+async def process_queries(query_requests: list[QueryRequest], db: AsyncSession = Depends(get_db)):
+    """Processes a list of queries concurrently and stores all responses in one transaction."""
     try:
-        response_text = await query_service.process_query(query_request, db)
-        return QueryResponse(query=query_request.query, model=query_request.model, response=response_text)
+        return await query_service.process_queries(query_requests, db)
     except Exception as e:
-        raise QueryError(detail=f"Error processing query: {e}")
\ No newline at end of file
+        raise QueryError(detail=f"Error processing queries: {e}")
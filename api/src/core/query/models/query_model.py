@@ -1,14 +1,53 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, Index, Integer, String, ForeignKey, event, func, select
+from sqlalchemy.orm import column_property, relationship
 
 from .base import Base
+from ...db.models.response_body_model import ResponseBody
+from ...db.utils.compression import response_text_type
+from ...db.utils.search import create_search_index
 
 class QueryResponse(Base):
     __tablename__ = "query_responses"
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        # Keyset pagination of a user's responses: WHERE user_id = ? AND id > ? ORDER BY id
+        Index("ix_query_responses_user_id_id", "user_id", "id"),
+        # Prior-answer lookup: WHERE model = ? AND prompt_hash = ? ORDER BY id DESC
+        Index("ix_query_responses_model_prompt_hash_id", "model", "prompt_hash", "id"),
+        # Time-range reads of a user's responses: WHERE user_id = ? AND created_at >= ? AND created_at < ?
+        Index("ix_query_responses_user_id_created_at", "user_id", "created_at"),
+        # Retention pruning across users: WHERE created_at < ? ORDER BY created_at
+        Index("ix_query_responses_created_at", "created_at"),
+        # Garbage collection of response bodies: WHERE response_hash = ?
+        Index("ix_query_responses_response_hash", "response_hash"),
+    )
+    # IDs may be assigned by the application (see core/db/utils/id_utils.py), so they need 64 bits.
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     query = Column(String, nullable=False)
     model = Column(String, nullable=False)
-    response = Column(Text, nullable=False)
+    # sha256 of the response text, which is stored once in response_bodies (see core/db/utils/response_bodies.py)
+    response_hash = Column(String(64), ForeignKey("response_bodies.hash"), nullable=True)
+    # Inline text (or compressed bytes, see core/db/utils/compression.py) of rows written before
+    # deduplication, or without a response_hash; NULL otherwise
+    response_text = Column("response", response_text_type(), nullable=True)
+    # The response, wherever it is stored; read-only in SQL, and kept as assigned on new objects
+    response = column_property(
+        func.coalesce(
+            response_text,
+            select(ResponseBody.body).where(ResponseBody.hash == response_hash).correlate_except(ResponseBody).scalar_subquery(),
+        ),
+        expire_on_flush=False,
+    )
+    # sha256 of the model, normalized prompt and generation params (query_utils.make_cache_key)
+    prompt_hash = Column(String(64), nullable=True)
 
-    user = relationship("User", backref="query_responses")
\ No newline at end of file
+    user = relationship("User", backref="query_responses")
+
+def store_response_inline(mapper, connection, target):
+    """Keeps the text of rows flushed without a response_hash in the inline column."""
+    if target.response_hash is None:
+        target.response_text = vars(target).get("response")
+
+# The full-text index is created with the table (see core/db/utils/search.py)
+event.listen(QueryResponse.__table__, "after_create", create_search_index)
+event.listen(QueryResponse, "before_insert", store_response_inline)
@@ -1,5 +1,6 @@
 from pydantic import BaseModel, validator
-from typing import Optional
+from typing import List, Optional
+from datetime import date, datetime
 
 # Import the openai package (version 1.52.0) to interact with the OpenAI API.
 # This is used for processing queries and generating AI responses.
@@ -57,9 +58,113 @@ class QueryResponse(BaseModel):
         model (str): The OpenAI model used to process the query.
         response (str): The AI-generated response text.
         user_id (Optional[int]): The user's ID, if the query is associated with a user.
+        fallback (Optional[str]): Set when the requested model was unavailable: "stored" for a
+            previously stored answer, or "model:<name>" for the model that answered instead.
     """
     id: int
     query: str
     model: str
     response: str
-    user_id: Optional[int] = None
\ No newline at end of file
+    user_id: Optional[int] = None
+    fallback: Optional[str] = None
+
+
+class QueryResponseSummary(BaseModel):
+    """
+    Defines the slim schema of a query response in `view=summary` listings.
+
+    Attributes:
+        id (int): The unique ID of the query response.
+        query (str): The user's query text.
+        model (str): The OpenAI model used to process the query.
+        user_id (Optional[int]): The user's ID, if the query is associated with a user.
+        created_at (Optional[datetime]): When the response was stored.
+        response_preview (str): The first `SUMMARY_PREVIEW_CHARS` characters of the response.
+    """
+    id: int
+    query: str
+    model: str
+    user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    response_preview: str
+
+
+class QuerySearchResult(BaseModel):
+    """
+    Defines the schema of one full-text search match.
+
+    Attributes:
+        id (int): The unique ID of the query response.
+        query (str): The user's query text.
+        model (str): The OpenAI model used to process the query.
+        user_id (Optional[int]): The user's ID, if the query is associated with a user.
+        created_at (Optional[datetime]): When the response was stored.
+        rank (float): Relevance of the match; higher is better.
+        snippet (Optional[str]): Excerpt of the response with matched terms in [brackets],
+            when the database can produce one.
+    """
+    id: int
+    query: str
+    model: str
+    user_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    rank: float
+    snippet: Optional[str] = None
+
+
+class UsageDay(BaseModel):
+    """
+    Defines the schema of one user's usage of one model on one day.
+
+    Attributes:
+        day (date): The UTC day.
+        model (str): The OpenAI model used.
+        queries (int): Number of stored query responses.
+        prompt_tokens (int): Tokens of the queries.
+        completion_tokens (int): Tokens of the responses.
+    """
+    day: date
+    model: str
+    queries: int
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class UsageReport(BaseModel):
+    """
+    Defines the schema of a user's usage over a range of days.
+
+    Attributes:
+        user_id (int): The user's ID.
+        since (Optional[date]): First day of the range (inclusive), if bounded.
+        until (Optional[date]): Last day of the range (exclusive), if bounded.
+        queries (int): Total stored query responses in the range.
+        prompt_tokens (int): Total tokens of the queries.
+        completion_tokens (int): Total tokens of the responses.
+        days (List[UsageDay]): Usage per day and model, oldest first.
+    """
+    user_id: int
+    since: Optional[date] = None
+    until: Optional[date] = None
+    queries: int
+    prompt_tokens: int
+    completion_tokens: int
+    days: List[UsageDay]
+
+
+class BatchQueryResult(BaseModel):
+    """
+    Defines the schema for one item of a batch query response.
+
+    Attributes:
+        index (int): Position of the query in the batch request.
+        query_id (Optional[int]): The ID of the stored query response, if the query succeeded.
+        response (Optional[str]): The AI-generated response text, if the query succeeded.
+        fallback (Optional[str]): The fallback used, if the requested model was unavailable.
+        error (Optional[str]): The error message, if the query failed.
+    """
+    index: int
+    query_id: Optional[int] = None
+    response: Optional[str] = None
+    fallback: Optional[str] = None
+    error: Optional[str] = None
@@ -1,20 +1,188 @@
 from fastapi import HTTPException
-from sqlalchemy.orm import Session
-from typing import Optional
-import openai
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, List, Optional, Tuple
+from datetime import datetime, timezone
+import asyncio
+from openai import APIError
 
 from ..config.settings import Settings
 from ..database import get_db
 from ..models import QueryResponse, User
-from ..schemas import QueryRequest, QueryResponse as QueryResponseSchema
-from ..utils.db_utils import create_query_response
-from ..exceptions.base_exception import QueryError
+from ..schemas import BatchQueryResult, QueryRequest, QueryResponse as QueryResponseSchema
+from ..utils.db_utils import EXPORT_COLUMNS, create_query_response, create_query_responses, get_latest_query_response, stream_query_responses
+from ..exceptions.base_exception import CircuitOpenError, OverloadedError, QueryError
+from ..utils.query_utils import format_csv, format_ndjson, format_sse, make_cache_key
+from ...utils.admission import AdmissionController
+from ...utils.cache import TTLCache
+from ...utils.circuit_breaker import CLOSED, CircuitBreakerRegistry
+from ...utils.micro_batcher import MicroBatcher
+from ...utils.singleflight import SingleFlight
+from ...utils.openai_utils import make_openai_batch_request, make_openai_request, stream_openai_request
+from ...db.config import AsyncSessionLocal, read_sessionmaker
 
 settings = Settings()
-openai.api_key = settings.OPENAI_API_KEY
 
+MAX_TOKENS = 1024
+TEMPERATURE = 0.5
 
-async def process_query(query_request: QueryRequest, db: Session):
+response_cache = TTLCache(maxsize=settings.CACHE_SIZE, ttl=settings.CACHE_TTL)
+in_flight = SingleFlight()
+admission = AdmissionController(settings)
+circuit_breakers = CircuitBreakerRegistry(settings)
+
+
+async def _complete_batch(prompts: List[str], model: str, **params) -> List[str]:
+    # Admission limits upstream calls, so a micro-batch holds one slot however many prompts it carries.
+    async with admission.acquire(model):
+        return await make_openai_batch_request(prompts, model, **params)
+
+
+micro_batcher = MicroBatcher(
+    _complete_batch,
+    max_batch_size=settings.MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=settings.MICRO_BATCH_MAX_WAIT_MS,
+)
+
+
+def make_prompt_hash(query_request: QueryRequest) -> str:
+    """Identifies a request's model, normalized prompt and generation params.
+
+    The hash is both the response cache key and the `prompt_hash` stored with the response.
+
+    Args:
+        query_request: The QueryRequest object containing the user's query and model selection.
+
+    Returns:
+        str: A hex digest.
+    """
+    return make_cache_key(query_request.model, query_request.query, max_tokens=MAX_TOKENS, temperature=TEMPERATURE)
+
+
+async def generate_response(query_request: QueryRequest, db: Optional[AsyncSession] = None) -> str:
+    """Generates the AI response for a query.
+
+    Repeated prompts are served from the response cache, then, if a database session is
+    given, from the latest stored answer to the same prompt. Identical requests that
+    arrive while one is already in flight share its upstream call.
+
+    Args:
+        query_request: The QueryRequest object containing the user's query and model selection.
+        db: Optional database session used to look up stored answers.
+
+    Returns:
+        str: The AI-generated response text.
+    """
+    response_text, _ = await _generate(query_request, db)
+    return response_text
+
+
+async def _generate(query_request: QueryRequest, db: Optional[AsyncSession]) -> Tuple[str, bool]:
+    # Also tells whether the text was reused (cache or stored row) rather than answered by the model.
+    cache_key = make_prompt_hash(query_request)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cached["response"], True
+    if db is not None:
+        stored = await _stored_answer(db, query_request, cache_key)
+        if stored is not None:
+            return stored, True
+    return await in_flight.do(cache_key, lambda: _complete(query_request, cache_key)), False
+
+
+async def _stored_answer(db: AsyncSession, query_request: QueryRequest, cache_key: str) -> Optional[str]:
+    if not settings.PROMPT_HASH_LOOKUP_ENABLED:
+        return None
+    max_age = settings.PROMPT_HASH_MAX_AGE or None
+    stored = await get_latest_query_response(db, query_request.model, cache_key, max_age=max_age)
+    if stored is None:
+        return None
+    # Cached no longer than the answer may still be reused, so caching cannot extend its life.
+    ttl = None
+    if max_age is not None:
+        created_at = stored.created_at if stored.created_at.tzinfo else stored.created_at.replace(tzinfo=timezone.utc)
+        ttl = max(0.0, max_age - (datetime.now(timezone.utc) - created_at).total_seconds())
+    response_cache.set(cache_key, {"model": query_request.model, "query": query_request.query, "response": stored.response}, ttl=ttl)
+    return stored.response
+
+
+async def _complete(query_request: QueryRequest, cache_key: str) -> str:
+    breaker = circuit_breakers.get(query_request.model)
+    breaker.before_call()
+    try:
+        if settings.MICRO_BATCH_ENABLED:
+            # The slot is taken by the batch's upstream call (see _complete_batch), whose queue
+            # deadline then applies to every prompt in it; only a full queue is rejected here.
+            admission.check(query_request.model)
+            response_text = await micro_batcher.submit(
+                query_request.query,
+                query_request.model,
+                max_tokens=MAX_TOKENS,
+                temperature=TEMPERATURE,
+            )
+        else:
+            async with admission.acquire(query_request.model):
+                response_text = await make_openai_request(
+                    query_request.query,
+                    query_request.model,
+                    max_tokens=MAX_TOKENS,
+                    temperature=TEMPERATURE,
+                )
+    except (OverloadedError, asyncio.CancelledError):
+        # Rejected or abandoned before the model answered: says nothing about the model's health.
+        breaker.release()
+        raise
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    response_cache.set(cache_key, {"model": query_request.model, "query": query_request.query, "response": response_text})
+    return response_text
+
+
+async def answer_query(query_request: QueryRequest, db: AsyncSession) -> Tuple[QueryRequest, str, Optional[str]]:
+    """Generates the AI response for a query, falling back while the model's circuit is open.
+
+    While the circuit breaker of the requested model is open, the most recent stored answer
+    to the same prompt is returned; if there is none, the query is sent to the next model in
+    `Settings.OPENAI_MODELS` whose circuit is not open.
+
+    Args:
+        query_request: The QueryRequest object containing the user's query and model selection.
+        db: Database session.
+
+    Returns:
+        tuple: The request as actually answered (its model may differ), the response text, the
+        fallback used ("stored" or "model:<name>") or None if the requested model answered, and
+        the prompt hash to store with the response. The hash is None when the text was reused
+        rather than answered by the model, so stored-answer lookups only find model answers
+        and `PROMPT_HASH_MAX_AGE` counts from when the model gave them.
+
+    Raises:
+        CircuitOpenError: If the model is unavailable and no fallback could answer.
+    """
+    try:
+        response_text, reused = await _generate(query_request, db)
+        return query_request, response_text, None, None if reused else make_prompt_hash(query_request)
+    except CircuitOpenError as circuit_error:
+        stored = await get_latest_query_response(db, query_request.model, make_prompt_hash(query_request))
+        if stored is not None:
+            return query_request, stored.response, "stored", None
+
+        models = [model_config.name for model_config in settings.OPENAI_MODELS]
+        start = models.index(query_request.model) + 1 if query_request.model in models else 0
+        for model in models[start:] + models[:start]:
+            if model == query_request.model:
+                continue
+            fallback_request = query_request.copy(update={"model": model})
+            try:
+                response_text, reused = await _generate(fallback_request, db)
+                return fallback_request, response_text, f"model:{model}", None if reused else make_prompt_hash(fallback_request)
+            except CircuitOpenError:
+                continue
+        raise circuit_error
+
+
+async def process_query(query_request: QueryRequest, db: AsyncSession):
     """Processes a user query using OpenAI's API and stores the response in the database.
 
     Args:
@@ -23,24 +191,164 @@ async def process_query(query_request: QueryRequest, db: Session):
 
     Returns:
         QueryResponse: The newly created QueryResponse object containing the AI-generated response.
+            Its `fallback` attribute tells whether a fallback answered (see `answer_query`).
 
     Raises:
         QueryError: If an error occurs during query processing or database interaction.
+        OverloadedError: If the model's admission queue is full or the queue deadline passes.
+        CircuitOpenError: If the model is unavailable and no fallback could answer.
     """
     try:
-        response = openai.Completion.create(
-            engine=query_request.model,
-            prompt=query_request.query,
-            max_tokens=1024,
-            temperature=0.5,
-        )
-        response_text = response.choices[0].text
+        answered_request, response_text, fallback, prompt_hash = await answer_query(query_request, db)
 
         # Store the query and response in the database
-        db_query = create_query_response(db, query_request, response_text)
+        db_query = await create_query_response(db, answered_request, response_text, prompt_hash)
+        db_query.fallback = fallback
 
         return db_query
-    except openai.error.APIError as e:
+    except (QueryError, OverloadedError, CircuitOpenError):
+        raise
+    except APIError as e:
         raise QueryError(detail=f"OpenAI API error: {e}")
     except Exception as e:
-        raise QueryError(detail=f"Error processing query: {e}")
\ No newline at end of file
+        raise QueryError(detail=f"Error processing query: {e}")
+
+
+async def process_queries(query_requests: List[QueryRequest], db: AsyncSession) -> List[BatchQueryResult]:
+    """Processes several queries concurrently and stores all responses in one transaction.
+
+    At most `QUERY_BATCH_CONCURRENCY` queries are sent to the model at a time. A failed
+    query does not fail the batch; its error is reported in its own result item.
+
+    Args:
+        query_requests: The queries to process.
+        db: Database session.
+
+    Returns:
+        list[BatchQueryResult]: One result per query, in input order.
+
+    Raises:
+        QueryError: If the batch is too large or the responses cannot be stored.
+    """
+    if len(query_requests) > settings.QUERY_BATCH_MAX_SIZE:
+        raise QueryError(detail=f"Batch contains {len(query_requests)} queries, the maximum is {settings.QUERY_BATCH_MAX_SIZE}")
+
+    semaphore = asyncio.Semaphore(settings.QUERY_BATCH_CONCURRENCY)
+
+    async def run(query_request: QueryRequest) -> Tuple[QueryRequest, str, Optional[str], Optional[str]]:
+        # A session must not be shared between concurrent tasks; sessions only connect on first use.
+        async with semaphore, AsyncSessionLocal() as query_db:
+            return await answer_query(query_request, query_db)
+
+    outcomes = await asyncio.gather(*(run(query_request) for query_request in query_requests), return_exceptions=True)
+
+    completed = [index for index, outcome in enumerate(outcomes) if not isinstance(outcome, BaseException)]
+    query_ids = await create_query_responses(db, [
+        (answered_request, response_text, prompt_hash)
+        for answered_request, response_text, _, prompt_hash in (outcomes[index] for index in completed)
+    ])
+    stored = dict(zip(completed, query_ids))
+
+    results = []
+    for index, outcome in enumerate(outcomes):
+        if index in stored:
+            _, response_text, fallback, _ = outcome
+            results.append(BatchQueryResult(index=index, query_id=stored[index], response=response_text, fallback=fallback))
+        else:
+            results.append(BatchQueryResult(index=index, error=getattr(outcome, "detail", None) or str(outcome)))
+    return results
+
+
+async def stream_query(query_request: QueryRequest) -> AsyncIterator[str]:
+    """Streams the AI response for a query as Server-Sent Events and stores it once complete.
+
+    Each fragment is sent as a `data` event as soon as it arrives from the model. When the
+    stream ends the assembled text is stored and a final `done` event carries the query ID.
+    If the client disconnects, the generator is closed and the upstream stream with it;
+    nothing is stored for an aborted stream.
+
+    Args:
+        query_request: The QueryRequest object containing the user's query and model selection.
+
+    Yields:
+        str: Encoded Server-Sent Events.
+    """
+    cache_key = make_prompt_hash(query_request)
+    cached = response_cache.get(cache_key)
+    breaker = circuit_breakers.get(query_request.model)
+    answered_request, fallback, prompt_hash = query_request, None, cache_key
+    chunks = []
+    # The request's session is already closed while the body streams, so use a dedicated one.
+    db = AsyncSessionLocal()
+    try:
+        cached_text = cached["response"] if cached is not None else await _stored_answer(db, query_request, cache_key)
+        if cached_text is not None:
+            # Reused, so not a candidate for later stored-answer lookups (see answer_query).
+            prompt_hash = None
+            chunks.append(cached_text)
+            yield format_sse({"text": cached_text})
+        elif breaker.state != CLOSED:
+            answered_request, response_text, fallback, prompt_hash = await answer_query(query_request, db)
+            chunks.append(response_text)
+            yield format_sse({"text": response_text})
+        else:
+            breaker.before_call()
+            try:
+                async with admission.acquire(query_request.model):
+                    async for text in stream_openai_request(
+                        query_request.query,
+                        query_request.model,
+                        max_tokens=MAX_TOKENS,
+                        temperature=TEMPERATURE,
+                    ):
+                        chunks.append(text)
+                        yield format_sse({"text": text})
+            except (OverloadedError, asyncio.CancelledError, GeneratorExit):
+                breaker.release()
+                raise
+            except Exception:
+                breaker.record_failure()
+                raise
+            breaker.record_success()
+        response_text = "".join(chunks)
+        if fallback is None:
+            response_cache.set(cache_key, {"model": query_request.model, "query": query_request.query, "response": response_text})
+
+        db_query = await create_query_response(db, answered_request, response_text, prompt_hash)
+        yield format_sse({"query_id": db_query.id, "fallback": fallback}, event="done")
+    except Exception as e:
+        yield format_sse({"detail": getattr(e, "detail", str(e))}, event="error")
+    finally:
+        await db.close()
+
+
+async def export_query_responses(
+    user_id: Optional[int] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    export_format: str = "ndjson",
+) -> AsyncIterator[str]:
+    """Streams stored query responses as NDJSON or CSV, one chunk per fetched batch.
+
+    Rows come from a server-side cursor `EXPORT_BATCH_SIZE` at a time and are encoded as
+    they arrive, so memory use does not depend on the size of the export.
+
+    Args:
+        user_id: Optional user ID to filter responses by.
+        since: Optional lower bound (inclusive) on the creation time.
+        until: Optional upper bound (exclusive) on the creation time.
+        export_format: "ndjson" (one JSON object per line) or "csv" (with a header row).
+
+    Yields:
+        str: Encoded rows.
+    """
+    # The request's session is already closed while the body streams, so use a dedicated one,
+    # on the replica if there is one.
+    async with read_sessionmaker(user_id)() as db:
+        if export_format == "csv":
+            yield format_csv([EXPORT_COLUMNS])
+        async for rows in stream_query_responses(db, user_id, since, until, batch_size=settings.EXPORT_BATCH_SIZE):
+            if export_format == "csv":
+                yield format_csv([[row[column] for column in EXPORT_COLUMNS] for row in rows])
+            else:
+                yield format_ndjson(rows)
@@ -1,7 +1,11 @@
 #  Import Statements:
 
 #  Core modules:
-from typing import Optional
+from typing import Any, Iterable, Mapping, Optional, Sequence
+import csv
+import hashlib
+import io
+import json
 
 #  Third-party:
 from fastapi import HTTPException # Version 0.115.2 
@@ -40,4 +44,76 @@ def format_response(response: str, query_response: QueryResponse, user_id: Optio
         "updated_at": format_datetime(query_response.updated_at),
         "user_id": user_id,
     }
-    return formatted_response
\ No newline at end of file
+    return formatted_response
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Normalizes a prompt so that trivially different copies of the same question compare equal.
+
+    Args:
+        prompt (str): The user's query text.
+
+    Returns:
+        str: The prompt with surrounding whitespace stripped and inner whitespace collapsed.
+    """
+    return " ".join(prompt.split())
+
+
+def make_cache_key(model: str, prompt: str, **params) -> str:
+    """
+    Builds the response cache key for a completion request.
+
+    Args:
+        model (str): The OpenAI model used for the completion.
+        prompt (str): The user's query text.
+        **params: Generation parameters such as max_tokens and temperature.
+
+    Returns:
+        str: A hex digest identifying the (model, normalized prompt, params) combination.
+    """
+    payload = json.dumps([model, normalize_prompt(prompt), params], sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def format_sse(data: dict, event: Optional[str] = None) -> str:
+    """
+    Formats a Server-Sent Events message.
+
+    Args:
+        data (dict): The JSON payload of the event.
+        event (Optional[str], optional): The event name. Defaults to None, the generic "message" event.
+
+    Returns:
+        str: The encoded event, terminated by a blank line.
+    """
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+def format_ndjson(rows: Iterable[Mapping[str, Any]]) -> str:
+    """
+    Formats rows as newline-delimited JSON.
+
+    Args:
+        rows (Iterable[Mapping[str, Any]]): Rows keyed by column name.
+
+    Returns:
+        str: One JSON object per line, each terminated by a newline.
+    """
+    return "".join(json.dumps(dict(row), default=str) + "\n" for row in rows)
+
+
+def format_csv(rows: Iterable[Sequence[Any]]) -> str:
+    """
+    Formats rows as CSV lines.
+
+    Args:
+        rows (Iterable[Sequence[Any]]): Rows as value sequences, e.g. a header followed by data rows.
+
+    Returns:
+        str: The CSV-encoded lines.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
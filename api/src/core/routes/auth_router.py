@@ -1,8 +1,8 @@
 # Specify version and import
 from fastapi import APIRouter, Depends, HTTPException  # Version: 0.115.2
 from typing import Optional  # Version: 2.9.2
-from sqlalchemy.orm import Session  # Version: 2.0.36
-from ..database import get_db  # Version: 2.0.36
+from sqlalchemy.ext.asyncio import AsyncSession  # Version: 2.0.36
+from ..db.utils.db_utils import get_db, get_user_by_email  # Version: 2.0.36
 from .services import auth_service  # Version: 0.115.2
 from .schemas import User, Token  # Version: 2.9.2
 from ..exceptions.base_exception import AuthenticationError  # Version: 2.9.2
@@ -11,13 +11,13 @@ auth_router = APIRouter(prefix="/auth", tags=["authentication"])
 
 # Authentication Endpoint - POST /auth/login
 @auth_router.post("/login", response_model=Token)
-async def login(user: User, db: Session = Depends(get_db)):
+async def login(user: User, db: AsyncSession = Depends(get_db)):
     """
     Logs in a user, validates credentials, and generates a JWT access token.
 
     Args:
         user (User): Pydantic model containing user's email and password.
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         Token: Pydantic model containing the JWT access token.
@@ -25,7 +25,7 @@ async def login(user: User, db: Session = Depends(get_db)):
     Raises:
         HTTPException: If authentication fails (invalid credentials).
     """
-    user_db = db.query(User).filter(User.email == user.email).first()
+    user_db = await get_user_by_email(db, user.email)
     if not user_db or not user_db.check_password(user.password):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     access_token = auth_service.create_access_token(data={"sub": user_db.email})
@@ -33,13 +33,13 @@ async def login(user: User, db: Session = Depends(get_db)):
 
 # Protected Endpoint - GET /auth/me
 @auth_router.get("/me", response_model=User, dependencies=[Depends(auth_service.authenticate_user)])
-async def get_me(current_user: User = Depends(auth_service.get_current_user), db: Session = Depends(get_db)):
+async def get_me(current_user: User = Depends(auth_service.get_current_user), db: AsyncSession = Depends(get_db)):
     """
     Retrieves the currently authenticated user's information.
 
     Args:
         current_user (User): Pydantic model containing user's data (obtained from JWT).
-        db (Session): SQLAlchemy database session.
+        db (AsyncSession): SQLAlchemy database session.
 
     Returns:
         User: Pydantic model containing the authenticated user's information.
@@ -0,0 +1,35 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth.models.auth_model import User
+from ..auth.services.auth_service import get_current_user, is_admin
+from ..db.utils.db_utils import get_read_db
+from ..db.utils.usage import COUNTERS, get_usage
+from ..query.schemas import UsageDay, UsageReport
+
+usage_router = APIRouter(prefix="/usage", tags=["usage"])
+
+@usage_router.get("", response_model=UsageReport)
+async def get_user_usage(
+    user_id: int,
+    since: Optional[date] = None,
+    until: Optional[date] = None,
+    model: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Reports a user's queries and tokens per day and model, with totals.
+
+    Days are UTC; `since` is inclusive and `until` exclusive. Read from the usage aggregates,
+    so the cost does not grow with the number of stored responses. Users may only read their
+    own usage; administrators may read anyone's.
+    """
+    if user_id != current_user.id and not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Not allowed to read this user's usage")
+    rows = await get_usage(db, user_id, since, until, model)
+    days = [UsageDay(day=row.day, model=row.model, **{counter: getattr(row, counter) for counter in COUNTERS}) for row in rows]
+    totals = {counter: sum(getattr(row, counter) for row in rows) for counter in COUNTERS}
+    return UsageReport(user_id=user_id, since=since, until=until, days=days, **totals)
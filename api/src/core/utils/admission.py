@@ -0,0 +1,171 @@
+#  Import Statements:
+
+#  Core modules:
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+import asyncio
+import math
+import time
+
+#  Internal:
+from ..exceptions.base_exception import OverloadedError  # Version 2.9.2
+from ...config.settings import ModelConfig, Settings  # Version 2.9.2
+
+
+class ModelLimiter:
+    """
+    Concurrency limiter with a bounded, deadline-limited wait queue.
+
+    Up to `max_concurrency` holders run at once. Further requests wait in FIFO order;
+    when `max_queue` requests are already waiting, or a request waits longer than
+    `queue_timeout` seconds, it is rejected with an OverloadedError instead.
+
+    Args:
+        max_concurrency (int): Number of requests allowed to run at once.
+        max_queue (int): Number of requests allowed to wait for a slot.
+        queue_timeout (float): Seconds a request may wait for a slot.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._active = 0
+        self._waiters: "deque[asyncio.Future]" = deque()
+        self._avg_service_time = 1.0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[None]:
+        """
+        Holds a slot for the duration of the `async with` block.
+
+        Raises:
+            OverloadedError: If the wait queue is full or the queue deadline passes.
+        """
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+        else:
+            await self._wait_for_slot()
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._avg_service_time = 0.9 * self._avg_service_time + 0.1 * (time.monotonic() - started)
+            self._release()
+
+    def check(self) -> None:
+        """
+        Rejects a request at once if it would find the wait queue full, without taking a slot.
+
+        Raises:
+            OverloadedError: If every slot is taken and the wait queue is full.
+        """
+        if self._active >= self.max_concurrency and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise OverloadedError(retry_after=self.retry_after())
+
+    async def _wait_for_slot(self) -> None:
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise OverloadedError(retry_after=self.retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the wait ended; pass it on.
+                self._release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise OverloadedError(retry_after=self.retry_after())
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _release(self) -> None:
+        # Hand the slot straight to the next waiter so newcomers cannot jump the queue.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def retry_after(self) -> int:
+        """
+        Estimates how long a rejected client should wait before retrying.
+
+        Returns:
+            int: Seconds until the current queue is expected to drain.
+        """
+        backlog = len(self._waiters) + 1
+        return max(1, math.ceil(self._avg_service_time * backlog / self.max_concurrency))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self._active,
+            "queued": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+class AdmissionController:
+    """
+    Per-model admission control for completion calls.
+
+    Each model gets its own ModelLimiter, configured from its entry in `Settings.OPENAI_MODELS`.
+
+    Args:
+        settings (Settings): Application settings providing the per-model limits.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._limiters: Dict[str, ModelLimiter] = {}
+
+    def limiter(self, model: str) -> ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            model_config: ModelConfig = self.settings.get_model_config(model)
+            limiter = ModelLimiter(model_config.max_concurrency, model_config.max_queue, model_config.queue_timeout)
+            self._limiters[model] = limiter
+        return limiter
+
+    def acquire(self, model: str):
+        """
+        Holds a completion slot for `model` for the duration of the `async with` block.
+
+        Args:
+            model (str): The OpenAI model the completion is sent to.
+
+        Raises:
+            OverloadedError: If the model's wait queue is full or the queue deadline passes.
+        """
+        return self.limiter(model).acquire()
+
+    def check(self, model: str) -> None:
+        """
+        Rejects a request for `model` at once if its wait queue is full, without taking a slot.
+
+        Args:
+            model (str): The OpenAI model the completion is sent to.
+
+        Raises:
+            OverloadedError: If the model's slots are taken and its wait queue is full.
+        """
+        self.limiter(model).check()
+
+    def stats(self) -> Dict[str, Any]:
+        return {model: limiter.stats() for model, limiter in self._limiters.items()}
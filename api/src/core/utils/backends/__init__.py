@@ -0,0 +1,42 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import Optional
+
+#  Internal:
+from ....config.settings import Settings  # Version 2.9.2
+from .base import CompletionBackend
+from .fake_backend import FakeBackend
+from .openai_backend import OpenAIBackend
+
+# Backends selectable through Settings.LLM_BACKEND
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "fake": FakeBackend,
+}
+
+_backend: Optional[CompletionBackend] = None
+
+
+def get_backend() -> CompletionBackend:
+    """
+    Returns the process-wide completion backend selected by `Settings.LLM_BACKEND`, creating it on first use.
+
+    Returns:
+        CompletionBackend: The shared completion backend.
+    """
+    global _backend
+    if _backend is None:
+        settings = Settings()
+        if settings.LLM_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown LLM backend: {settings.LLM_BACKEND}")
+        _backend = BACKENDS[settings.LLM_BACKEND](settings)
+    return _backend
+
+
+async def close_backend() -> None:
+    """Closes the shared completion backend, if one was created. Called on application shutdown."""
+    global _backend
+    if _backend is not None:
+        await _backend.aclose()
+        _backend = None
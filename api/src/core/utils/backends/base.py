@@ -0,0 +1,51 @@
+#  Import Statements:
+
+#  Core modules:
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, List
+import asyncio
+
+
+class CompletionBackend(ABC):
+    """
+    Interface of the services that generate completions.
+
+    Backends take the same arguments as the legacy OpenAI completions API. Only `complete`
+    is required; the batch and streaming methods fall back to it.
+    """
+
+    @abstractmethod
+    async def complete(self, prompt: str, model: str, max_tokens: int = 1024, temperature: float = 0.5) -> str:
+        """
+        Generates a text completion.
+
+        Args:
+            prompt (str): The prompt to complete.
+            model (str): The model to use.
+            max_tokens (int, optional): The maximum number of tokens to generate. Defaults to 1024.
+            temperature (float, optional): The sampling temperature. Defaults to 0.5.
+
+        Returns:
+            str: The generated completion text.
+        """
+
+    async def complete_many(self, prompts: List[str], model: str, max_tokens: int = 1024, temperature: float = 0.5) -> List[str]:
+        """
+        Generates completions for several prompts.
+
+        Returns:
+            List[str]: One completion per prompt, in the order of `prompts`.
+        """
+        return list(await asyncio.gather(*(self.complete(prompt, model, max_tokens, temperature) for prompt in prompts)))
+
+    async def stream(self, prompt: str, model: str, max_tokens: int = 1024, temperature: float = 0.5) -> AsyncIterator[str]:
+        """
+        Generates a text completion, yielding text fragments as they are produced.
+
+        Yields:
+            str: The next fragment of completion text.
+        """
+        yield await self.complete(prompt, model, max_tokens, temperature)
+
+    async def aclose(self) -> None:
+        """Releases the backend's resources. Called on application shutdown."""
@@ -0,0 +1,110 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import AsyncIterator, List
+import asyncio
+import math
+import random
+
+#  Third-party:
+import httpx  # Version 0.27.2
+import openai  # Version 1.52.0
+
+#  Internal:
+from ....config.settings import Settings  # Version 2.9.2
+from .base import CompletionBackend
+
+WORDS = (
+    "the answer depends on context but in short it is usually best to start with a clear "
+    "definition then compare the main options and weigh their costs benefits and risks"
+).split()
+
+
+class FakeBackend(CompletionBackend):
+    """
+    Deterministic local completion backend for load tests.
+
+    Responses are either the canned `FAKE_BACKEND_RESPONSE` or text generated from a seed and
+    the prompt, so the same prompt always gets the same answer. Each call waits for a latency
+    drawn from the configured distribution plus the time needed to emit its tokens at
+    `FAKE_BACKEND_TOKENS_PER_SECOND`, and fails with a connection error at `FAKE_BACKEND_ERROR_RATE`.
+
+    Args:
+        settings (Settings): Application settings providing the FAKE_BACKEND_* options.
+    """
+
+    def __init__(self, settings: Settings):
+        self.response = settings.FAKE_BACKEND_RESPONSE
+        self.latency = settings.FAKE_BACKEND_LATENCY_MS / 1000
+        self.distribution = settings.FAKE_BACKEND_LATENCY_DISTRIBUTION
+        self.error_rate = settings.FAKE_BACKEND_ERROR_RATE
+        self.tokens_per_second = settings.FAKE_BACKEND_TOKENS_PER_SECOND
+        self.completion_tokens = settings.FAKE_BACKEND_COMPLETION_TOKENS
+        self.seed = settings.FAKE_BACKEND_SEED
+        self._random = random.Random(settings.FAKE_BACKEND_SEED)
+        if self.distribution not in ("constant", "uniform", "exponential", "lognormal"):
+            raise ValueError(f"Unknown fake backend latency distribution: {self.distribution}")
+
+    def sample_latency(self) -> float:
+        """
+        Draws a request latency in seconds; every distribution has a mean of `FAKE_BACKEND_LATENCY_MS`.
+
+        Returns:
+            float: Seconds to wait before the first token.
+        """
+        if self.latency <= 0 or self.distribution == "constant":
+            return max(self.latency, 0.0)
+        if self.distribution == "uniform":
+            return self._random.uniform(0, 2 * self.latency)
+        if self.distribution == "exponential":
+            return self._random.expovariate(1 / self.latency)
+        sigma = 0.5
+        return self._random.lognormvariate(math.log(self.latency) - sigma ** 2 / 2, sigma)
+
+    def generate(self, prompt: str, model: str, max_tokens: int) -> List[str]:
+        """
+        Returns the tokens of the completion for a prompt.
+
+        Args:
+            prompt (str): The prompt to complete.
+            model (str): The model name; part of the generation seed.
+            max_tokens (int): The maximum number of tokens to generate.
+
+        Returns:
+            List[str]: The completion split into tokens.
+        """
+        if self.response is not None:
+            return self.response.split(" ")
+        generator = random.Random(f"{self.seed}:{model}:{prompt}")
+        return [generator.choice(WORDS) for _ in range(min(max_tokens, self.completion_tokens))]
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate > 0 and self._random.random() < self.error_rate:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "http://fake-backend/v1/completions"))
+
+    async def complete(self, prompt: str, model: str, max_tokens: int = 1024, temperature: float = 0.5) -> str:
+        tokens = self.generate(prompt, model, max_tokens)
+        delay = self.sample_latency()
+        if self.tokens_per_second > 0:
+            delay += len(tokens) / self.tokens_per_second
+        await asyncio.sleep(delay)
+        self._maybe_fail()
+        return " ".join(tokens)
+
+    async def complete_many(self, prompts: List[str], model: str, max_tokens: int = 1024, temperature: float = 0.5) -> List[str]:
+        completions = [self.generate(prompt, model, max_tokens) for prompt in prompts]
+        delay = self.sample_latency()
+        if self.tokens_per_second > 0:
+            delay += max(len(tokens) for tokens in completions) / self.tokens_per_second
+        await asyncio.sleep(delay)
+        self._maybe_fail()
+        return [" ".join(tokens) for tokens in completions]
+
+    async def stream(self, prompt: str, model: str, max_tokens: int = 1024, temperature: float = 0.5) -> AsyncIterator[str]:
+        tokens = self.generate(prompt, model, max_tokens)
+        await asyncio.sleep(self.sample_latency())
+        self._maybe_fail()
+        for index, token in enumerate(tokens):
+            if self.tokens_per_second > 0:
+                await asyncio.sleep(1 / self.tokens_per_second)
+            yield token if index == 0 else f" {token}"
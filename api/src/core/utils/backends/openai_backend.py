@@ -0,0 +1,128 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import AsyncIterator, List
+
+#  Third-party:
+import httpx  # Version 0.27.2
+from openai import AsyncOpenAI  # Version 1.52.0
+
+#  Internal:
+from ....config.settings import Settings  # Version 2.9.2
+from .base import CompletionBackend
+
+
+class OpenAIBackend(CompletionBackend):
+    """
+    Completion backend for the OpenAI completions API.
+
+    All requests go through a single `httpx.AsyncClient`, so connections are pooled
+    and kept alive between completions instead of being opened per request.
+
+    Args:
+        settings (Settings): Application settings providing the API key, base URL,
+            timeouts and connection pool limits.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+            ),
+        )
+        self._client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            max_retries=settings.OPENAI_MAX_RETRIES,
+            http_client=self._http_client,
+        )
+
+    async def complete(self, prompt: str, model: str, max_tokens: int = 1024, temperature: float = 0.5) -> str:
+        """
+        Generates a text completion without blocking the event loop.
+
+        Args:
+            prompt (str): The prompt to complete.
+            model (str): The OpenAI model to use.
+            max_tokens (int, optional): The maximum number of tokens to generate. Defaults to 1024.
+            temperature (float, optional): The sampling temperature. Defaults to 0.5.
+
+        Returns:
+            str: The generated completion text.
+        """
+        response = await self._client.completions.create(
+            model=model,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        return response.choices[0].text
+
+    async def complete_many(self, prompts: List[str], model: str, max_tokens: int = 1024, temperature: float = 0.5) -> List[str]:
+        """
+        Generates completions for several prompts in a single request.
+
+        Args:
+            prompts (List[str]): The prompts to complete.
+            model (str): The OpenAI model to use.
+            max_tokens (int, optional): The maximum number of tokens to generate per prompt. Defaults to 1024.
+            temperature (float, optional): The sampling temperature. Defaults to 0.5.
+
+        Returns:
+            List[str]: One completion per prompt, in the order of `prompts`.
+
+        Raises:
+            ValueError: If the response has no choice for one of the prompts.
+        """
+        response = await self._client.completions.create(
+            model=model,
+            prompt=prompts,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        )
+        completions = [None] * len(prompts)
+        for choice in response.choices:
+            completions[choice.index] = choice.text
+        missing = [index for index, completion in enumerate(completions) if completion is None]
+        if missing:
+            raise ValueError(f"OpenAI response has no choice for prompts {missing}")
+        return completions
+
+    async def stream(self, prompt: str, model: str, max_tokens: int = 1024, temperature: float = 0.5) -> AsyncIterator[str]:
+        """
+        Generates a text completion, yielding text fragments as the model produces them.
+
+        Closing the generator early (for example when the client disconnects) closes the
+        upstream stream as well.
+
+        Args:
+            prompt (str): The prompt to complete.
+            model (str): The OpenAI model to use.
+            max_tokens (int, optional): The maximum number of tokens to generate. Defaults to 1024.
+            temperature (float, optional): The sampling temperature. Defaults to 0.5.
+
+        Yields:
+            str: The next fragment of completion text.
+        """
+        stream = await self._client.completions.create(
+            model=model,
+            prompt=prompt,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            stream=True,
+        )
+        try:
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].text:
+                    yield chunk.choices[0].text
+        finally:
+            await stream.close()
+
+    async def aclose(self) -> None:
+        """Closes the underlying HTTP connection pool."""
+        await self._client.close()
+
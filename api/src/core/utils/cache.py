@@ -0,0 +1,134 @@
+#  Import Statements:
+
+#  Core modules:
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+import threading
+import time
+
+
+class TTLCache:
+    """
+    In-process cache with LRU eviction and a per-entry time-to-live.
+
+    Args:
+        maxsize (int): Maximum number of entries. A size of 0 disables the cache.
+        ttl (float): Seconds an entry stays valid after it is stored.
+        timer (Callable[[], float], optional): Clock used for expiry. Defaults to time.monotonic.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, timer: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._timer = timer
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Returns the cached value for `key`, or None if it is missing or expired.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            Optional[Any]: The cached value, if present and fresh.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, stored_at, expires_at = entry
+            if self._timer() >= expires_at:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Stores `value` under `key`, evicting the least recently used entries if the cache is full.
+
+        Args:
+            key (Hashable): The cache key.
+            value (Any): The value to cache.
+            ttl (Optional[float], optional): Seconds this entry stays valid, if shorter than the cache's TTL. Defaults to None.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            now = self._timer()
+            self._entries[key] = (value, now, now + (self.ttl if ttl is None else min(ttl, self.ttl)))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """
+        Removes a single entry.
+
+        Args:
+            key (Hashable): The cache key.
+
+        Returns:
+            bool: True if an entry was removed, False otherwise.
+        """
+        with self._lock:
+            return self._entries.pop(key, None) is not None
+
+    def clear(self) -> int:
+        """
+        Removes every entry.
+
+        Returns:
+            int: The number of entries removed.
+        """
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Lists the live entries from least to most recently used.
+
+        Returns:
+            List[Dict[str, Any]]: The key, value, age and remaining lifetime of each entry.
+        """
+        with self._lock:
+            now = self._timer()
+            return [
+                {"key": key, "value": value, "age": now - stored_at, "expires_in": expires_at - now}
+                for key, (value, stored_at, expires_at) in self._entries.items()
+                if expires_at > now
+            ]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports the cache counters.
+
+        Returns:
+            Dict[str, Any]: Size, limits, and hit/miss/eviction/expiration counters.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,119 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import Any, Callable, Dict
+import time
+
+#  Internal:
+from ..exceptions.base_exception import CircuitOpenError  # Version 2.9.2
+from ...config.settings import Settings  # Version 2.9.2
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for one upstream model.
+
+    After `failure_threshold` consecutive failures the circuit opens and calls are refused
+    immediately. Once `recovery_timeout` seconds have passed it turns half-open and lets up
+    to `half_open_max_calls` probe calls through: a successful probe closes the circuit,
+    a failed one opens it again.
+
+    Args:
+        name (str): Name reported in errors and stats, usually the model name.
+        failure_threshold (int): Consecutive failures that open the circuit.
+        recovery_timeout (float): Seconds the circuit stays open before probing.
+        half_open_max_calls (int): Probe calls allowed at once while half-open.
+        timer (Callable[[], float], optional): Clock used for the recovery timeout. Defaults to time.monotonic.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float, half_open_max_calls: int = 1, timer: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._timer = timer
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._timer() - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def before_call(self) -> None:
+        """
+        Admits a call or refuses it while the circuit is open.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with all probe slots taken.
+        """
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probes >= self.half_open_max_calls):
+            self.rejected += 1
+            raise CircuitOpenError(detail=f"Model {self.name} is temporarily unavailable.")
+        if state == HALF_OPEN:
+            self._probes += 1
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+        self._probes = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = OPEN
+            self._opened_at = self._timer()
+            self._probes = 0
+            self.opened += 1
+
+    def release(self) -> None:
+        """Gives back a half-open probe slot for a call that never reached the model."""
+        if self._state == HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+class CircuitBreakerRegistry:
+    """
+    Keeps one CircuitBreaker per model.
+
+    Args:
+        settings (Settings): Application settings providing the CIRCUIT_BREAKER_* options.
+    """
+
+    def __init__(self, settings: Settings):
+        self.settings = settings
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                model,
+                failure_threshold=self.settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+                recovery_timeout=self.settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                half_open_max_calls=self.settings.CIRCUIT_BREAKER_HALF_OPEN_MAX_CALLS,
+            )
+            self._breakers[model] = breaker
+        return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        return {model: breaker.stats() for model, breaker in self._breakers.items()}
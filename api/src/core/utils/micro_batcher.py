@@ -0,0 +1,114 @@
+#  Import Statements:
+
+#  Core modules:
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+import asyncio
+import time
+
+
+class MicroBatcher:
+    """
+    Packs concurrent completion requests into multi-prompt upstream calls.
+
+    Requests for the same model and generation parameters are queued together. A batch
+    is dispatched as soon as it holds `max_batch_size` prompts or its oldest request has
+    waited `max_wait_ms`, whichever comes first, and each choice of the response is
+    routed back to the caller that submitted the matching prompt.
+
+    Args:
+        complete_many (Callable[..., Awaitable[List[str]]]): Called as
+            `complete_many(prompts, model, **params)`; returns one completion per prompt, in order.
+        max_batch_size (int): Maximum number of prompts per upstream call.
+        max_wait_ms (float): Maximum time a request waits for its batch to fill.
+    """
+
+    def __init__(self, complete_many: Callable[..., Awaitable[List[str]]], max_batch_size: int, max_wait_ms: float):
+        self._complete_many = complete_many
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: Dict[Tuple, List[Tuple[str, "asyncio.Future", float]]] = {}
+        self._timers: Dict[Tuple, asyncio.TimerHandle] = {}
+        self._dispatches = set()
+        self.batches = 0
+        self.requests = 0
+        self.batch_sizes = Counter()
+        self.total_queue_delay = 0.0
+        self.max_queue_delay = 0.0
+
+    async def submit(self, prompt: str, model: str, **params) -> str:
+        """
+        Queues a prompt for the next batch of its (model, params) group and waits for its completion.
+
+        Args:
+            prompt (str): The prompt to complete.
+            model (str): The OpenAI model to use.
+            **params: Generation parameters such as max_tokens and temperature.
+
+        Returns:
+            str: The completion for `prompt`.
+        """
+        loop = asyncio.get_running_loop()
+        key = (model, tuple(sorted(params.items())))
+        future = loop.create_future()
+        pending = self._pending.setdefault(key, [])
+        pending.append((prompt, future, time.monotonic()))
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.max_wait, self._flush, key)
+        return await future
+
+    def _flush(self, key: Tuple) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, None)
+        if batch:
+            dispatch = asyncio.ensure_future(self._dispatch(key, batch))
+            self._dispatches.add(dispatch)
+            dispatch.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, key: Tuple, batch: List[Tuple[str, "asyncio.Future", float]]) -> None:
+        model, params = key
+        now = time.monotonic()
+        self.batches += 1
+        self.requests += len(batch)
+        self.batch_sizes[len(batch)] += 1
+        for _, _, queued_at in batch:
+            self.total_queue_delay += now - queued_at
+            self.max_queue_delay = max(self.max_queue_delay, now - queued_at)
+
+        try:
+            completions = await self._complete_many([prompt for prompt, _, _ in batch], model, **dict(params))
+            for (_, future, _), completion in zip(batch, completions):
+                if not future.done():
+                    future.set_result(completion)
+            if len(completions) < len(batch):
+                raise ValueError(f"Upstream returned {len(completions)} completions for {len(batch)} prompts")
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            # Cancelled while waiting upstream: no completion will come for the rest of the batch.
+            for _, future, _ in batch:
+                if not future.done():
+                    future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports batch size and queueing delay metrics.
+
+        Returns:
+            Dict[str, Any]: Batch and request counts, the batch size histogram, and queueing delays in milliseconds.
+        """
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_sizes": dict(sorted(self.batch_sizes.items())),
+            "avg_queue_delay_ms": 1000 * self.total_queue_delay / self.requests if self.requests else 0.0,
+            "max_queue_delay_ms": 1000 * self.max_queue_delay,
+            "pending": sum(len(batch) for batch in self._pending.values()),
+        }
@@ -1,25 +1,28 @@
 #  Import Statements:
 
 #  Core modules:
-from typing import Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any
 import json
 
 #  Third-party:
 from fastapi import HTTPException  # Version 0.115.2
-from openai import Completion, APIError  # Version 1.52.0
+from openai import APIError  # Version 1.52.0
 
 #  Internal:
 from ..exceptions.base_exception import QueryError  # Version 2.9.2
 from ...config.settings import Settings  # Version 2.9.2
+from .backends import get_backend
+from .resilience import ResilientCaller
 
 settings = Settings()
+resilience = ResilientCaller(settings)
 
 #  File Structure and Components:
 
 #  Main Function:
 async def make_openai_request(query: str, model: str, max_tokens: int = 1024, temperature: float = 0.5) -> str:
     """
-    Sends a request to the OpenAI API to generate text completion.
+    Sends a request to the configured completion backend (see `Settings.LLM_BACKEND`) to generate text completion.
 
     Args:
         query (str): The user's query text.
@@ -35,15 +38,67 @@ async def make_openai_request(query: str, model: str, max_tokens: int = 1024, te
     """
 
     try:
-        response = await Completion.create(
-            engine=model,
-            prompt=query,
+        return await resilience.call(model, lambda: get_backend().complete(
+            query,
+            model,
             max_tokens=max_tokens,
             temperature=temperature,
-        )
-        response_text = response.choices[0].text
-        return response_text
+        ))
     except APIError as e:
         raise QueryError(detail=f"OpenAI API error: {e}")
     except Exception as e:
-        raise QueryError(detail=f"Error processing query: {e}")
\ No newline at end of file
+        raise QueryError(detail=f"Error processing query: {e}")
+
+
+async def make_openai_batch_request(queries: List[str], model: str, max_tokens: int = 1024, temperature: float = 0.5) -> List[str]:
+    """
+    Sends several prompts to the configured completion backend in one text completion request.
+
+    Args:
+        queries (List[str]): The user query texts.
+        model (str): The OpenAI model to use for processing the queries.
+        max_tokens (int, optional): The maximum number of tokens to generate per response. Defaults to 1024.
+        temperature (float, optional): The temperature parameter controls the randomness of the generated text. Defaults to 0.5.
+
+    Returns:
+        List[str]: The AI-generated response texts, in the order of `queries`.
+
+    Raises:
+        QueryError: If an error occurs during OpenAI API interaction.
+    """
+
+    try:
+        return await resilience.call(model, lambda: get_backend().complete_many(
+            queries,
+            model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+        ))
+    except APIError as e:
+        raise QueryError(detail=f"OpenAI API error: {e}")
+    except Exception as e:
+        raise QueryError(detail=f"Error processing query: {e}")
+
+
+async def stream_openai_request(query: str, model: str, max_tokens: int = 1024, temperature: float = 0.5) -> AsyncIterator[str]:
+    """
+    Sends a streaming request to the configured completion backend and yields the completion as it is generated.
+
+    Args:
+        query (str): The user's query text.
+        model (str): The OpenAI model to use for processing the query.
+        max_tokens (int, optional): The maximum number of tokens to generate in the response. Defaults to 1024.
+        temperature (float, optional): The temperature parameter controls the randomness of the generated text. Defaults to 0.5.
+
+    Yields:
+        str: The next fragment of the AI-generated response text.
+
+    Raises:
+        QueryError: If an error occurs during OpenAI API interaction.
+    """
+
+    try:
+        async for text in get_backend().stream(query, model, max_tokens=max_tokens, temperature=temperature):
+            yield text
+    except APIError as e:
+        raise QueryError(detail=f"OpenAI API error: {e}")
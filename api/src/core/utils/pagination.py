@@ -0,0 +1,141 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import Any, Generic, List, Optional, Sequence, TypeVar
+import base64
+import binascii
+import json
+
+#  Third-party:
+from pydantic import BaseModel  # Version 2.9.2
+
+#  Internal:
+from ..exceptions.base_exception import PaginationError  # Version 2.9.2
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """
+    Defines the schema for one page of a keyset-paginated listing.
+
+    Attributes:
+        items (List[T]): The items of this page, in ascending ID order.
+        next_cursor (Optional[str]): Opaque cursor of the next page, or None on the last page.
+    """
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Encodes the ID of the last item of a page as an opaque cursor.
+
+    Args:
+        last_id (int): ID of the last item returned.
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Decodes a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor (Optional[str]): The cursor sent by the client, or None for the first page.
+
+    Returns:
+        Optional[int]: The ID after which the page starts, or None for the first page.
+
+    Raises:
+        PaginationError: If the cursor is malformed.
+    """
+    if not cursor:
+        return None
+    last_id = _decode(cursor, "id")
+    if not isinstance(last_id, int):
+        raise PaginationError(detail="Invalid cursor.")
+    return last_id
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """
+    Encodes the position of the next page of a ranked listing, such as search results,
+    whose order has no key to resume from.
+
+    Args:
+        offset (int): Number of items returned so far.
+
+    Returns:
+        str: A URL-safe cursor.
+    """
+    return _encode({"offset": offset})
+
+
+def decode_offset_cursor(cursor: Optional[str]) -> int:
+    """
+    Decodes a cursor produced by `encode_offset_cursor`.
+
+    Args:
+        cursor (Optional[str]): The cursor sent by the client, or None for the first page.
+
+    Returns:
+        int: Number of items to skip.
+
+    Raises:
+        PaginationError: If the cursor is malformed.
+    """
+    if not cursor:
+        return 0
+    offset = _decode(cursor, "offset")
+    if not isinstance(offset, int) or offset < 0:
+        raise PaginationError(detail="Invalid cursor.")
+    return offset
+
+
+def _encode(payload: dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def _decode(cursor: str, key: str) -> Any:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))[key]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise PaginationError(detail="Invalid cursor.")
+
+
+def make_page(rows: Sequence[Any], limit: int) -> dict:
+    """
+    Builds a page from rows fetched with a limit of `limit + 1`.
+
+    The extra row only tells whether another page exists; it is not returned.
+
+    Args:
+        rows (Sequence[Any]): Rows in ascending ID order, at most `limit + 1` of them.
+        limit (int): The page size requested.
+
+    Returns:
+        dict: The page items and the cursor of the next page.
+    """
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(items[-1].id) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def make_offset_page(rows: Sequence[Any], limit: int, offset: int) -> dict:
+    """
+    Builds a page of a ranked listing from rows fetched with a limit of `limit + 1`.
+
+    Args:
+        rows (Sequence[Any]): Rows in rank order, at most `limit + 1` of them.
+        limit (int): The page size requested.
+        offset (int): Number of items skipped before this page.
+
+    Returns:
+        dict: The page items and the cursor of the next page.
+    """
+    next_cursor = encode_offset_cursor(offset + limit) if len(rows) > limit else None
+    return {"items": list(rows[:limit]), "next_cursor": next_cursor}
@@ -0,0 +1,149 @@
+#  Import Statements:
+
+#  Core modules:
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+import asyncio
+import random
+import time
+
+#  Third-party:
+import openai  # Version 1.52.0
+
+#  Internal:
+from ...config.settings import Settings  # Version 2.9.2
+
+T = TypeVar("T")
+
+# Errors worth another attempt: timeouts, dropped connections, rate limits and 5xx responses.
+RETRYABLE_ERRORS = (
+    asyncio.TimeoutError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class ResilientCaller:
+    """
+    Runs upstream completion calls with retries, per-attempt timeouts and optional hedging.
+
+    Retryable failures are retried with full-jitter exponential backoff. When hedging is
+    enabled and enough latency samples exist for a model, an attempt that is still running
+    after the configured latency percentile gets a second, identical request; the first
+    to succeed wins and the other is cancelled.
+
+    Args:
+        settings (Settings): Application settings providing the LLM_* resilience options.
+    """
+
+    def __init__(self, settings: Settings):
+        self.max_retries = settings.LLM_MAX_RETRIES
+        self.backoff_base = settings.LLM_RETRY_BACKOFF_BASE
+        self.backoff_max = settings.LLM_RETRY_BACKOFF_MAX
+        self.attempt_timeout = settings.LLM_ATTEMPT_TIMEOUT
+        self.hedge_enabled = settings.LLM_HEDGE_ENABLED
+        self.hedge_percentile = settings.LLM_HEDGE_PERCENTILE
+        self.hedge_min_samples = settings.LLM_HEDGE_MIN_SAMPLES
+        self._latencies: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=500))
+        self.calls = 0
+        self.attempts = 0
+        self.retries = 0
+        self.retries_exhausted = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    async def call(self, model: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Calls `fn`, retrying retryable failures.
+
+        Args:
+            model (str): The model the call goes to; latency samples are kept per model.
+            fn (Callable[[], Awaitable[T]]): Starts one upstream attempt.
+
+        Returns:
+            T: The result of the first successful attempt.
+
+        Raises:
+            Exception: The last error, once it is not retryable or the retries are used up.
+        """
+        self.calls += 1
+        retry = 0
+        while True:
+            try:
+                return await self._attempt(model, fn)
+            except RETRYABLE_ERRORS:
+                if retry >= self.max_retries:
+                    self.retries_exhausted += 1
+                    raise
+                retry += 1
+                self.retries += 1
+                await asyncio.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry)))
+
+    async def _attempt(self, model: str, fn: Callable[[], Awaitable[T]]) -> T:
+        hedge_after = self.hedge_delay(model)
+        if hedge_after is None:
+            return await self._timed(model, fn)
+
+        primary = asyncio.ensure_future(self._timed(model, fn))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+        if done:
+            return primary.result()
+
+        self.hedges += 1
+        hedge = asyncio.ensure_future(self._timed(model, fn))
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in (primary, hedge):
+                if not task.done():
+                    task.cancel()
+
+    async def _timed(self, model: str, fn: Callable[[], Awaitable[T]]) -> T:
+        self.attempts += 1
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(fn(), timeout=self.attempt_timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise
+        self._latencies[model].append(time.monotonic() - started)
+        return result
+
+    def hedge_delay(self, model: str) -> Optional[float]:
+        """
+        Returns how long to wait before hedging a call to `model`.
+
+        Returns:
+            Optional[float]: The latency percentile in seconds, or None if hedging is disabled
+            or there are not enough samples yet.
+        """
+        samples = self._latencies.get(model)
+        if not self.hedge_enabled or not samples or len(samples) < self.hedge_min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.hedge_percentile / 100))]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "attempts": self.attempts,
+            "retries": self.retries,
+            "retries_exhausted": self.retries_exhausted,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_delay": {model: self.hedge_delay(model) for model in self._latencies},
+        }
@@ -0,0 +1,60 @@
+#  Import Statements:
+
+#  Core modules:
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+import asyncio
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one in-flight call.
+
+    The first caller for a key starts the call; callers arriving while it is still
+    running wait for the same result, and a failure is raised to every one of them.
+    Waiters are shielded from the shared call, so a cancelled waiter does not cancel
+    it for the others.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, "asyncio.Future"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Runs `fn` once per key at a time and returns its result to every concurrent caller.
+
+        Args:
+            key (Hashable): Identifies calls that may share a result.
+            fn (Callable[[], Awaitable[T]]): Starts the call when no call for `key` is in flight.
+
+        Returns:
+            T: The result of the shared call.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Future") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Reports the coalescing counters.
+
+        Returns:
+            Dict[str, Any]: Calls started, callers that joined an in-flight call, and calls in flight.
+        """
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
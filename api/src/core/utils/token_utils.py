@@ -0,0 +1,43 @@
+#  Import Statements:
+
+#  Core modules:
+from functools import lru_cache
+from typing import Any, Optional
+import math
+
+try:
+    import tiktoken  # Optional: exact token counts for OpenAI models
+except ImportError:
+    tiktoken = None
+
+# Average characters per token of English text with OpenAI tokenizers, used without tiktoken
+CHARS_PER_TOKEN = 4
+
+
+@lru_cache(maxsize=32)
+def _encoding(model: str) -> Optional[Any]:
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Counts the tokens of a prompt or completion, for usage reporting.
+
+    Exact with the optional tiktoken package; otherwise estimated from the length of the text.
+    Live usage and `scripts/rebuild_usage.py` must run with the same choice to agree.
+
+    Args:
+        text (str): The prompt or completion.
+        model (str): The model the text was sent to or generated by.
+
+    Returns:
+        int: The number of tokens; 0 for empty text.
+    """
+    if not text:
+        return 0
+    if tiktoken is not None:
+        return len(_encoding(model).encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
@@ -4,18 +4,58 @@ from typing import Optional
 from pydantic import BaseModel, validator
 import openai
 import os
-from sqlalchemy.orm import Session
-from .database import engine, SessionLocal, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import engine, SessionLocal
+from .core.db.utils.db_utils import get_db, get_user_by_email
 from .schemas import QueryRequest, QueryResponse, User
 from .auth import authenticate_user, create_access_token
 from .core.query.services.query_service import process_query as query_service
+from .core.utils.backends import close_backend
+from .core.db.utils.write_behind import write_behind
+from .core.db.utils.id_utils import require_worker_id
+from .core.db.utils.retention import retention
+from .core.admin import admin_router
+from .core.usage import usage_router
+from .core.db.config import async_engine, replica_engine
+from .config.settings import Settings
+from .core.exceptions.base_exception import CircuitOpenError, OverloadedError
 
 app = FastAPI()
+settings = Settings()
+app.include_router(admin_router)
+app.include_router(usage_router)
+
+@app.exception_handler(OverloadedError)
+async def overloaded_error_handler(request, exc: OverloadedError):
+    return JSONResponse(status_code=429, content={"detail": exc.detail}, headers={"Retry-After": str(exc.retry_after)})
+
+@app.exception_handler(CircuitOpenError)
+async def circuit_open_error_handler(request, exc: CircuitOpenError):
+    return JSONResponse(status_code=503, content={"detail": exc.detail})
+
+@app.on_event("startup")
+async def startup():
+    if settings.WRITE_BEHIND_ENABLED:
+        # Queued rows get their IDs here, so two processes sharing a worker ID would collide.
+        require_worker_id(settings.ID_WORKER_ID)
+        await write_behind.start()
+    if settings.RETENTION_ENABLED and retention.enabled:
+        await retention.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    # Drain queued rows before the process exits so no response is lost.
+    await write_behind.stop()
+    await retention.stop()
+    await close_backend()
+    await async_engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
 
 # Authentication Route
 @app.post("/login")
-async def login(user: User, db: Session = Depends(get_db)):
-    user_db = db.query(User).filter(User.email == user.email).first()
+async def login(user: User, db: AsyncSession = Depends(get_db)):
+    user_db = await get_user_by_email(db, user.email)
     if not user_db or not user_db.check_password(user.password):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
     access_token = create_access_token(data={"sub": user_db.email})
@@ -23,9 +63,9 @@ async def login(user: User, db: Session = Depends(get_db)):
 
 # Query Processing Route
 @app.post("/query", dependencies=[Depends(authenticate_user)])
-async def process_query(query_request: QueryRequest, db: Session = Depends(get_db)):
+async def process_query(query_request: QueryRequest, db: AsyncSession = Depends(get_db)):
     response = await query_service(query_request, db)
-    return JSONResponse(content={"query_id": response.id, "response": response.response})
+    return JSONResponse(content={"query_id": response.id, "response": response.response, "fallback": response.fallback})
 
 if __name__ == "__main__":
     import uvicorn
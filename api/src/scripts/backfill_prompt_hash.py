@@ -0,0 +1,61 @@
+# Specify version and import
+import argparse  #  No specific version required
+import time  #  No specific version required
+
+from sqlalchemy import inspect, select, text, update  # Version: 2.0.36
+from sqlalchemy.orm import Session  # Version: 2.0.36
+
+from api.src.core.db.config import SessionLocal, engine
+from api.src.core.db.models import QueryResponse
+from api.src.core.query.services.query_service import MAX_TOKENS, TEMPERATURE
+from api.src.core.query.utils.query_utils import make_cache_key
+
+#  Function Definitions
+def add_column_and_index() -> bool:
+    """Adds the prompt_hash column and its lookup index to a database created before they existed; returns whether the column was added."""
+    columns = {column["name"] for column in inspect(engine).get_columns(QueryResponse.__tablename__)}
+    added = "prompt_hash" not in columns
+    with engine.begin() as connection:
+        if added:
+            connection.execute(text("ALTER TABLE query_responses ADD COLUMN prompt_hash VARCHAR(64)"))
+        connection.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_query_responses_model_prompt_hash_id "
+            "ON query_responses (model, prompt_hash, id)"
+        ))
+    return added
+
+
+def backfill(db: Session, batch_size: int) -> int:
+    """Hashes rows without a prompt_hash in ID order, one committed batch at a time; returns the rows updated."""
+    updated, after_id = 0, 0
+    while True:
+        rows = db.execute(
+            select(QueryResponse.id, QueryResponse.model, QueryResponse.query)
+            .where(QueryResponse.prompt_hash.is_(None), QueryResponse.id > after_id)
+            .order_by(QueryResponse.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return updated
+        db.execute(update(QueryResponse), [
+            {"id": row.id, "prompt_hash": make_cache_key(row.model, row.query, max_tokens=MAX_TOKENS, temperature=TEMPERATURE)}
+            for row in rows
+        ])
+        db.commit()
+        updated += len(rows)
+        after_id = rows[-1].id
+        print(f"{updated:>10} rows hashed (last id {after_id})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adds and fills query_responses.prompt_hash for rows stored before it existed.")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    # Once the column exists, rows without a hash are also reused answers, which must stay unhashed.
+    parser.add_argument("--resume", action="store_true", help="Fill the column although it already existed, e.g. after an interrupted run.")
+    args = parser.parse_args()
+    if not add_column_and_index() and not args.resume:
+        parser.exit(message="backfill: prompt_hash already exists; rows without one are reused answers. Pass --resume to continue an interrupted backfill.\n")
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        total = backfill(db, args.batch_size)
+    print(f"backfill: {total} rows in {time.perf_counter() - started:.1f} s")
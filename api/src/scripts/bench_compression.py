@@ -0,0 +1,86 @@
+# Specify version and import
+import argparse  #  No specific version required
+import os  #  No specific version required
+import random  #  No specific version required
+import tempfile  #  No specific version required
+import time  #  No specific version required
+
+# The codec module reads Settings on import, which needs these even for synthetic data.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+
+from api.src.core.db.utils.compression import ResponseCodec, zstandard
+
+# Building blocks of synthetic answers; real completions repeat phrasing and structure like this
+PHRASES = [
+    "Here is a step-by-step explanation.",
+    "First, make sure the configuration file is in place.",
+    "Next, restart the service so the changes take effect.",
+    "In summary, the main factors are cost, latency and reliability.",
+    "Note that results may vary depending on your environment.",
+    "For example, you can run the following command:",
+    "The capital of France is Paris, which is also its largest city.",
+    "I hope this helps! Let me know if you have any other questions.",
+]
+
+#  Function Definitions
+def synthetic_responses(count: int, seed: int = 0) -> list:
+    """Generates `count` answers of 20-200 sentences picked from PHRASES, with some unique numbers mixed in."""
+    rng = random.Random(seed)
+    return [
+        " ".join(f"{rng.choice(PHRASES)} ({rng.randint(0, 10 ** 6)})" if rng.random() < 0.1 else rng.choice(PHRASES) for _ in range(rng.randint(20, 200)))
+        for _ in range(count)
+    ]
+
+
+def stored_responses(count: int) -> list:
+    """Reads the newest `count` uncompressed response bodies from DATABASE_URL."""
+    from sqlalchemy import text  # Version: 2.0.36
+    from api.src.core.db.config import engine
+
+    with engine.connect() as connection:
+        rows = connection.execute(text("SELECT body AS response FROM response_bodies ORDER BY id DESC LIMIT :count"), {"count": count}).all()
+    return [row.response for row in rows if isinstance(row.response, str)]
+
+
+def measure(name: str, codec: ResponseCodec, responses: list):
+    """Prints the compression ratio and CPU time per row for encoding and decoding `responses`."""
+    started = time.process_time()
+    encoded = [codec.encode(response) for response in responses]
+    encode_cpu = time.process_time() - started
+    started = time.process_time()
+    decoded = [codec.decode(value) for value in encoded]
+    decode_cpu = time.process_time() - started
+    assert decoded == responses
+    raw = sum(len(response.encode("utf-8")) for response in responses)
+    stored = sum(len(value) for value in encoded)
+    print(
+        f"{name:<22} ratio {raw / stored:5.2f}x  {stored / len(responses):8.0f} B/row  "
+        f"encode {encode_cpu / len(responses) * 1e6:7.1f} us/row  decode {decode_cpu / len(responses) * 1e6:7.1f} us/row"
+    )
+
+
+def main(responses: list, dictionary_size: int):
+    raw = sum(len(response.encode("utf-8")) for response in responses)
+    print(f"{len(responses)} responses, {raw / len(responses):.0f} B/row uncompressed")
+    for level in (1, 6, 9):
+        measure(f"zlib level {level}", ResponseCodec("zlib", level=level), responses)
+    if zstandard is None:
+        print("zstandard is not installed; skipping zstd")
+        return
+    for level in (3, 9, 19):
+        measure(f"zstd level {level}", ResponseCodec("zstd", level=level), responses)
+    # Train on one half and measure on the other, as the dictionary would see new rows.
+    training, held_out = responses[::2], responses[1::2]
+    dictionary = zstandard.train_dictionary(dictionary_size, [response.encode("utf-8") for response in training]).as_bytes()
+    for level in (3, 9):
+        measure(f"zstd level {level} + dict", ResponseCodec("zstd", level=level, dictionary=dictionary), held_out)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reports compression ratio and CPU cost per row of the response codecs.")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--from-db", action="store_true", help="sample stored responses from DATABASE_URL instead of synthetic ones")
+    parser.add_argument("--dict-size", type=int, default=112640)
+    args = parser.parse_args()
+    main(stored_responses(args.rows) if args.from_db else synthetic_responses(args.rows), args.dict_size)
@@ -0,0 +1,121 @@
+# Specify version and import
+import argparse  #  No specific version required
+import asyncio  #  No specific version required
+import os  #  No specific version required
+import random  #  No specific version required
+import tempfile  #  No specific version required
+import time  #  No specific version required
+
+from sqlalchemy import select  # Version: 2.0.36
+from sqlalchemy.ext.asyncio import async_sessionmaker  # Version: 2.0.36
+from sqlalchemy.orm import sessionmaker  # Version: 2.0.36
+
+# core/db/config.py builds the application's engines on import, so it needs a database URL first.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+from api.src.core.db.config import create_db_engine, pool_metrics
+from api.src.core.db.models import Base, QueryResponse, User
+
+#  Function Definitions
+def seed(database_url: str, users: int, rows: int):
+    """Creates the tables and inserts `rows` query responses spread over `users` users."""
+    engine = create_db_engine("bench-seed", database_url)
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([User(email=f"bench{i}@example.com", hashed_password="bench") for i in range(1, users + 1)])
+        db.commit()
+        db.add_all([
+            QueryResponse(user_id=i % users + 1, query=f"seed prompt {i}", model="text-davinci-003", response="seed answer " * 20)
+            for i in range(rows)
+        ])
+        db.commit()
+    engine.dispose()
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Returns the longest delay beyond `interval` the event loop took to wake this task up."""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run_sync(database_url: str, concurrency: int, total: int, write_ratio: float, users: int):
+    """Old request path: blocking Session calls made directly inside coroutines."""
+    engine = create_db_engine(f"sync-{concurrency}", database_url)
+    Session = sessionmaker(bind=engine)
+
+    def operation(i: int):
+        with Session() as db:
+            if random.random() < write_ratio:
+                db.add(QueryResponse(user_id=i % users + 1, query=f"prompt {i}", model="text-davinci-003", response="answer " * 20))
+                db.commit()
+            else:
+                db.execute(select(QueryResponse).where(QueryResponse.user_id == i % users + 1)).scalars().all()
+
+    async def one(i: int):
+        operation(i)
+
+    throughput, lag = await drive(one, concurrency, total)
+    wait = pool_metrics[f"sync-{concurrency}"].stats(engine.pool)["wait_ms"]["p95"]
+    engine.dispose()
+    return throughput, lag, wait
+
+
+async def run_async(database_url: str, concurrency: int, total: int, write_ratio: float, users: int):
+    """New request path: AsyncSession on the asyncio driver."""
+    engine = create_db_engine(f"async-{concurrency}", database_url, is_async=True)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+
+    async def one(i: int):
+        async with Session() as db:
+            if random.random() < write_ratio:
+                db.add(QueryResponse(user_id=i % users + 1, query=f"prompt {i}", model="text-davinci-003", response="answer " * 20))
+                await db.commit()
+            else:
+                (await db.execute(select(QueryResponse).where(QueryResponse.user_id == i % users + 1))).scalars().all()
+
+    throughput, lag = await drive(one, concurrency, total)
+    wait = pool_metrics[f"async-{concurrency}"].stats(engine.sync_engine.pool)["wait_ms"]["p95"]
+    await engine.dispose()
+    return throughput, lag, wait
+
+
+async def drive(one, concurrency: int, total: int):
+    """Runs `total` operations with at most `concurrency` in flight; returns (ops/s, worst loop lag in seconds)."""
+    semaphore = asyncio.Semaphore(concurrency)
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_loop_lag(stop))
+
+    async def bounded(i: int):
+        async with semaphore:
+            await one(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(total)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return total / elapsed, await lag
+
+
+async def main(database_url: str, levels: list, requests_per_level: int, write_ratio: float, users: int, rows: int):
+    seed(database_url, users, rows)
+    print(f"database: {database_url}  writes: {write_ratio:.0%}  seeded rows: {rows}")
+    for concurrency in levels:
+        for name, runner in (("sync", run_sync), ("async", run_async)):
+            throughput, lag, wait = await runner(database_url, concurrency, requests_per_level, write_ratio, users)
+            print(f"{name:>5}  in-flight={concurrency:>4}  throughput={throughput:8.1f} ops/s  worst loop lag={lag * 1000:7.1f} ms  p95 pool wait={wait:6.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares mixed read/write throughput of the sync and async database paths.")
+    parser.add_argument("--database-url", default=os.environ["DATABASE_URL"], help="sync SQLAlchemy URL; defaults to DATABASE_URL or a temporary SQLite file")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.database_url, args.levels, args.requests, args.write_ratio, args.users, args.rows))
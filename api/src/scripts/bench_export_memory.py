@@ -0,0 +1,82 @@
+# Specify version and import
+import argparse  #  No specific version required
+import asyncio  #  No specific version required
+import os  #  No specific version required
+import resource  #  No specific version required
+import tempfile  #  No specific version required
+import time  #  No specific version required
+
+from sqlalchemy import insert  # Version: 2.0.36
+
+# core/db/config.py builds the application's engines on import, so it needs a database URL first.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+
+from api.src.core.db.config import AsyncSessionLocal, engine
+from api.src.core.db.models import Base, QueryResponse, User
+from api.src.core.db.utils import db_utils
+from api.src.core.query.services import query_service
+
+#  Function Definitions
+def rss_mb() -> float:
+    """Returns the current resident set size in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def seed(rows: int, chunk: int = 50000):
+    """Inserts `rows` query responses for one user with multi-row INSERTs."""
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": 1, "email": "export@example.com", "hashed_password": "bench"}])
+        for start in range(0, rows, chunk):
+            connection.execute(insert(QueryResponse), [
+                {
+                    "user_id": 1,
+                    "query": f"benchmark prompt {i}",
+                    "model": "text-davinci-003",
+                    "response": "benchmark answer " * 16,
+                }
+                for i in range(start, min(start + chunk, rows))
+            ])
+
+
+async def export(export_format: str, report_every: int):
+    """Consumes the export stream as the endpoint would and reports rows/s and RSS as it goes."""
+    exported, bytes_out, next_report = 0, 0, report_every
+    started = time.perf_counter()
+    async for chunk in query_service.export_query_responses(export_format=export_format):
+        bytes_out += len(chunk)
+        exported += chunk.count("\n")
+        if exported >= next_report:
+            print(f"{exported:>10} rows  {bytes_out / 2 ** 20:9.1f} MiB out  rss={rss_mb():7.1f} MiB")
+            next_report += report_every
+    elapsed = time.perf_counter() - started
+    print(f"export: {exported} rows in {elapsed:.1f} s ({exported / elapsed:,.0f} rows/s), final rss={rss_mb():.1f} MiB")
+
+
+async def load_all():
+    """The list endpoints' old approach: every row as an ORM object at once."""
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        rows = await db_utils.get_query_responses(db)
+        print(f"load all: {len(rows)} rows in {time.perf_counter() - started:.1f} s, rss={rss_mb():.1f} MiB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures memory use while streaming a large query_responses export.")
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--report-every", type=int, default=200000)
+    parser.add_argument("--skip-seed", action="store_true", help="export an existing DATABASE_URL as is")
+    parser.add_argument("--compare-all", action="store_true", help="afterwards, load every row as ORM objects for comparison")
+    args = parser.parse_args()
+    if not args.skip_seed:
+        seed(args.rows)
+    print(f"database: {os.environ['DATABASE_URL']}  rss before export={rss_mb():.1f} MiB")
+    asyncio.run(export(args.format, args.report_every))
+    if args.compare_all:
+        asyncio.run(load_all())
@@ -0,0 +1,82 @@
+# Specify version and import
+import argparse  #  No specific version required
+import asyncio  #  No specific version required
+import os  #  No specific version required
+import statistics  #  No specific version required
+import tempfile  #  No specific version required
+import time  #  No specific version required
+
+import httpx  # Version: 0.27.2
+from sqlalchemy import insert  # Version: 2.0.36
+
+# core/db/config.py builds the application's engines on import, so it needs a database URL first.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+
+from api.src.core.db.config import engine
+from api.src.core.db.models import Base, QueryResponse, User
+
+# Roughly what a 1024-token completion weighs in English text
+ANSWER_CHARS = 4096
+
+#  Function Definitions
+def seed(rows: int, chunk: int = 10000):
+    """Inserts `rows` query responses with `ANSWER_CHARS`-character answers for one user."""
+    Base.metadata.create_all(bind=engine)
+    answer = ("The answer continues at some length. " * (ANSWER_CHARS // 37 + 1))[:ANSWER_CHARS]
+    with engine.begin() as connection:
+        connection.execute(insert(User), [{"id": 1, "email": "payload@example.com", "hashed_password": "bench"}])
+        for start in range(0, rows, chunk):
+            connection.execute(insert(QueryResponse), [
+                {"user_id": 1, "query": f"benchmark prompt {i}", "model": "text-davinci-003", "response": answer}
+                for i in range(start, min(start + chunk, rows))
+            ])
+
+
+async def walk(client: httpx.AsyncClient, view: str, limit: int):
+    """Pages through every response in `view`; returns (rows, bytes, per-page latencies in ms)."""
+    rows, payload, latencies, cursor = 0, 0, [], None
+    while True:
+        params = {"user_id": 1, "limit": limit, "view": view}
+        if cursor:
+            params["cursor"] = cursor
+        started = time.perf_counter()
+        response = await client.get("/query/responses", params=params)
+        latencies.append((time.perf_counter() - started) * 1000)
+        response.raise_for_status()
+        page = response.json()
+        rows += len(page["items"])
+        payload += len(response.content)
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return rows, payload, latencies
+
+
+async def main(limit: int, repeat: int):
+    # Import after the environment is set so the app uses the benchmark database.
+    from api.src.main import app
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        results = {}
+        for view in ("full", "summary"):
+            await walk(client, view, limit)  # warm-up
+            latencies = []
+            for _ in range(repeat):
+                rows, payload, page_latencies = await walk(client, view, limit)
+                latencies.extend(page_latencies)
+            results[view] = (payload, statistics.median(latencies), sorted(latencies)[int(len(latencies) * 0.95)])
+            print(f"{view:>8}: {rows} rows  {payload / 2 ** 20:8.2f} MiB  {payload / rows:8.0f} B/row  page p50={results[view][1]:7.1f} ms  p95={results[view][2]:7.1f} ms")
+    full, summary = results["full"], results["summary"]
+    print(f"summary saves {1 - summary[0] / full[0]:.0%} of the bytes and {1 - summary[1] / full[1]:.0%} of the median page latency")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares payload size and latency of full and summary response listings.")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--limit", type=int, default=500, help="page size")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over all rows per view")
+    parser.add_argument("--skip-seed", action="store_true", help="use the rows already in DATABASE_URL (user 1)")
+    args = parser.parse_args()
+    if not args.skip_seed:
+        seed(args.rows)
+    asyncio.run(main(args.limit, args.repeat))
@@ -0,0 +1,66 @@
+# Specify version and import
+import argparse  #  No specific version required
+import asyncio  #  No specific version required
+import os  #  No specific version required
+import tempfile  #  No specific version required
+import time  #  No specific version required
+
+import httpx  # Version: 0.27.2
+
+from api.src.scripts.stub_openai_server import StubOpenAIServer
+
+#  Function Definitions
+async def run_level(client: httpx.AsyncClient, concurrency: int, total: int) -> float:
+    """Sends `total` POST /query requests with at most `concurrency` in flight and returns requests per second."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            response = await client.post("/query", json={"query": f"benchmark prompt {i}", "model": "text-davinci-003", "user_id": 1})
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - started)
+
+
+async def main(levels: list, requests_per_level: int, latency: float, backend: str):
+    server = None
+    if backend == "stub":
+        # Real OpenAI client and HTTP stack against a local stand-in server.
+        server = StubOpenAIServer(latency=latency).start()
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+    else:
+        # In-process fake backend; no HTTP at all between the service and the "model".
+        os.environ["LLM_BACKEND"] = "fake"
+        os.environ.setdefault("FAKE_BACKEND_LATENCY_MS", str(latency * 1000))
+    os.environ.setdefault("OPENAI_API_KEY", "bench-key")
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench.db")
+
+    # Import after the environment is set so the app picks up the stub server and database.
+    from api.src.main import app
+    from api.src.core.auth.services.auth_service import authenticate_user
+    from api.src.core.db.models import Base
+    from api.src.core.db.config import engine
+
+    Base.metadata.create_all(bind=engine)
+    app.dependency_overrides[authenticate_user] = lambda: None
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        print(f"backend: {backend}  upstream latency: {latency * 1000:.0f} ms")
+        for concurrency in levels:
+            throughput = await run_level(client, concurrency, requests_per_level)
+            print(f"in-flight={concurrency:>4}  throughput={throughput:8.1f} req/s")
+    if server is not None:
+        server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measures POST /query throughput at increasing concurrency.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--backend", choices=["stub", "fake"], default="stub",
+                        help="stub: OpenAI client against a local HTTP stand-in; fake: in-process fake backend (FAKE_BACKEND_* env vars apply)")
+    args = parser.parse_args()
+    asyncio.run(main(args.levels, args.requests, args.latency_ms / 1000, args.backend))
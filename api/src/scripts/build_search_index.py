@@ -0,0 +1,43 @@
+# Specify version and import
+import argparse  #  No specific version required
+import time  #  No specific version required
+
+from sqlalchemy import select, text  # Version: 2.0.36
+
+from api.src.core.db.config import engine
+from api.src.core.db.models import QueryResponse
+from api.src.core.db.utils.search import INDEXED_IDS, create_search_index, index_params, index_statement
+
+#  Function Definitions
+def build(batch_size: int) -> int:
+    """Creates the full-text index if needed and adds every response not in it yet; returns the rows added."""
+    dialect = engine.dialect.name
+    if dialect not in INDEXED_IDS:
+        raise SystemExit(f"Full-text search is not supported on {dialect}.")
+    with engine.begin() as connection:
+        create_search_index(QueryResponse.__table__, connection)
+    added, after_id = 0, 0
+    while True:
+        with engine.begin() as connection:
+            # Selected through the model so compressed responses are indexed as text.
+            rows = connection.execute(
+                select(QueryResponse.id, QueryResponse.user_id, QueryResponse.query, QueryResponse.response)
+                .where(QueryResponse.id > after_id, text(f"query_responses.id NOT IN ({INDEXED_IDS[dialect]})"))
+                .order_by(QueryResponse.id)
+                .limit(batch_size)
+            ).mappings().all()
+            if not rows:
+                return added
+            connection.execute(index_statement(dialect), index_params(dict(row) for row in rows))
+        added += len(rows)
+        after_id = rows[-1]["id"]
+        print(f"{added:>10} rows indexed (last id {after_id})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adds query responses stored before full-text search existed to the search index.")
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    total = build(args.batch_size)
+    print(f"build: {total} rows indexed in {time.perf_counter() - started:.1f} s")
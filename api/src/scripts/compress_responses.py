@@ -0,0 +1,120 @@
+# Specify version and import
+import argparse  #  No specific version required
+import time  #  No specific version required
+
+from sqlalchemy import inspect, text  # Version: 2.0.36
+from sqlalchemy.types import LargeBinary  # Version: 2.0.36
+
+from api.src.core.db.config import engine
+from api.src.core.db.utils.compression import RAW, ZLIB, ZSTD, response_codec, zstandard
+
+# Columns holding response text: deduplicated bodies, and inline responses of older rows
+COLUMNS = (("response_bodies", "body"), ("query_responses", "response"))
+
+# Distinct response texts, newest first
+SAMPLES = text("SELECT body AS response FROM response_bodies ORDER BY id DESC LIMIT :samples")
+
+#  Function Definitions
+def train(samples: int, size: int, out: str):
+    """Trains a zstd dictionary on the newest `samples` responses and writes it to `out`."""
+    if zstandard is None:
+        raise SystemExit("Training a dictionary requires the zstandard package.")
+    with engine.connect() as connection:
+        rows = connection.execute(SAMPLES, {"samples": samples}).all()
+    # Rows already compressed cannot be used as samples.
+    texts = [row.response.encode("utf-8") if isinstance(row.response, str) else None for row in rows]
+    texts = [sample for sample in texts if sample]
+    if not texts:
+        raise SystemExit("No uncompressed responses to train on.")
+    dictionary = zstandard.train_dictionary(size, texts)
+    with open(out, "wb") as dictionary_file:
+        dictionary_file.write(dictionary.as_bytes())
+    print(f"dictionary {dictionary.dict_id()} trained on {len(texts)} responses, written to {out}")
+    print(f"set RESPONSE_COMPRESSION=zstd and RESPONSE_COMPRESSION_DICT_PATH={out}")
+
+
+def convert():
+    """Changes the response columns to a binary type. Plain text values stay readable."""
+    if engine.url.get_backend_name() == "sqlite":
+        # SQLite columns hold any storage class, so there is nothing to change.
+        print("sqlite: no conversion needed")
+        return
+    for table, name in COLUMNS:
+        column = next(column for column in inspect(engine).get_columns(table) if column["name"] == name)
+        if isinstance(column["type"], LargeBinary):
+            print(f"{table}.{name} is already a binary column")
+            continue
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {name} TYPE BYTEA USING convert_to({name}, 'UTF8')"))
+        print(f"{table}.{name} converted to BYTEA")
+
+
+def migrate(batch_size: int, pause_ms: float):
+    """Compresses stored responses in ID order, committing one batch at a time."""
+    if response_codec is None:
+        raise SystemExit("Set RESPONSE_COMPRESSION to zlib or zstd first.")
+    for table, name in COLUMNS:
+        migrate_column(table, name, batch_size, pause_ms)
+
+
+def migrate_column(table: str, name: str, batch_size: int, pause_ms: float):
+    """Compresses the values of one response column."""
+    after_id, scanned, compressed, raw_bytes, stored_bytes = 0, 0, 0, 0, 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                text(f"SELECT id, {name} AS response FROM {table} WHERE id > :after_id ORDER BY id LIMIT :batch_size"),
+                {"after_id": after_id, "batch_size": batch_size},
+            ).all()
+            if not rows:
+                break
+            updates = []
+            for row in rows:
+                value = row.response
+                # Deduplicated rows keep their text in response_bodies.
+                if value is None:
+                    continue
+                if isinstance(value, (bytes, memoryview)):
+                    value = bytes(value)
+                    # Already encoded (with a header byte); otherwise plain UTF-8 from `convert`.
+                    if value[:1] in (RAW, ZLIB, ZSTD):
+                        continue
+                    value = response_codec.decode(value)
+                encoded = response_codec.encode(value)
+                raw_bytes += len(value.encode("utf-8"))
+                stored_bytes += len(encoded)
+                updates.append({"id": row.id, "response": encoded})
+            if updates:
+                connection.execute(text(f"UPDATE {table} SET {name} = :response WHERE id = :id"), updates)
+        scanned += len(rows)
+        compressed += len(updates)
+        after_id = rows[-1].id
+        print(f"{table}: {scanned:>10} rows scanned, {compressed} rewritten (last id {after_id})")
+        if pause_ms:
+            time.sleep(pause_ms / 1000)
+    ratio = raw_bytes / stored_bytes if stored_bytes else 0.0
+    print(f"migrate {table}.{name}: {compressed} of {scanned} rows rewritten in {time.perf_counter() - started:.1f} s, ratio {ratio:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Moves query_responses.response to compressed storage. Steps: train (zstd only), convert, "
+        "deploy with RESPONSE_COMPRESSION set, then migrate while the application keeps running."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train", help="train a zstd dictionary on stored responses")
+    train_parser.add_argument("--samples", type=int, default=10000)
+    train_parser.add_argument("--size", type=int, default=112640, help="dictionary size in bytes")
+    train_parser.add_argument("--out", default="responses.zdict")
+    commands.add_parser("convert", help="change the columns to a binary type (PostgreSQL: rewrites the tables)")
+    migrate_parser = commands.add_parser("migrate", help="compress existing rows in batches")
+    migrate_parser.add_argument("--batch-size", type=int, default=1000)
+    migrate_parser.add_argument("--pause-ms", type=float, default=0.0, help="sleep between batches to limit load")
+    args = parser.parse_args()
+    if args.command == "train":
+        train(args.samples, args.size, args.out)
+    elif args.command == "convert":
+        convert()
+    else:
+        migrate(args.batch_size, args.pause_ms)
@@ -0,0 +1,96 @@
+# Specify version and import
+import argparse  #  No specific version required
+import time  #  No specific version required
+
+from sqlalchemy import inspect, select, text, update  # Version: 2.0.36
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert  # Version: 2.0.36
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # Version: 2.0.36
+from sqlalchemy.orm import Session  # Version: 2.0.36
+
+from api.src.core.db.config import SessionLocal, engine
+from api.src.core.db.models import QueryResponse
+from api.src.core.db.models.response_body_model import ResponseBody
+from api.src.core.db.utils.response_bodies import body_hash
+from api.src.core.db.utils.search import create_search_index
+
+INSERT = {"postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+#  Function Definitions
+def upgrade_schema():
+    """Creates response_bodies, adds query_responses.response_hash and lets the inline response be NULL."""
+    backend = engine.url.get_backend_name()
+    if backend not in INSERT:
+        raise SystemExit(f"Unsupported database backend: {backend}")
+    ResponseBody.__table__.create(engine, checkfirst=True)
+    columns = {column["name"]: column for column in inspect(engine).get_columns(QueryResponse.__tablename__)}
+    if "response_hash" in columns and columns["response"]["nullable"]:
+        print("query_responses: already upgraded")
+        return
+    if backend == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text(
+                "ALTER TABLE query_responses ALTER COLUMN response DROP NOT NULL, "
+                "ADD COLUMN IF NOT EXISTS response_hash VARCHAR(64) REFERENCES response_bodies (hash)"
+            ))
+            connection.execute(text("CREATE INDEX IF NOT EXISTS ix_query_responses_response_hash ON query_responses (response_hash)"))
+        print("query_responses: upgraded in place")
+        return
+    # SQLite cannot drop NOT NULL in place, so the table is rebuilt.
+    table = QueryResponse.__table__
+    with engine.connect() as connection:
+        connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        connection.exec_driver_sql("PRAGMA legacy_alter_table=ON")
+        connection.commit()
+        with connection.begin():
+            for index in inspect(connection).get_indexes(table.name):
+                connection.execute(text(f"DROP INDEX {index['name']}"))
+            connection.execute(text(f"ALTER TABLE {table.name} RENAME TO {table.name}_old"))
+            table.create(connection)
+            names = ", ".join(column.name for column in table.columns if column.name in columns)
+            connection.execute(text(f"INSERT INTO {table.name} ({names}) SELECT {names} FROM {table.name}_old"))
+            connection.execute(text(f"DROP TABLE {table.name}_old"))
+            # The search index trigger was dropped with the old table.
+            create_search_index(table, connection)
+    print("query_responses: rebuilt")
+
+
+def migrate(db: Session, batch_size: int) -> int:
+    """Moves inline responses to response_bodies in ID order, one committed batch at a time; returns the rows moved."""
+    insert = INSERT[engine.url.get_backend_name()]
+    moved, stored, after_id = 0, 0, 0
+    while True:
+        rows = db.execute(
+            select(QueryResponse.id, QueryResponse.response_text)
+            .where(QueryResponse.response_hash.is_(None), QueryResponse.id > after_id)
+            .order_by(QueryResponse.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            print(f"{moved} rows now share {stored} new bodies")
+            return moved
+        hashes = {row.id: body_hash(row.response_text) for row in rows}
+        bodies = {hashes[row.id]: row.response_text for row in rows}
+        result = db.execute(
+            insert(ResponseBody).values([{"hash": digest, "body": body} for digest, body in sorted(bodies.items())])
+            .on_conflict_do_nothing(index_elements=["hash"])
+        )
+        db.execute(update(QueryResponse), [{"id": row_id, "response_hash": digest, "response_text": None} for row_id, digest in hashes.items()])
+        db.commit()
+        moved += len(rows)
+        stored += max(result.rowcount, 0)
+        after_id = rows[-1].id
+        print(f"{moved:>10} rows moved (last id {after_id})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Moves response texts stored inline in query_responses to the deduplicated response_bodies table. "
+        "Back up the database first; on SQLite the table is rebuilt."
+    )
+    parser.add_argument("--batch-size", type=int, default=2000)
+    args = parser.parse_args()
+    upgrade_schema()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        total = migrate(db, args.batch_size)
+    print(f"migrate: {total} rows in {time.perf_counter() - started:.1f} s")
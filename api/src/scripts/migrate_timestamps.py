@@ -0,0 +1,77 @@
+# Specify version and import
+import argparse  #  No specific version required
+
+from sqlalchemy import DateTime, Table, inspect, text  # Version: 2.0.36
+from sqlalchemy.engine import Connection  # Version: 2.0.36
+
+from api.src.core.db.config import engine
+from api.src.core.db.models import QueryResponse, User
+
+TIMESTAMP_COLUMNS = ("created_at", "updated_at")
+
+#  Function Definitions
+def needs_migration(table: Table) -> bool:
+    """Returns True while the table still stores its timestamps as strings."""
+    columns = {column["name"]: column["type"] for column in inspect(engine).get_columns(table.name)}
+    return not all(isinstance(columns.get(name), DateTime) for name in TIMESTAMP_COLUMNS)
+
+
+def migrate_postgresql(connection: Connection, table: Table):
+    """Converts the columns in place to timestamptz with a now() default."""
+    # Old values carry no zone; read them as UTC.
+    connection.execute(text("SET LOCAL TIME ZONE 'UTC'"))
+    for name in TIMESTAMP_COLUMNS:
+        connection.execute(text(
+            f"ALTER TABLE {table.name} "
+            f"ALTER COLUMN {name} DROP DEFAULT, "
+            f"ALTER COLUMN {name} TYPE TIMESTAMPTZ USING COALESCE(NULLIF({name}, '')::timestamptz, now()), "
+            f"ALTER COLUMN {name} SET DEFAULT now()"
+        ))
+    for index in table.indexes:
+        index.create(connection, checkfirst=True)
+
+
+def migrate_sqlite(connection: Connection, table: Table):
+    """Rebuilds the table, since SQLite cannot change a column's type or default in place."""
+    old_columns = [column["name"] for column in inspect(connection).get_columns(table.name)]
+    for index in inspect(connection).get_indexes(table.name):
+        connection.execute(text(f"DROP INDEX {index['name']}"))
+    connection.execute(text(f"ALTER TABLE {table.name} RENAME TO {table.name}_old"))
+    table.create(connection)
+    columns = [column.name for column in table.columns if column.name in old_columns]
+    # strftime accepts ISO 8601 with a "T" separator or a UTC offset and returns UTC in the
+    # format CURRENT_TIMESTAMP uses; values it cannot parse get the migration time.
+    values = [
+        f"COALESCE(strftime('%Y-%m-%d %H:%M:%S', {name}), CURRENT_TIMESTAMP)" if name in TIMESTAMP_COLUMNS else name
+        for name in columns
+    ]
+    connection.execute(text(f"INSERT INTO {table.name} ({', '.join(columns)}) SELECT {', '.join(values)} FROM {table.name}_old"))
+    connection.execute(text(f"DROP TABLE {table.name}_old"))
+
+
+def migrate():
+    """Migrates every table whose timestamps are still strings."""
+    backend = engine.url.get_backend_name()
+    if backend not in ("postgresql", "sqlite"):
+        raise SystemExit(f"Unsupported database backend: {backend}")
+    with engine.connect() as connection:
+        if backend == "sqlite":
+            # Keep query_responses.user_id pointing at "users" while that table is rebuilt.
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.exec_driver_sql("PRAGMA legacy_alter_table=ON")
+            connection.commit()
+        for table in (User.__table__, QueryResponse.__table__):
+            if not needs_migration(table):
+                print(f"{table.name}: already migrated")
+                continue
+            with connection.begin():
+                (migrate_sqlite if backend == "sqlite" else migrate_postgresql)(connection, table)
+            print(f"{table.name}: migrated")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Converts users and query_responses timestamps from strings to timestamp columns with server defaults. Back up the database first."
+    )
+    parser.parse_args()
+    migrate()
@@ -0,0 +1,207 @@
+# Specify version and import
+import argparse  #  No specific version required
+from datetime import datetime, timedelta, timezone  #  No specific version required
+import time  #  No specific version required
+
+from sqlalchemy import MetaData, func, select, text  # Version: 2.0.36
+
+from api.src.config.settings import Settings
+from api.src.core.db.config import engine
+from api.src.core.db.models import QueryResponse
+from api.src.core.db.models.response_body_model import ResponseBody
+from api.src.core.db.utils.retention import response_archive
+
+settings = Settings()
+
+PARTITIONED = "query_responses_partitioned"
+
+#  Function Definitions
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def next_month(value: datetime) -> datetime:
+    return month_start(month_start(value) + timedelta(days=32))
+
+
+def partition_name(start: datetime) -> str:
+    return f"query_responses_y{start.year:04d}m{start.month:02d}"
+
+
+def require_postgresql():
+    if engine.dialect.name != "postgresql":
+        raise SystemExit(f"Time partitioning needs PostgreSQL; {engine.dialect.name} is not supported.")
+
+
+def is_partitioned(connection) -> bool:
+    return connection.execute(text("SELECT relkind = 'p' FROM pg_class WHERE oid = 'query_responses'::regclass")).scalar()
+
+
+def create_partitions(connection, parent: str, start: datetime, months_ahead: int) -> int:
+    """Creates the monthly partitions of `parent` from `start` until `months_ahead` months after now; returns how many were new."""
+    end = month_start(datetime.now(timezone.utc))
+    for _ in range(months_ahead + 1):
+        end = next_month(end)
+    created, month = 0, month_start(start)
+    while month < end:
+        name = partition_name(month)
+        exists = connection.execute(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}).scalar()
+        if not exists:
+            connection.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {parent} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+            ))
+            created += 1
+        month = next_month(month)
+    return created
+
+
+def convert(months_ahead: int, batch_size: int):
+    """
+    Replaces query_responses with a table range-partitioned by month of created_at.
+
+    Rows are copied in ID batches while the application keeps writing; the final swap locks
+    the table, copies the rows written meanwhile and renames the tables. Stop the retention
+    job first: rows it deletes during the copy would be copied back. The old table is kept
+    as query_responses_unpartitioned.
+    """
+    require_postgresql()
+    table = QueryResponse.__table__
+    with engine.begin() as connection:
+        if is_partitioned(connection):
+            print("query_responses is already partitioned")
+            return
+        oldest = connection.execute(text("SELECT min(created_at) FROM query_responses")).scalar() or datetime.now(timezone.utc)
+        # The partition key has to be part of the primary key.
+        connection.execute(text(
+            f"CREATE TABLE {PARTITIONED} (LIKE query_responses INCLUDING DEFAULTS INCLUDING CONSTRAINTS, "
+            "PRIMARY KEY (id, created_at), FOREIGN KEY (user_id) REFERENCES users (id), "
+            "FOREIGN KEY (response_hash) REFERENCES response_bodies (hash)) PARTITION BY RANGE (created_at)"
+        ))
+        for index in table.indexes:
+            columns = ", ".join(column.name for column in index.columns)
+            connection.execute(text(f"CREATE INDEX {index.name}_partitioned ON {PARTITIONED} ({columns})"))
+        created = create_partitions(connection, PARTITIONED, oldest, months_ahead)
+        # Catches rows outside the monthly partitions, e.g. if `ensure` stops running.
+        connection.execute(text(f"CREATE TABLE query_responses_default PARTITION OF {PARTITIONED} DEFAULT"))
+    print(f"{PARTITIONED} created with {created} monthly partitions from {month_start(oldest):%Y-%m}")
+
+    columns = ", ".join(column.name for column in table.columns)
+    copy = text(
+        f"INSERT INTO {PARTITIONED} ({columns}) SELECT {columns} FROM query_responses "
+        "WHERE id > :after_id AND id <= :until_id"
+    )
+    after_id, copied = 0, 0
+    started = time.perf_counter()
+    while True:
+        with engine.begin() as connection:
+            until_id = connection.execute(
+                text("SELECT max(id) FROM (SELECT id FROM query_responses WHERE id > :after_id ORDER BY id LIMIT :batch_size) batch"),
+                {"after_id": after_id, "batch_size": batch_size},
+            ).scalar()
+            if until_id is None:
+                break
+            copied += connection.execute(copy, {"after_id": after_id, "until_id": until_id}).rowcount
+        after_id = until_id
+        print(f"{copied:>10} rows copied (last id {after_id})")
+
+    with engine.begin() as connection:
+        connection.execute(text("LOCK TABLE query_responses IN ACCESS EXCLUSIVE MODE"))
+        copied += connection.execute(copy, {"after_id": after_id, "until_id": 2 ** 63 - 1}).rowcount
+        sequence = connection.execute(text("SELECT pg_get_serial_sequence('query_responses', 'id')")).scalar()
+        # A partitioned table cannot be the target of a foreign key on id alone; search index rows
+        # of deleted responses are removed explicitly instead (see core/db/utils/search.py).
+        connection.execute(text("ALTER TABLE IF EXISTS query_responses_search DROP CONSTRAINT IF EXISTS query_responses_search_id_fkey"))
+        connection.execute(text("ALTER TABLE query_responses RENAME TO query_responses_unpartitioned"))
+        connection.execute(text("ALTER TABLE query_responses_unpartitioned RENAME CONSTRAINT query_responses_pkey TO query_responses_unpartitioned_pkey"))
+        for index in table.indexes:
+            connection.execute(text(f"ALTER INDEX IF EXISTS {index.name} RENAME TO {index.name}_unpartitioned"))
+            connection.execute(text(f"ALTER INDEX {index.name}_partitioned RENAME TO {index.name}"))
+        connection.execute(text(f"ALTER TABLE {PARTITIONED} RENAME TO query_responses"))
+        if sequence:
+            connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY query_responses.id"))
+    print(f"convert: {copied} rows copied in {time.perf_counter() - started:.1f} s; old table kept as query_responses_unpartitioned")
+
+
+def ensure(months_ahead: int):
+    """Creates the monthly partitions of the next `months_ahead` months. Run it from cron, e.g. daily."""
+    require_postgresql()
+    with engine.begin() as connection:
+        if not is_partitioned(connection):
+            raise SystemExit("query_responses is not partitioned; run `convert` first.")
+        created = create_partitions(connection, "query_responses", datetime.now(timezone.utc), months_ahead)
+    print(f"ensure: {created} partitions created")
+
+
+def drop_expired(dry_run: bool):
+    """
+    Drops whole monthly partitions whose rows have all expired, archiving them first when
+    RETENTION_ARCHIVE_DIR is set. Much cheaper than deleting the rows one batch at a time.
+
+    A partition is dropped only once every row in it is older than the longest retention
+    period, so per-user periods are respected; the retention job prunes the rest.
+    """
+    require_postgresql()
+    periods = [settings.RETENTION_DAYS, *settings.RETENTION_USER_DAYS.values()]
+    if settings.RETENTION_DAYS <= 0 or 0 in periods:
+        raise SystemExit("Some rows are kept forever (a retention period of 0); no partition can be dropped whole.")
+    cutoff = datetime.now(timezone.utc) - timedelta(days=max(periods))
+    with engine.connect() as connection:
+        if not is_partitioned(connection):
+            raise SystemExit("query_responses is not partitioned; run `convert` first.")
+        names = connection.execute(text(
+            "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'query_responses'::regclass AND child.relname ~ '^query_responses_y[0-9]{4}m[0-9]{2}$' "
+            "ORDER BY child.relname"
+        )).scalars().all()
+    for name in names:
+        start = datetime(int(name[-7:-3]), int(name[-2:]), 1, tzinfo=timezone.utc)
+        if next_month(start) > cutoff:
+            break
+        if dry_run:
+            print(f"would drop {name}")
+            continue
+        archived = 0
+        if response_archive is not None:
+            # Read through a copy of the model's table named after the partition, so deduplicated and
+            # compressed responses are archived as text.
+            partition = QueryResponse.__table__.to_metadata(MetaData(), name=name)
+            response = func.coalesce(
+                partition.c.response,
+                select(ResponseBody.body).where(ResponseBody.hash == partition.c.response_hash).scalar_subquery(),
+            )
+            columns = [column for column in partition.c if column.name not in ("response", "response_hash")]
+            with engine.connect() as connection:
+                rows = connection.execute(
+                    select(*columns, response.label("response"))
+                    .order_by(partition.c.created_at, partition.c.id)
+                    .execution_options(stream_results=True, yield_per=settings.EXPORT_BATCH_SIZE)
+                ).mappings()
+                archived = sum(response_archive.append(batch) for batch in rows.partitions())
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE query_responses DETACH PARTITION {name}"))
+            connection.execute(text(f"DELETE FROM query_responses_search WHERE id IN (SELECT id FROM {name})"))
+            connection.execute(text(f"DROP TABLE {name}"))
+        print(f"{name} dropped ({archived} rows archived)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time-partitions query_responses by month on PostgreSQL. Steps: convert, then run ensure "
+        "regularly to create upcoming partitions, and drop-expired to remove months past their retention period."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    convert_parser = commands.add_parser("convert", help="copy query_responses into a partitioned table and swap them")
+    convert_parser.add_argument("--months-ahead", type=int, default=3)
+    convert_parser.add_argument("--batch-size", type=int, default=5000)
+    ensure_parser = commands.add_parser("ensure", help="create the partitions of upcoming months")
+    ensure_parser.add_argument("--months-ahead", type=int, default=3)
+    drop_parser = commands.add_parser("drop-expired", help="archive and drop partitions past the retention period")
+    drop_parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    if args.command == "convert":
+        convert(args.months_ahead, args.batch_size)
+    elif args.command == "ensure":
+        ensure(args.months_ahead)
+    else:
+        drop_expired(args.dry_run)
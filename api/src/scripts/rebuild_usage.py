@@ -0,0 +1,91 @@
+# Specify version and import
+import argparse  #  No specific version required
+from datetime import date, datetime, time as day_start, timezone  #  No specific version required
+import time  #  No specific version required
+
+from sqlalchemy import delete, func, insert, select  # Version: 2.0.36
+
+from api.src.config.settings import Settings
+from api.src.core.db.config import engine
+from api.src.core.db.models.query_model import QueryResponse
+from api.src.core.db.models.usage_model import UsageDaily
+from api.src.core.db.utils.usage import COUNTERS, usage_deltas, usage_values
+
+settings = Settings()
+
+#  Function Definitions
+def as_datetime(day: date) -> datetime:
+    return datetime.combine(day, day_start.min, tzinfo=timezone.utc)
+
+
+def computed_usage(since: date, until: date) -> dict:
+    """Aggregates the usage of the responses created on days [since, until) by scanning query_responses."""
+    deltas = {}
+    statement = (
+        select(QueryResponse.user_id, QueryResponse.model, QueryResponse.query, QueryResponse.response, QueryResponse.created_at)
+        .where(QueryResponse.created_at >= as_datetime(since), QueryResponse.created_at < as_datetime(until))
+        .execution_options(stream_results=True, yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    scanned = 0
+    with engine.connect() as connection:
+        for batch in connection.execute(statement).mappings().partitions():
+            for key, counters in usage_deltas(batch).items():
+                total = deltas.setdefault(key, dict.fromkeys(COUNTERS, 0))
+                for counter in COUNTERS:
+                    total[counter] += counters[counter]
+            scanned += len(batch)
+            print(f"{scanned:>10} rows scanned", end="\r")
+    print()
+    return deltas
+
+
+def stored_usage(connection, since: date, until: date) -> dict:
+    rows = connection.execute(select(UsageDaily.__table__).where(UsageDaily.day >= since, UsageDaily.day < until)).mappings().all()
+    return {(row["user_id"], row["day"], row["model"]): {counter: row[counter] for counter in COUNTERS} for row in rows}
+
+
+def rebuild(since: date, until: date, check: bool) -> int:
+    """
+    Recomputes usage_daily for days [since, until) from query_responses. With `check`, only
+    reports the keys whose stored counters differ; otherwise replaces the stored rows in one
+    transaction. Returns the number of differing keys.
+    """
+    started = time.perf_counter()
+    computed = computed_usage(since, until)
+    with engine.begin() as connection:
+        stored = stored_usage(connection, since, until)
+        differences = sorted(key for key in computed.keys() | stored.keys() if computed.get(key) != stored.get(key))
+        for user_id, day, model in differences[:50]:
+            key = (user_id, day, model)
+            print(f"user {user_id} {day} {model}: stored {stored.get(key)}, computed {computed.get(key)}")
+        if len(differences) > 50:
+            print(f"... and {len(differences) - 50} more")
+        if not check and differences:
+            connection.execute(delete(UsageDaily).where(UsageDaily.day >= since, UsageDaily.day < until))
+            values = usage_values(computed)
+            if values:
+                connection.execute(insert(UsageDaily), values)
+    action = "checked" if check else "rebuilt"
+    print(f"{action}: {len(computed)} keys over {since} to {until}, {len(differences)} differing, in {time.perf_counter() - started:.1f} s")
+    return len(differences)
+
+
+def oldest_day() -> date:
+    with engine.connect() as connection:
+        oldest = connection.execute(select(func.min(QueryResponse.created_at))).scalar()
+    return oldest.date() if oldest is not None else datetime.now(timezone.utc).date()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recomputes the per-user daily usage aggregates from query_responses, or checks them with --check. "
+        "Days whose responses were pruned by retention cannot be recomputed; pass --since after the retention cutoff."
+    )
+    parser.add_argument("--since", type=date.fromisoformat, help="first day, YYYY-MM-DD (default: day of the oldest response)")
+    parser.add_argument("--until", type=date.fromisoformat, help="day after the last one (default: today, which is still being written)")
+    parser.add_argument("--check", action="store_true", help="report differences without changing anything; exits with 1 if any")
+    args = parser.parse_args()
+    today = datetime.now(timezone.utc).date()
+    differing = rebuild(args.since or oldest_day(), args.until or today, args.check)
+    if args.check and differing:
+        raise SystemExit(1)
@@ -1,7 +1,7 @@
 # Specify version and import
 from sqlalchemy.orm import Session  # Version: 2.0.36
 from api.src.core.db.models import User, QueryResponse  # Version: 2.0.36
-from api.src.core.db.utils.db_utils import get_db  # Version: 2.9.2
+from api.src.core.db.config import SessionLocal  # Version: 2.9.2
 from api.src.config.settings import Settings  # Version: 2.9.2
 
 settings = Settings()
@@ -36,5 +36,8 @@ def seed_db(db: Session):
 
 
 if __name__ == "__main__":
-    db = get_db()
-    seed_db(db)
\ No newline at end of file
+    db = SessionLocal()
+    try:
+        seed_db(db)
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,95 @@
+# Specify version and import
+import argparse  #  No specific version required
+import json  #  No specific version required
+import threading  #  No specific version required
+import time  #  No specific version required
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  #  No specific version required
+
+
+class StubOpenAIServer:
+    """
+    Local stand-in for the OpenAI completions endpoint.
+
+    Answers every `POST .../completions` after `latency` seconds with a completion that
+    echoes the prompt, so the LLM client can be tested and benchmarked without network access.
+
+    Args:
+        latency (float, optional): Seconds to wait before answering each request. Defaults to 0.
+        host (str, optional): Interface to bind. Defaults to "127.0.0.1".
+        port (int, optional): Port to bind, 0 picks a free one. Defaults to 0.
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1", port: int = 0):
+        self.latency = latency
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _make_handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                if not self.path.endswith("/completions"):
+                    self.send_error(404)
+                    return
+                time.sleep(stub.latency)
+                with stub._lock:
+                    stub.requests_served += 1
+                prompts = body.get("prompt", "")
+                if isinstance(prompts, str):
+                    prompts = [prompts]
+                payload = json.dumps({
+                    "id": "cmpl-stub",
+                    "object": "text_completion",
+                    "created": int(time.time()),
+                    "model": body.get("model", ""),
+                    "choices": [
+                        {"text": f"Echo: {prompt}", "index": index, "logprobs": None, "finish_reason": "stop"}
+                        for index, prompt in enumerate(prompts)
+                    ],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs a local stand-in for the OpenAI completions API.")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    server = StubOpenAIServer(latency=args.latency_ms / 1000, port=args.port).start()
+    print(f"Stub OpenAI server listening on {server.base_url}")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
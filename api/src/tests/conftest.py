@@ -29,8 +29,9 @@ def create_tables():
 
 @pytest.fixture(scope="session")
 def engine():
-  """Returns the SQLAlchemy engine."""
-  return create_engine(database_url)
+  """Returns the application's shared SQLAlchemy engine."""
+  from api.src.core.db.config import engine as shared_engine
+  return shared_engine
 
 @pytest.fixture(scope="session")
 def session(engine: create_engine) -> Generator:
@@ -85,4 +86,18 @@ def set_up_db(session: sessionmaker):
   """Sets up the database for testing."""
   session.begin_nested()
   yield
-  session.rollback()
\ No newline at end of file
+  session.rollback()
+
+@pytest.fixture(scope="function", autouse=True)
+def clear_response_cache():
+  """Empties the response cache so tests do not see each other's completions."""
+  from api.src.core.query.services.query_service import response_cache
+  response_cache.clear()
+  yield
+
+@pytest.fixture(scope="function", autouse=True)
+def disable_prompt_hash_lookup(monkeypatch: pytest.MonkeyPatch):
+  """Turns off stored-answer reuse, since responses written by earlier tests stay in the database."""
+  from api.src.core.query.services.query_service import settings as query_settings
+  monkeypatch.setattr(query_settings, "PROMPT_HASH_LOOKUP_ENABLED", False)
+  yield
@@ -0,0 +1,77 @@
+# Specify version and import
+import json  #  No specific version required
+from datetime import datetime, timezone  #  No specific version required
+import pytest  # Version: 8.3.3
+from fastapi.testclient import TestClient  # Version: 0.115.2
+from api.src.core import admin as admin_module  # Version: 0.115.2
+from api.src.core.auth.services import auth_service  # Version: 0.115.2
+from api.src.core.auth.services.auth_service import create_access_token  # Version: 0.115.2
+from api.src.core.db.models import User  # Version: 2.0.36
+from api.src.core.db.utils.retention import ResponseArchive  # Version: 2.9.2
+from api.src.core.query.services.query_service import response_cache  # Version: 2.9.2
+from api.src.tests.conftest import client, session, new_user  # Version: 2.9.2
+
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': user.email})}"}
+
+@pytest.fixture(scope="function")
+def admin_headers(new_user: User, monkeypatch: pytest.MonkeyPatch) -> dict:
+    """Makes the test user an administrator and returns their auth headers."""
+    monkeypatch.setattr(auth_service.settings, "ADMIN_EMAILS", [new_user.email])
+    return auth_headers(new_user)
+
+def cache_answer(key: str, query: str):
+    response_cache.set(key, {"model": "text-davinci-003", "query": query, "response": "42"})
+
+# Test that admin endpoints reject anonymous and non-admin users
+@pytest.mark.parametrize("method, path", [
+    ("get", "/admin/cache"),
+    ("delete", "/admin/cache"),
+    ("delete", "/admin/principals"),
+    ("post", "/admin/retention/run"),
+    ("get", "/admin/archive/2024-01-01"),
+])
+def test_admin_endpoints_require_admin(client: TestClient, new_user: User, method: str, path: str):
+    assert getattr(client, method)(path).status_code == 401
+    response = getattr(client, method)(path, headers=auth_headers(new_user))
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Admin privileges required"
+
+# Test that an administrator can list the cached prompts
+def test_admin_list_cache(client: TestClient, admin_headers: dict):
+    cache_answer("key-a", "What is the meaning of life?")
+    response = client.get("/admin/cache", headers=admin_headers)
+    assert response.status_code == 200
+    [entry] = response.json()["entries"]
+    assert (entry["key"], entry["query"], entry["model"]) == ("key-a", "What is the meaning of life?", "text-davinci-003")
+    assert response.json()["stats"]["size"] == 1
+
+# Test that an administrator can invalidate one cache entry or all of them
+def test_admin_invalidate_cache(client: TestClient, admin_headers: dict):
+    cache_answer("key-a", "What is the meaning of life?")
+    cache_answer("key-b", "What is the capital of France?")
+    cache_answer("key-c", "What is the capital of Spain?")
+    assert client.delete("/admin/cache/key-a", headers=admin_headers).json() == {"invalidated": 1}
+    assert client.delete("/admin/cache/key-a", headers=admin_headers).status_code == 404
+    assert response_cache.get("key-a") is None
+    assert response_cache.get("key-b") is not None
+    assert client.delete("/admin/cache", headers=admin_headers).json() == {"invalidated": 2}
+    assert client.get("/admin/cache", headers=admin_headers).json()["entries"] == []
+
+# Test that an administrator can list and read the archived responses, filtered by user
+def test_admin_read_archive(client: TestClient, admin_headers: dict, tmp_path, monkeypatch: pytest.MonkeyPatch):
+    archive = ResponseArchive(str(tmp_path / "archive"))
+    created_at = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    archive.append([
+        {"id": 1, "user_id": 1, "model": "text-davinci-003", "query": "Q1", "response": "A1", "created_at": created_at},
+        {"id": 2, "user_id": 2, "model": "text-davinci-003", "query": "Q2", "response": "A2", "created_at": created_at},
+    ])
+    monkeypatch.setattr(admin_module, "response_archive", archive)
+    assert [item["day"] for item in client.get("/admin/archive", headers=admin_headers).json()["days"]] == ["2024-01-01"]
+    response = client.get("/admin/archive/2024-01-01", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [1, 2]
+    filtered = client.get("/admin/archive/2024-01-01", params={"user_id": 2}, headers=admin_headers)
+    assert [json.loads(line)["query"] for line in filtered.text.splitlines()] == ["Q2"]
+    assert client.get("/admin/archive/2024-01-02", headers=admin_headers).status_code == 404
@@ -0,0 +1,68 @@
+# Specify version and import
+import asyncio  #  No specific version required
+import pytest  # Version: 8.3.3
+from api.src.core.utils.admission import ModelLimiter  # Version: 2.9.2
+from api.src.core.exceptions.base_exception import OverloadedError  # Version: 2.9.2
+
+async def hold(limiter: ModelLimiter, seconds: float, order: list, name: str):
+    async with limiter.acquire():
+        order.append(name)
+        await asyncio.sleep(seconds)
+
+# Test that requests beyond the concurrency limit wait and run in arrival order
+def test_acquire_queues_in_order():
+    order = []
+
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=5, queue_timeout=1)
+        await asyncio.gather(*(hold(limiter, 0.01, order, name) for name in "abc"))
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert order == ["a", "b", "c"]
+    assert limiter.stats()["admitted"] == 3
+    assert limiter.stats()["active"] == 0
+
+# Test that a full queue is rejected immediately with a retry hint
+def test_acquire_rejects_when_queue_full():
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+        results = await asyncio.gather(*(hold(limiter, 0.05, [], name) for name in "abc"), return_exceptions=True)
+        return limiter, results
+
+    limiter, results = asyncio.run(run())
+    rejected = [result for result in results if isinstance(result, OverloadedError)]
+    assert len(rejected) == 1
+    assert rejected[0].status_code == 429
+    assert rejected[0].retry_after >= 1
+    assert limiter.stats()["rejected"] == 1
+
+# Test that a request waiting past the queue deadline is rejected
+def test_acquire_times_out():
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=5, queue_timeout=0.01)
+        results = await asyncio.gather(hold(limiter, 0.1, [], "a"), hold(limiter, 0, [], "b"), return_exceptions=True)
+        return limiter, results
+
+    limiter, results = asyncio.run(run())
+    assert results[0] is None
+    assert isinstance(results[1], OverloadedError)
+    assert limiter.stats()["timed_out"] == 1
+    assert limiter.stats()["active"] == 0
+
+# Test that check rejects only when every slot is taken and the queue is full, without taking a slot
+def test_check_rejects_when_queue_full():
+    async def run():
+        limiter = ModelLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+        limiter.check()
+        holders = [asyncio.ensure_future(hold(limiter, 0.05, [], name)) for name in "ab"]
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError):
+            limiter.check()
+        await asyncio.gather(*holders)
+        limiter.check()
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.stats()["rejected"] == 1
+    assert limiter.stats()["admitted"] == 2
@@ -14,7 +14,9 @@ from api.src.tests.conftest import client, session, new_user  # Version: 2.9.2
 from unittest.mock import patch  # Version: 3.11.1
 from api.src.core.auth.utils.auth_utils import hash_password  # Version: 2.9.2
 from api.src.core.db.utils.db_utils import get_db  # Version: 2.9.2
+from api.src.core.db.config import AsyncSessionLocal  # Version: 2.9.2
 from api.src.main import app
+import asyncio  #  No specific version required
 
 settings = Settings()
 
@@ -41,14 +43,22 @@ def test_create_access_token():
 
 # Test for authenticating a user
 def test_authenticate_user(session: Session, new_user: User):
-    user_db = authenticate_user(user=UserSchema(email=new_user.email, password="testpassword"), db=session)
+    async def authenticate():
+        async with AsyncSessionLocal() as db:
+            return await authenticate_user(user=UserSchema(email=new_user.email, password="testpassword"), db=db)
+
+    user_db = asyncio.run(authenticate())
     assert user_db is not None
     assert user_db.email == new_user.email
 
 # Test for authenticating a user with invalid credentials
 def test_authenticate_user_invalid_credentials(session: Session, new_user: User):
+    async def authenticate():
+        async with AsyncSessionLocal() as db:
+            return await authenticate_user(user=UserSchema(email=new_user.email, password="wrongpassword"), db=db)
+
     with pytest.raises(AuthenticationError):
-        authenticate_user(user=UserSchema(email=new_user.email, password="wrongpassword"), db=session)
+        asyncio.run(authenticate())
 
 # Test for password hashing
 def test_hash_password():
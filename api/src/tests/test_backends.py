@@ -0,0 +1,111 @@
+# Specify version and import
+import asyncio  #  No specific version required
+import time  #  No specific version required
+from types import SimpleNamespace  #  No specific version required
+import pytest  # Version: 8.3.3
+from api.src.config.settings import Settings  # Version: 2.9.2
+from api.src.core.utils.backends import FakeBackend, OpenAIBackend  # Version: 1.52.0
+import openai  # Version: 1.52.0
+from api.src.scripts.stub_openai_server import StubOpenAIServer
+
+@pytest.fixture(scope="function")
+def stub_server():
+    """Starts a local stand-in for the OpenAI completions API."""
+    server = StubOpenAIServer(latency=0.2).start()
+    yield server
+    server.stop()
+
+def make_client(stub_server: StubOpenAIServer) -> OpenAIBackend:
+    return OpenAIBackend(Settings(OPENAI_API_KEY="test-key", OPENAI_BASE_URL=stub_server.base_url))
+
+# Test for a single completion against the stand-in server
+def test_complete(stub_server: StubOpenAIServer):
+    async def run():
+        client = make_client(stub_server)
+        try:
+            return await client.complete("What is the meaning of life?", "text-davinci-003")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == "Echo: What is the meaning of life?"
+    assert stub_server.requests_served == 1
+
+# Test that concurrent completions overlap instead of running one after another
+def test_complete_concurrently(stub_server: StubOpenAIServer):
+    async def run():
+        client = make_client(stub_server)
+        try:
+            return await asyncio.gather(*(client.complete(f"prompt {i}", "text-davinci-003") for i in range(10)))
+        finally:
+            await client.aclose()
+
+    started = time.perf_counter()
+    responses = asyncio.run(run())
+    elapsed = time.perf_counter() - started
+    assert responses == [f"Echo: prompt {i}" for i in range(10)]
+    assert elapsed < 10 * stub_server.latency / 2
+
+# Test that a batch completion keeps the order of the prompts
+def test_complete_many(stub_server: StubOpenAIServer):
+    async def run():
+        client = make_client(stub_server)
+        try:
+            return await client.complete_many(["a", "b", "c"], "text-davinci-003")
+        finally:
+            await client.aclose()
+
+    assert asyncio.run(run()) == ["Echo: a", "Echo: b", "Echo: c"]
+    assert stub_server.requests_served == 1
+
+# Test that a batch response missing a choice is an error, not an empty completion
+def test_complete_many_missing_choice(monkeypatch):
+    client = OpenAIBackend(Settings(OPENAI_API_KEY="test-key"))
+
+    async def create(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(index=1, text="b"), SimpleNamespace(index=0, text="a")])
+
+    monkeypatch.setattr(client._client.completions, "create", create)
+
+    async def run():
+        try:
+            return await client.complete_many(["a", "b", "c"], "text-davinci-003")
+        finally:
+            await client.aclose()
+
+    with pytest.raises(ValueError, match=r"\[2\]"):
+        asyncio.run(run())
+
+def make_fake_backend(**overrides) -> FakeBackend:
+    options = {"FAKE_BACKEND_LATENCY_MS": 0.0}
+    options.update(overrides)
+    return FakeBackend(Settings(**options))
+
+# Test that the fake backend answers deterministically
+def test_fake_backend_is_deterministic():
+    first = asyncio.run(make_fake_backend().complete("What is the meaning of life?", "text-davinci-003", max_tokens=10))
+    second = asyncio.run(make_fake_backend().complete("What is the meaning of life?", "text-davinci-003", max_tokens=10))
+    other = asyncio.run(make_fake_backend().complete("What is the capital of France?", "text-davinci-003", max_tokens=10))
+    assert first == second
+    assert first != other
+    assert len(first.split()) == 10
+
+# Test the canned response and streaming
+def test_fake_backend_canned_response_stream():
+    backend = make_fake_backend(FAKE_BACKEND_RESPONSE="The meaning of life is 42.")
+
+    async def collect():
+        return [text async for text in backend.stream("What is the meaning of life?", "text-davinci-003")]
+
+    assert "".join(asyncio.run(collect())) == "The meaning of life is 42."
+
+# Test the configured error rate
+def test_fake_backend_error_rate():
+    backend = make_fake_backend(FAKE_BACKEND_ERROR_RATE=1.0)
+    with pytest.raises(openai.APIConnectionError):
+        asyncio.run(backend.complete("What is the meaning of life?", "text-davinci-003"))
+
+# Test that latency samples follow the configured mean
+def test_fake_backend_latency_distribution():
+    backend = make_fake_backend(FAKE_BACKEND_LATENCY_MS=100.0, FAKE_BACKEND_LATENCY_DISTRIBUTION="exponential")
+    samples = [backend.sample_latency() for _ in range(5000)]
+    assert 0.09 < sum(samples) / len(samples) < 0.11
@@ -0,0 +1,72 @@
+# Specify version and import
+import pytest  # Version: 8.3.3
+from api.src.core.utils.cache import TTLCache  # Version: 2.9.2
+from api.src.core.query.utils.query_utils import make_cache_key  # Version: 2.9.2
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+# Test for cache hits and misses
+def test_get_set():
+    cache = TTLCache(maxsize=2, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+# Test for least-recently-used eviction
+def test_lru_eviction():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+# Test for per-entry expiry
+def test_ttl_expiry():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=2, ttl=10, timer=timer)
+    cache.set("a", 1)
+    timer.now = 9.9
+    assert cache.get("a") == 1
+    timer.now = 10.0
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+    assert len(cache) == 0
+
+# Test that an entry's own TTL can shorten, but not extend, the cache's TTL
+def test_per_entry_ttl():
+    timer = FakeTimer()
+    cache = TTLCache(maxsize=3, ttl=10, timer=timer)
+    cache.set("short", 1, ttl=2)
+    cache.set("long", 2, ttl=60)
+    timer.now = 2.0
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+    timer.now = 10.0
+    assert cache.get("long") is None
+
+# Test for explicit invalidation
+def test_invalidate_and_clear():
+    cache = TTLCache(maxsize=3, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.invalidate("a") is True
+    assert cache.invalidate("a") is False
+    assert cache.clear() == 1
+
+# Test that the cache key ignores whitespace differences but not parameters
+def test_make_cache_key():
+    key = make_cache_key("text-davinci-003", "What is  the capital of France? ", max_tokens=1024, temperature=0.5)
+    assert key == make_cache_key("text-davinci-003", " What is the capital of France?", temperature=0.5, max_tokens=1024)
+    assert key != make_cache_key("text-curie-001", "What is the capital of France?", max_tokens=1024, temperature=0.5)
+    assert key != make_cache_key("text-davinci-003", "What is the capital of France?", max_tokens=1024, temperature=0.9)
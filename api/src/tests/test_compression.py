@@ -0,0 +1,50 @@
+# Specify version and import
+import pytest  # Version: 8.3.3
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select, text  # Version: 2.0.36
+from api.src.core.db.utils.compression import RAW, ZLIB, CompressedText, ResponseCodec, zstandard  # Version: 2.9.2
+
+LONG_ANSWER = "The capital of France is Paris, which is also its largest city. " * 50
+
+# Test that long values are compressed, short ones stored raw, and both read back unchanged
+def test_codec_roundtrip():
+    codec = ResponseCodec("zlib")
+    encoded = codec.encode(LONG_ANSWER)
+    assert encoded[:1] == ZLIB
+    assert len(encoded) < len(LONG_ANSWER) / 5
+    assert codec.decode(encoded) == LONG_ANSWER
+    short = codec.encode("Paris")
+    assert short == RAW + b"Paris"
+    assert codec.decode(short) == "Paris"
+
+# Test that values stored before compression (plain UTF-8 without a header) still decode
+def test_codec_reads_unconverted_values():
+    assert ResponseCodec("zlib").decode("Ünïcode answer".encode("utf-8")) == "Ünïcode answer"
+
+# Test that unknown methods and zstd without the zstandard package are rejected
+def test_codec_rejects_unavailable_methods():
+    with pytest.raises(ValueError):
+        ResponseCodec("lz4")
+    if zstandard is None:
+        with pytest.raises(ValueError):
+            ResponseCodec("zstd")
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard is not installed")
+def test_codec_zstd_with_dictionary():
+    samples = [f"{LONG_ANSWER} Answer number {i}.".encode("utf-8") for i in range(200)]
+    dictionary = zstandard.train_dictionary(4096, samples).as_bytes()
+    codec = ResponseCodec("zstd", dictionary=dictionary)
+    assert codec.decode(codec.encode(LONG_ANSWER)) == LONG_ANSWER
+
+# Test that the column type compresses on write and decompresses on read, next to legacy text rows
+def test_compressed_text_column(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/test.db")
+    metadata = MetaData()
+    responses = Table("responses", metadata, Column("id", Integer, primary_key=True), Column("response", CompressedText(ResponseCodec("zlib"))))
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(responses), [{"id": 1, "response": LONG_ANSWER}])
+        connection.execute(text("INSERT INTO responses (id, response) VALUES (2, 'stored before compression')"))
+        stored = connection.execute(text("SELECT response FROM responses WHERE id = 1")).scalar()
+        rows = dict(connection.execute(select(responses.c.id, responses.c.response)).all())
+    assert isinstance(stored, bytes) and stored[:1] == ZLIB
+    assert rows == {1: LONG_ANSWER, 2: "stored before compression"}
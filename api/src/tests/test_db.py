@@ -0,0 +1,212 @@
+# Specify version and import
+import asyncio  #  No specific version required
+from datetime import datetime, timedelta, timezone  #  No specific version required
+import pytest  # Version: 8.3.3
+import sqlite3  #  No specific version required
+import time  #  No specific version required
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError  # Version: 2.0.36
+from sqlalchemy.pool import NullPool, QueuePool  # Version: 2.0.36
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # Version: 2.0.36
+from unittest.mock import patch  # Version: 3.11.1
+from api.src.core.db.config import read_sessionmaker, to_async_url  # Version: 2.9.2
+from api.src.core.db.models import Base, QueryResponse, User  # Version: 2.0.36
+from api.src.core.db.utils import db_utils  # Version: 2.9.2
+from api.src.core.db.utils.pool_metrics import PoolMetrics, instrumented_pool_class  # Version: 2.9.2
+from api.src.core.db.utils.read_routing import RecentWriters  # Version: 2.9.2
+from api.src.core.query.schemas import QueryRequest  # Version: 2.9.2
+
+# Test that sync connection strings are mapped onto the asyncio drivers
+@pytest.mark.parametrize("url, expected", [
+    ("sqlite:///./test.db", "sqlite+aiosqlite:///./test.db"),
+    ("postgresql://user:secret@db:5432/app", "postgresql+asyncpg://user:secret@db:5432/app"),
+    ("postgresql+psycopg2://user:secret@db/app", "postgresql+asyncpg://user:secret@db/app"),
+    ("postgres://user:secret@db/app", "postgresql+asyncpg://user:secret@db/app"),
+    ("sqlite+aiosqlite:///./test.db", "sqlite+aiosqlite:///./test.db"),
+])
+def test_to_async_url(url: str, expected: str):
+    assert to_async_url(url) == expected
+
+# Test that the async DB utilities store and read back a query response
+def test_create_and_get_query_response(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            user = User(email="async@example.com", hashed_password="testpassword")
+            db.add(user)
+            await db.commit()
+            query_request = QueryRequest(query="What is the meaning of life?", model="text-davinci-003", user_id=user.id)
+            created = await db_utils.create_query_response(db, query_request, "The meaning of life is 42.")
+        async with Session() as db:
+            fetched = await db_utils.get_query_response(db, created.id)
+            listed = await db_utils.get_query_responses(db, user_id=user.id)
+            by_email = await db_utils.get_user_by_email(db, "async@example.com")
+        await engine.dispose()
+        return created, fetched, listed, by_email
+
+    created, fetched, listed, by_email = asyncio.run(run())
+    assert fetched.response == "The meaning of life is 42."
+    assert [query_response.id for query_response in listed] == [created.id]
+    assert by_email.email == "async@example.com"
+
+# Test that write-behind only queues rows of existing users and inserts the others synchronously
+def test_write_behind_requires_existing_user(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            user = User(email="queued@example.com", hashed_password="testpassword")
+            db.add(user)
+            await db.commit()
+            with patch.object(db_utils.settings, "WRITE_BEHIND_ENABLED", True), \
+                 patch.object(db_utils.write_behind, "enqueue", return_value=True) as enqueue, \
+                 patch.object(db_utils, "_insert_query_response_rows") as insert_rows:
+                await db_utils.create_query_response(db, QueryRequest(query="Queued?", model="text-davinci-003", user_id=user.id), "Yes.")
+                await db_utils.create_query_response(db, QueryRequest(query="Queued?", model="text-davinci-003", user_id=user.id + 1), "No.")
+        await engine.dispose()
+        return user, enqueue, insert_rows
+
+    user, enqueue, insert_rows = asyncio.run(run())
+    assert [call.args[0]["user_id"] for call in enqueue.call_args_list] == [user.id]
+    [(_, rows), _] = insert_rows.call_args
+    assert [row["user_id"] for row in rows] == [user.id + 1]
+
+# Test that rows get their own server-side timestamps and can be filtered by creation time
+def test_get_query_responses_by_time_range(tmp_path):
+    start = datetime(2024, 3, 1, tzinfo=timezone.utc)
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            user = User(email="range@example.com", hashed_password="testpassword")
+            db.add(user)
+            await db.commit()
+            db.add_all([
+                QueryResponse(user_id=user.id, query=f"Question {day}", model="text-davinci-003", response=f"Answer {day}", created_at=start + timedelta(days=day))
+                for day in range(5)
+            ])
+            await db.commit()
+            query_request = QueryRequest(query="What time is it?", model="text-davinci-003", user_id=user.id)
+            created = await db_utils.create_query_response(db, query_request, "Now.")
+        async with Session() as db:
+            in_range = await db_utils.get_query_responses(db, user_id=user.id, since=start + timedelta(days=1), until=start + timedelta(days=3))
+            # Naive bounds are UTC
+            naive = await db_utils.get_query_responses(db, user_id=user.id, since=datetime(2024, 3, 4))
+            since_offset = await db_utils.get_query_responses(db, user_id=user.id, since=datetime(2024, 3, 4, 2, tzinfo=timezone(timedelta(hours=2))))
+        await engine.dispose()
+        return created, in_range, naive, since_offset
+
+    created, in_range, naive, since_offset = asyncio.run(run())
+    assert isinstance(created.created_at, datetime)
+    assert created.created_at.year >= 2025
+    assert [query_response.response for query_response in in_range] == ["Answer 1", "Answer 2"]
+    assert [query_response.response for query_response in naive] == ["Answer 3", "Answer 4", "Now."]
+    assert [query_response.response for query_response in since_offset] == ["Answer 3", "Answer 4", "Now."]
+
+# Test that checkouts, overflow connections and checkout timeouts are counted
+def test_pool_metrics():
+    metrics = PoolMetrics()
+    pool_class = instrumented_pool_class(QueuePool, metrics)
+    pool = pool_class(lambda: sqlite3.connect(":memory:", check_same_thread=False), pool_size=1, max_overflow=1, timeout=0.05)
+    first = pool.connect()
+    second = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    stats = metrics.stats(pool)
+    assert stats["pool"] == "QueuePool"
+    assert stats["checkedout"] == 2
+    assert stats["checkouts"] == 2
+    assert stats["connects"] == 2
+    assert stats["overflow_events"] == 1
+    assert stats["timeouts"] == 1
+    first.close()
+    second.close()
+    assert metrics.stats(pool)["checkedout"] == 0
+
+# Test that connections are counted for pools without overflow, and opening them is not counted as waiting
+def test_pool_metrics_connects():
+    def connect():
+        time.sleep(0.1)
+        return sqlite3.connect(":memory:", check_same_thread=False)
+
+    metrics = PoolMetrics()
+    pool = instrumented_pool_class(NullPool, metrics)(connect)
+    for _ in range(2):
+        pool.connect().close()
+    stats = metrics.stats(pool)
+    assert stats["pool"] == "NullPool"
+    assert stats["checkouts"] == 2
+    assert stats["connects"] == 2
+    assert stats["overflow_events"] == 0
+    assert stats["wait_ms"]["max"] < 50
+
+# Test that a user's reads stay on the primary only within the window after they write
+def test_recent_writers():
+    writers = RecentWriters(window=5.0)
+    with patch("api.src.core.db.utils.read_routing.time.monotonic", return_value=100.0):
+        writers.mark(1)
+        writers.mark(None)
+        assert writers.is_recent(1)
+        assert not writers.is_recent(2)
+        assert not writers.is_recent(None)
+    with patch("api.src.core.db.utils.read_routing.time.monotonic", return_value=105.0):
+        assert not writers.is_recent(1)
+    disabled = RecentWriters(window=0)
+    disabled.mark(1)
+    assert not disabled.is_recent(1)
+
+# Test replica routing with a primary and a (never-synced) replica in two SQLite files
+def test_read_replica_routing(tmp_path):
+    async def run():
+        primary_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/primary.db")
+        replica_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+        for engine in (primary_engine, replica_engine):
+            async with engine.begin() as connection:
+                await connection.run_sync(Base.metadata.create_all)
+        Primary = async_sessionmaker(primary_engine, expire_on_commit=False)
+        Replica = async_sessionmaker(replica_engine, expire_on_commit=False, info={"replica": True})
+        with patch("api.src.core.db.config.AsyncSessionLocal", Primary), \
+                patch("api.src.core.db.utils.db_utils.AsyncSessionLocal", Primary), \
+                patch("api.src.core.db.config.ReplicaSessionLocal", Replica):
+            async with Primary() as db:
+                writer = User(email="writer@example.com", hashed_password="testpassword")
+                db.add(writer)
+                await db.commit()
+                query_request = QueryRequest(query="What is the meaning of life?", model="text-davinci-003", user_id=writer.id)
+                created = await db_utils.create_query_response(db, query_request, "The meaning of life is 42.")
+            routed = {
+                "writer": read_sessionmaker(writer.id),
+                "other": read_sessionmaker(writer.id + 1),
+                "anonymous": read_sessionmaker(),
+            }
+            async with routed["writer"]() as db:
+                writer_rows = await db_utils.get_query_responses(db, user_id=writer.id)
+            async with Replica() as db:
+                replica_rows = await db_utils.get_query_responses(db, user_id=writer.id)
+                # Lookups by ID that miss on the replica are retried on the primary
+                by_id = await db_utils.get_query_response(db, created.id)
+                user = await db_utils.get_user(db, writer.id)
+        await primary_engine.dispose()
+        await replica_engine.dispose()
+        return created, routed, writer_rows, replica_rows, by_id, user, Primary, Replica
+
+    created, routed, writer_rows, replica_rows, by_id, user, Primary, Replica = asyncio.run(run())
+    assert routed == {"writer": Primary, "other": Replica, "anonymous": Replica}
+    assert [query_response.id for query_response in writer_rows] == [created.id]
+    assert replica_rows == []
+    assert by_id.response == "The meaning of life is 42."
+    assert user.email == "writer@example.com"
+
+# Test that every read goes to the primary when no replica is configured
+def test_read_sessionmaker_without_replica():
+    from api.src.core.db import config
+    with patch("api.src.core.db.config.ReplicaSessionLocal", None):
+        assert read_sessionmaker(1) is config.AsyncSessionLocal
+        assert read_sessionmaker() is config.AsyncSessionLocal
@@ -0,0 +1,91 @@
+# Specify version and import
+import asyncio  #  No specific version required
+import pytest  # Version: 8.3.3
+from api.src.core.utils.micro_batcher import MicroBatcher  # Version: 2.9.2
+
+class FakeBackend:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def complete_many(self, prompts, model, **params):
+        self.calls.append((list(prompts), model, params))
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise ValueError("upstream failed")
+        return [f"{model}: {prompt}" for prompt in prompts]
+
+# Test that concurrent prompts for the same model and params share one call
+def test_submit_batches_by_model_and_params():
+    backend = FakeBackend()
+
+    async def run():
+        batcher = MicroBatcher(backend.complete_many, max_batch_size=16, max_wait_ms=20)
+        results = await asyncio.gather(
+            batcher.submit("a", "text-davinci-003", temperature=0.5),
+            batcher.submit("b", "text-davinci-003", temperature=0.5),
+            batcher.submit("c", "text-curie-001", temperature=0.5),
+            batcher.submit("d", "text-davinci-003", temperature=0.9),
+        )
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert results == ["text-davinci-003: a", "text-davinci-003: b", "text-curie-001: c", "text-davinci-003: d"]
+    assert len(backend.calls) == 3
+    assert (["a", "b"], "text-davinci-003", {"temperature": 0.5}) in backend.calls
+    assert batcher.stats()["batch_sizes"] == {1: 2, 2: 1}
+
+# Test that a full batch is dispatched without waiting for the window
+def test_submit_flushes_full_batch():
+    backend = FakeBackend()
+
+    async def run():
+        batcher = MicroBatcher(backend.complete_many, max_batch_size=2, max_wait_ms=10_000)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(prompt, "text-davinci-003") for prompt in "abcd")),
+            timeout=1,
+        )
+
+    assert asyncio.run(run()) == [f"text-davinci-003: {prompt}" for prompt in "abcd"]
+    assert [call[0] for call in backend.calls] == [["a", "b"], ["c", "d"]]
+
+# Test that an upstream failure reaches every request in the batch
+def test_submit_propagates_failure():
+    backend = FakeBackend(fail=True)
+
+    async def run():
+        batcher = MicroBatcher(backend.complete_many, max_batch_size=16, max_wait_ms=5)
+        return await asyncio.gather(*(batcher.submit(prompt, "text-davinci-003") for prompt in "ab"), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+# Test that requests without a completion fail instead of waiting forever
+def test_submit_fails_requests_without_completion():
+    async def complete_many(prompts, model, **params):
+        return [f"{model}: {prompt}" for prompt in prompts[:-1]]
+
+    async def run():
+        batcher = MicroBatcher(complete_many, max_batch_size=16, max_wait_ms=5)
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(prompt, "text-davinci-003") for prompt in "abc"), return_exceptions=True),
+            timeout=1,
+        )
+
+    results = asyncio.run(run())
+    assert results[:2] == ["text-davinci-003: a", "text-davinci-003: b"]
+    assert isinstance(results[2], ValueError)
+
+# Test that cancelling a dispatch cancels the requests waiting on it
+def test_submit_cancelled_dispatch():
+    async def complete_many(prompts, model, **params):
+        await asyncio.Event().wait()
+
+    async def run():
+        batcher = MicroBatcher(complete_many, max_batch_size=2, max_wait_ms=10_000)
+        waiting = asyncio.gather(*(batcher.submit(prompt, "text-davinci-003") for prompt in "ab"), return_exceptions=True)
+        await asyncio.sleep(0.01)
+        for dispatch in list(batcher._dispatches):
+            dispatch.cancel()
+        return await asyncio.wait_for(waiting, timeout=1)
+
+    assert all(isinstance(result, asyncio.CancelledError) for result in asyncio.run(run()))
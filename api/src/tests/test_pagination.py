@@ -0,0 +1,26 @@
+# Specify version and import
+import pytest  # Version: 8.3.3
+from types import SimpleNamespace  #  No specific version required
+from api.src.core.exceptions.base_exception import PaginationError  # Version: 2.9.2
+from api.src.core.utils.pagination import decode_cursor, encode_cursor, make_page  # Version: 2.9.2
+
+# Test that a cursor round-trips to the ID it was made from
+def test_cursor_round_trip():
+    cursor = encode_cursor(1234567890123)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == 1234567890123
+    assert decode_cursor(None) is None
+
+# Test that malformed cursors are rejected
+@pytest.mark.parametrize("cursor", ["not-a-cursor", encode_cursor("7"), "e30"])
+def test_decode_invalid_cursor(cursor: str):
+    with pytest.raises(PaginationError):
+        decode_cursor(cursor)
+
+# Test that the extra row only signals a next page
+def test_make_page():
+    rows = [SimpleNamespace(id=i) for i in (3, 5, 8)]
+    page = make_page(rows, limit=2)
+    assert [row.id for row in page["items"]] == [3, 5]
+    assert decode_cursor(page["next_cursor"]) == 5
+    assert make_page(rows[:2], limit=2)["next_cursor"] is None
@@ -0,0 +1,117 @@
+# Specify version and import
+import asyncio  #  No specific version required
+from sqlalchemy import delete, update  # Version: 2.0.36
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # Version: 2.0.36
+from api.src.core.db.models import Base, User  # Version: 2.0.36
+from api.src.core.auth.utils import principal_cache as principal_cache_module  # Version: 2.9.2
+from api.src.core.auth.utils.principal_cache import PrincipalCache, principal_cache  # Version: 2.9.2
+
+async def create_session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
+
+# Test that a cached user is returned without another lookup, detached from any session
+def test_principal_cache_hit(tmp_path):
+    async def run():
+        engine, Session = await create_session_factory(tmp_path)
+        cache = PrincipalCache(maxsize=10, ttl=60)
+        async with Session() as db:
+            db.add(User(email="principal@example.com", hashed_password="testpassword"))
+            await db.commit()
+        async with Session() as db:
+            first = await cache.get_user(db, "principal@example.com")
+            second = await cache.get_user(db, "principal@example.com")
+            missing = await cache.get_user(db, "nobody@example.com")
+        await engine.dispose()
+        return cache, first, second, missing
+
+    cache, first, second, missing = asyncio.run(run())
+    assert second is not first
+    assert (second.id, second.email, second.hashed_password) == (first.id, first.email, first.hashed_password)
+    assert missing is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["lookups"]) == (1, 2, 2)
+    assert stats["hit_rate"] == 0.3333
+    assert abs(stats["saved_ms"] - stats["mean_lookup_ms"]) < 0.1
+
+# Test that a size of 0 always looks the user up
+def test_principal_cache_disabled(tmp_path):
+    async def run():
+        engine, Session = await create_session_factory(tmp_path)
+        cache = PrincipalCache(maxsize=0, ttl=60)
+        async with Session() as db:
+            db.add(User(email="disabled@example.com", hashed_password="testpassword"))
+            await db.commit()
+            for _ in range(3):
+                await cache.get_user(db, "disabled@example.com")
+        await engine.dispose()
+        return cache
+
+    cache = asyncio.run(run())
+    assert cache.lookups == 3
+    assert cache.stats()["hits"] == 0
+
+# Test that updating, renaming or deleting a user drops it from the cache
+def test_principal_cache_invalidated_on_change(tmp_path):
+    async def run():
+        engine, Session = await create_session_factory(tmp_path)
+        principal_cache.clear()
+        async with Session() as db:
+            user = User(email="old@example.com", hashed_password="first")
+            other = User(email="other@example.com", hashed_password="first")
+            db.add_all([user, other])
+            await db.commit()
+            await principal_cache.get_user(db, "old@example.com")
+            user.hashed_password = "second"
+            await db.commit()
+            updated = await principal_cache.get_user(db, "old@example.com")
+            user.email = "new@example.com"
+            await db.commit()
+            renamed_old = await principal_cache.get_user(db, "old@example.com")
+            renamed_new = await principal_cache.get_user(db, "new@example.com")
+            await db.delete(user)
+            await db.commit()
+            deleted = await principal_cache.get_user(db, "new@example.com")
+            await principal_cache.get_user(db, "other@example.com")
+            await db.execute(update(User).where(User.email == "other@example.com").values(hashed_password="second"))
+            await db.commit()
+            bulk_updated = await principal_cache.get_user(db, "other@example.com")
+            await db.execute(delete(User).where(User.email == "other@example.com"))
+            await db.commit()
+            bulk_deleted = await principal_cache.get_user(db, "other@example.com")
+        await engine.dispose()
+        return updated, renamed_old, renamed_new, deleted, bulk_updated, bulk_deleted
+
+    updated, renamed_old, renamed_new, deleted, bulk_updated, bulk_deleted = asyncio.run(run())
+    principal_cache.clear()
+    assert updated.hashed_password == "second"
+    assert renamed_old is None
+    assert renamed_new.email == "new@example.com"
+    assert deleted is None
+    assert bulk_updated.hashed_password == "second"
+    assert bulk_deleted is None
+
+# Test that a lookup racing with an invalidation is not cached
+def test_principal_cache_skips_stale_lookup(tmp_path, monkeypatch):
+    async def run():
+        engine, Session = await create_session_factory(tmp_path)
+        cache = PrincipalCache(maxsize=10, ttl=60)
+        lookup = principal_cache_module.get_user_by_email
+
+        async def racing_lookup(db, email):
+            user = await lookup(db, email)
+            cache.invalidate(email)
+            return user
+
+        async with Session() as db:
+            db.add(User(email="race@example.com", hashed_password="testpassword"))
+            await db.commit()
+            monkeypatch.setattr(principal_cache_module, "get_user_by_email", racing_lookup)
+            await cache.get_user(db, "race@example.com")
+        await engine.dispose()
+        return cache
+
+    cache = asyncio.run(run())
+    assert len(cache.cache) == 0
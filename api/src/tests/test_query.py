@@ -3,6 +3,7 @@ import pytest  # Version: 8.3.3
 from fastapi.testclient import TestClient  # Version: 0.115.2
 from sqlalchemy.orm import Session  # Version: 2.0.36
 from api.src.core.query.services.query_service import process_query as query_service  # Version: 0.115.2
+from api.src.core.query.services import query_service as query_service_module  # Version: 0.115.2
 from api.src.core.db.models import QueryResponse  # Version: 2.0.36
 from api.src.core.db.utils.db_utils import create_query_response  # Version: 2.9.2
 from api.src.core.query.schemas import QueryRequest, QueryResponse as QueryResponseSchema  # Version: 2.9.2
@@ -10,15 +11,25 @@ from api.src.config.settings import Settings  # Version: 2.9.2
 from api.src.exceptions.base_exception import QueryError  # Version: 2.9.2
 from api.src.tests.conftest import client, session, new_user, new_query_response  # Version: 2.9.2
 from typing import Optional  # Version: 2.9.2
+import asyncio  #  No specific version required
+from datetime import datetime, timedelta, timezone  #  No specific version required
+import json  #  No specific version required
+import httpx  # Version: 0.27.2
 import openai  # Version: 1.52.0
 from unittest.mock import patch  # Version: 3.11.1
 from api.src.utils.openai_utils import make_openai_request  # Version: 2.9.2
 from api.src.core.db.utils.db_utils import get_db  # Version: 2.9.2
+from api.src.core.db.config import AsyncSessionLocal  # Version: 2.9.2
 from api.src.main import app
+from api.src.core.auth.services import auth_service  # Version: 0.115.2
+from api.src.core.auth.services.auth_service import create_access_token  # Version: 0.115.2
 
 settings = Settings()
 openai.api_key = settings.OPENAI_API_KEY
 
+def auth_headers(user: User) -> dict:
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': user.email})}"}
+
 def test_process_query_success(client: TestClient, session: Session, new_user: User):
     query_request = QueryRequest(query="What is the meaning of life?", model="text-davinci-003", user_id=new_user.id)
     with patch("api.src.core.query.services.query_service.make_openai_request") as mock_openai_request:
@@ -49,17 +60,328 @@ def test_process_query_database_error(client: TestClient, session: Session, new_
         assert response.status_code == 400
         assert response.json()["detail"].startswith("Error processing query")
 
+def test_process_query_cached(client: TestClient, session: Session, new_user: User):
+    query_request = QueryRequest(query="What is the meaning of life?", model="text-davinci-003", user_id=new_user.id)
+    with patch("api.src.core.query.services.query_service.make_openai_request") as mock_openai_request:
+        mock_openai_request.return_value = "The meaning of life is 42."
+        first = client.post("/query", json=query_request.dict())
+        second = client.post("/query", json={**query_request.dict(), "query": "  What is the meaning of life?"})
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json()["response"] == "The meaning of life is 42."
+        assert second.json()["query_id"] != first.json()["query_id"]
+        assert mock_openai_request.call_count == 1
+
+def test_process_query_single_flight(session: Session, new_user: User):
+    query_request = QueryRequest(query="What is the meaning of life?", model="text-davinci-003", user_id=new_user.id)
+    upstream_calls = 0
+
+    async def slow_completion(*args, **kwargs):
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.2)
+        return "The meaning of life is 42."
+
+    async def post_concurrently(count: int):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as async_client:
+            return await asyncio.gather(*(async_client.post("/query", json=query_request.dict()) for _ in range(count)))
+
+    with patch("api.src.core.query.services.query_service.make_openai_request", side_effect=slow_completion):
+        responses = asyncio.run(post_concurrently(10))
+    assert all(response.status_code == 200 for response in responses)
+    assert all(response.json()["response"] == "The meaning of life is 42." for response in responses)
+    assert upstream_calls == 1
+
+def test_stream_query(session: Session, new_user: User):
+    query_request = QueryRequest(query="What is the meaning of life?", model="text-davinci-003", user_id=new_user.id)
+
+    async def fake_stream(*args, **kwargs):
+        for text in ["The meaning ", "of life ", "is 42."]:
+            yield text
+
+    async def collect():
+        return [event async for event in query_service_module.stream_query(query_request)]
+
+    with patch("api.src.core.query.services.query_service.stream_openai_request", side_effect=fake_stream):
+        events = asyncio.run(collect())
+    assert events[:3] == [f'data: {{"text": "{text}"}}\n\n' for text in ["The meaning ", "of life ", "is 42."]]
+    assert events[3].startswith("event: done\n")
+    query_id = json.loads(events[3].split("data: ", 1)[1])["query_id"]
+    query_response = session.query(QueryResponse).filter_by(id=query_id).first()
+    assert query_response.response == "The meaning of life is 42."
+
+def test_process_queries(session: Session, new_user: User):
+    query_requests = [
+        QueryRequest(query="What is the capital of France?", model="text-davinci-003", user_id=new_user.id),
+        QueryRequest(query="fail", model="text-davinci-003", user_id=new_user.id),
+        QueryRequest(query="What is the meaning of life?", model="text-davinci-003", user_id=new_user.id),
+    ]
+
+    async def fake_completion(query, model, **kwargs):
+        if query == "fail":
+            raise QueryError(detail="OpenAI API error: boom")
+        return f"Answer to {query}"
+
+    with patch("api.src.core.query.services.query_service.make_openai_request", side_effect=fake_completion):
+        async def process():
+            async with AsyncSessionLocal() as db:
+                return await query_service_module.process_queries(query_requests, db)
+
+        results = asyncio.run(process())
+    assert [result.index for result in results] == [0, 1, 2]
+    assert results[0].response == "Answer to What is the capital of France?"
+    assert results[1].query_id is None
+    assert results[1].error == "OpenAI API error: boom"
+    assert session.query(QueryResponse).filter_by(id=results[2].query_id).first().response == "Answer to What is the meaning of life?"
+
+def test_process_query_circuit_open_uses_stored_answer(client: TestClient, session: Session, new_user: User, new_query_response: QueryResponse):
+    query_request = QueryRequest(query=new_query_response.query, model=new_query_response.model, user_id=new_user.id)
+    new_query_response.prompt_hash = query_service_module.make_prompt_hash(query_request)
+    session.commit()
+    breaker = query_service_module.circuit_breakers.get(query_request.model)
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    try:
+        with patch("api.src.core.query.services.query_service.make_openai_request") as mock_openai_request:
+            response = client.post("/query", json=query_request.dict())
+            assert mock_openai_request.call_count == 0
+        assert response.status_code == 200
+        assert response.json()["response"] == new_query_response.response
+        assert response.json()["fallback"] == "stored"
+    finally:
+        breaker.record_success()
+
+def test_process_query_reuses_stored_answer(client: TestClient, session: Session, new_user: User, monkeypatch: pytest.MonkeyPatch):
+    query_request = QueryRequest(query="What is the boiling point of water at sea level?", model="text-davinci-003", user_id=new_user.id)
+    stored = QueryResponse(
+        user_id=new_user.id,
+        query=query_request.query,
+        model=query_request.model,
+        response="100 degrees Celsius.",
+        prompt_hash=query_service_module.make_prompt_hash(query_request),
+    )
+    session.add(stored)
+    session.commit()
+    monkeypatch.setattr(query_service_module.settings, "PROMPT_HASH_LOOKUP_ENABLED", True)
+    with patch("api.src.core.query.services.query_service.make_openai_request") as mock_openai_request:
+        response = client.post("/query", json={**query_request.dict(), "query": "  What is the boiling point of water  at sea level?"})
+        assert mock_openai_request.call_count == 0
+    assert response.status_code == 200
+    assert response.json()["response"] == "100 degrees Celsius."
+    assert response.json()["fallback"] is None
+    assert response.json()["query_id"] != stored.id
+    query_response = session.query(QueryResponse).filter_by(id=response.json()["query_id"]).first()
+    # Reused answers are stored without a hash, so later lookups only find what the model answered
+    assert query_response.prompt_hash is None
+
+def test_micro_batch_burst_is_one_upstream_call(monkeypatch: pytest.MonkeyPatch):
+    # More prompts than the model's max_concurrency (8) still go out together: admission counts upstream calls.
+    calls = []
+
+    async def fake_batch_completion(prompts, model, **kwargs):
+        calls.append(list(prompts))
+        await asyncio.sleep(0.01)
+        return [f"Answer to {prompt}" for prompt in prompts]
+
+    async def burst():
+        query_requests = [QueryRequest(query=f"Burst question {i}", model="text-davinci-003", user_id=1) for i in range(16)]
+        return await asyncio.gather(*(query_service_module.generate_response(query_request) for query_request in query_requests))
+
+    monkeypatch.setattr(query_service_module.settings, "MICRO_BATCH_ENABLED", True)
+    monkeypatch.setattr(query_service_module, "make_openai_batch_request", fake_batch_completion)
+    limiter = query_service_module.admission.limiter("text-davinci-003")
+    admitted = limiter.admitted
+    assert settings.MICRO_BATCH_MAX_SIZE == 16 and limiter.max_concurrency == 8
+    responses = asyncio.run(burst())
+    assert responses == [f"Answer to Burst question {i}" for i in range(16)]
+    assert [len(prompts) for prompts in calls] == [16]
+    assert limiter.admitted - admitted == 1
+
+def test_process_query_ignores_expired_stored_answer(client: TestClient, session: Session, new_user: User, monkeypatch: pytest.MonkeyPatch):
+    query_request = QueryRequest(query="What is the tallest mountain?", model="text-davinci-003", user_id=new_user.id)
+    stored = QueryResponse(
+        user_id=new_user.id,
+        query=query_request.query,
+        model=query_request.model,
+        response="K2.",
+        prompt_hash=query_service_module.make_prompt_hash(query_request),
+        created_at=datetime.now(timezone.utc) - timedelta(seconds=settings.PROMPT_HASH_MAX_AGE + 60),
+    )
+    session.add(stored)
+    session.commit()
+    monkeypatch.setattr(query_service_module.settings, "PROMPT_HASH_LOOKUP_ENABLED", True)
+    with patch("api.src.core.query.services.query_service.make_openai_request") as mock_openai_request:
+        mock_openai_request.return_value = "Mount Everest."
+        response = client.post("/query", json=query_request.dict())
+        assert mock_openai_request.call_count == 1
+    assert response.json()["response"] == "Mount Everest."
+    session.delete(stored)
+    session.commit()
+
+def test_process_query_reused_answer_expires(client: TestClient, session: Session, new_user: User, monkeypatch: pytest.MonkeyPatch):
+    query_request = QueryRequest(query="Who wrote Hamlet?", model="text-davinci-003", user_id=new_user.id)
+    monkeypatch.setattr(query_service_module.settings, "PROMPT_HASH_LOOKUP_ENABLED", True)
+    with patch("api.src.core.query.services.query_service.make_openai_request") as mock_openai_request:
+        mock_openai_request.return_value = "Shakespeare."
+        answered = client.post("/query", json=query_request.dict()).json()
+        query_service_module.response_cache.clear()
+        reused = client.post("/query", json=query_request.dict()).json()
+        assert mock_openai_request.call_count == 1
+        assert reused["response"] == "Shakespeare."
+        # Move the model's answer past the maximum age; the copy stored by the reuse must not stand in for it
+        session.query(QueryResponse).filter_by(id=answered["query_id"]).update({"created_at": datetime.now(timezone.utc) - timedelta(seconds=settings.PROMPT_HASH_MAX_AGE + 60)})
+        session.commit()
+        query_service_module.response_cache.clear()
+        mock_openai_request.return_value = "William Shakespeare."
+        refreshed = client.post("/query", json=query_request.dict()).json()
+        assert mock_openai_request.call_count == 2
+    assert refreshed["response"] == "William Shakespeare."
+    session.query(QueryResponse).filter(QueryResponse.id.in_([answered["query_id"], reused["query_id"], refreshed["query_id"]])).delete(synchronize_session=False)
+    session.commit()
+
 def test_get_query_responses(client: TestClient, session: Session, new_query_response: QueryResponse):
     response = client.get("/query/responses")
     assert response.status_code == 200
-    assert len(response.json()) >= 1
-    assert any(query_response["id"] == new_query_response.id for query_response in response.json())
+    assert len(response.json()["items"]) >= 1
+    assert any(query_response["id"] == new_query_response.id for query_response in response.json()["items"])
 
 def test_get_query_responses_by_user_id(client: TestClient, session: Session, new_query_response: QueryResponse, new_user: User):
     response = client.get(f"/query/responses?user_id={new_user.id}")
     assert response.status_code == 200
-    assert len(response.json()) >= 1
-    assert any(query_response["id"] == new_query_response.id for query_response in response.json())
+    assert len(response.json()["items"]) >= 1
+    assert any(query_response["id"] == new_query_response.id for query_response in response.json()["items"])
+
+def test_get_query_responses_pages_by_cursor(client: TestClient, session: Session, new_user: User):
+    created = [
+        QueryResponse(user_id=new_user.id, query=f"Question {i}", model="text-davinci-003", response=f"Answer {i}")
+        for i in range(3)
+    ]
+    session.add_all(created)
+    session.commit()
+    seen, cursor = [], None
+    while True:
+        params = {"user_id": new_user.id, "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        page = client.get("/query/responses", params=params).json()
+        assert len(page["items"]) <= 2
+        seen.extend(query_response["id"] for query_response in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    created_ids = [query_response.id for query_response in created]
+    assert seen == sorted(set(seen))
+    assert [query_id for query_id in seen if query_id in created_ids] == created_ids
+    for query_response in created:
+        session.delete(query_response)
+    session.commit()
+
+def test_get_query_responses_summary_view(client: TestClient, session: Session, new_user: User):
+    long_answer = "word " * 1000
+    created = QueryResponse(user_id=new_user.id, query="Tell me a long story.", model="text-davinci-003", response=long_answer)
+    session.add(created)
+    session.commit()
+    full = client.get("/query/responses", params={"user_id": new_user.id}).json()
+    summary = client.get("/query/responses", params={"user_id": new_user.id, "view": "summary"}).json()
+    full_item = next(item for item in full["items"] if item["id"] == created.id)
+    summary_item = next(item for item in summary["items"] if item["id"] == created.id)
+    assert full_item["response"] == long_answer
+    assert "response" not in summary_item
+    assert summary_item["query"] == "Tell me a long story."
+    assert summary_item["response_preview"] == long_answer[:settings.SUMMARY_PREVIEW_CHARS]
+    assert summary["next_cursor"] == full["next_cursor"]
+    session.delete(created)
+    session.commit()
+
+def test_get_query_responses_invalid_view(client: TestClient):
+    response = client.get("/query/responses?view=everything")
+    assert response.status_code == 422
+
+def test_search_query_responses(client: TestClient, session: Session, new_user: User):
+    answers = {
+        "Where do cloves grow?": "Cloves grow on the islands of Zanzibar and Pemba.",
+        "What is a quokka?": "A quokka is a small marsupial; quokkas live on Rottnest Island.",
+        "Tell me about quokka habitats": "Quokka habitats include scrubland. The quokka is nocturnal and a quokka sleeps by day.",
+    }
+    with patch("api.src.core.query.services.query_service.make_openai_request", side_effect=lambda query, model, **kwargs: answers[query]):
+        query_ids = {
+            query: client.post("/query", json={"query": query, "model": "text-davinci-003", "user_id": new_user.id}).json()["query_id"]
+            for query in answers
+        }
+    headers = auth_headers(new_user)
+    response = client.get("/query/responses/search", params={"q": "zanzibar", "user_id": new_user.id}, headers=headers)
+    assert response.status_code == 200
+    [match] = response.json()["items"]
+    assert match["id"] == query_ids["Where do cloves grow?"]
+    assert "[Zanzibar]" in match["snippet"]
+    first = client.get("/query/responses/search", params={"q": "quokka", "user_id": new_user.id, "limit": 1}, headers=headers).json()
+    second = client.get("/query/responses/search", params={"q": "quokka", "limit": 1, "cursor": first["next_cursor"]}, headers=headers).json()
+    # The response mentioning quokkas most often ranks first
+    assert [item["id"] for item in first["items"] + second["items"]] == [query_ids["Tell me about quokka habitats"], query_ids["What is a quokka?"]]
+    assert first["items"][0]["rank"] >= second["items"][0]["rank"]
+    assert second["next_cursor"] is None
+    assert client.get("/query/responses/search", params={"q": "quokka zanzibar", "user_id": new_user.id}, headers=headers).json()["items"] == []
+    session.query(QueryResponse).filter(QueryResponse.id.in_(query_ids.values())).delete(synchronize_session=False)
+    session.commit()
+
+def test_search_query_responses_invalid_request(client: TestClient, new_user: User):
+    headers = auth_headers(new_user)
+    assert client.get("/query/responses/search", headers=headers).status_code == 422
+    assert client.get("/query/responses/search", params={"q": "paris", "cursor": "not-a-cursor"}, headers=headers).status_code == 400
+    # Query syntax characters are searched as text
+    assert client.get("/query/responses/search", params={"q": 'paris" OR (NEAR'}, headers=headers).status_code == 200
+
+def test_search_query_responses_requires_auth(client: TestClient, session: Session, new_user: User, monkeypatch: pytest.MonkeyPatch):
+    other = QueryResponse(user_id=new_user.id + 1, query="Where is Timbuktu?", model="text-davinci-003", response="Timbuktu is in Mali.")
+    session.add(other)
+    session.commit()
+    headers = auth_headers(new_user)
+    assert client.get("/query/responses/search", params={"q": "timbuktu"}).status_code == 401
+    assert client.get("/query/responses/search", params={"q": "timbuktu", "user_id": new_user.id + 1}, headers=headers).status_code == 403
+    # Without user_id a user only searches their own responses
+    assert client.get("/query/responses/search", params={"q": "timbuktu"}, headers=headers).json()["items"] == []
+    monkeypatch.setattr(auth_service.settings, "ADMIN_EMAILS", [new_user.email])
+    assert [item["id"] for item in client.get("/query/responses/search", params={"q": "timbuktu"}, headers=headers).json()["items"]] == [other.id]
+    session.delete(other)
+    session.commit()
+
+def test_get_query_responses_invalid_cursor(client: TestClient):
+    response = client.get("/query/responses?cursor=not-a-cursor")
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
+
+def test_export_query_responses_ndjson(client: TestClient, session: Session, new_user: User, new_query_response: QueryResponse, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(auth_service.settings, "ADMIN_EMAILS", [new_user.email])
+    response = client.get(f"/query/responses/export?user_id={new_query_response.user_id}", headers=auth_headers(new_user))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert all(row["user_id"] == new_query_response.user_id for row in rows)
+    assert any(row["id"] == new_query_response.id and row["response"] == new_query_response.response for row in rows)
+
+def test_export_query_responses_csv(client: TestClient, session: Session, new_user: User, new_query_response: QueryResponse, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(auth_service.settings, "ADMIN_EMAILS", [new_user.email])
+    response = client.get(f"/query/responses/export?format=csv&user_id={new_query_response.user_id}", headers=auth_headers(new_user))
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines[0] == "id,user_id,model,query,response,created_at"
+    assert any(line.startswith(f"{new_query_response.id},") for line in lines[1:])
+
+def test_export_query_responses_requires_auth(client: TestClient, session: Session, new_user: User):
+    other = QueryResponse(user_id=new_user.id + 1, query="Secret question", model="text-davinci-003", response="Secret answer.")
+    own = QueryResponse(user_id=new_user.id, query="My question", model="text-davinci-003", response="My answer.")
+    session.add_all([other, own])
+    session.commit()
+    headers = auth_headers(new_user)
+    assert client.get("/query/responses/export").status_code == 401
+    assert client.get(f"/query/responses/export?user_id={new_user.id + 1}", headers=headers).status_code == 403
+    # Without user_id a user only exports their own responses
+    rows = [json.loads(line) for line in client.get("/query/responses/export", headers=headers).text.splitlines()]
+    assert {row["user_id"] for row in rows} == {new_user.id}
+    assert own.id in [row["id"] for row in rows]
+    session.delete(other)
+    session.delete(own)
+    session.commit()
 
 def test_get_query_response_by_id(client: TestClient, session: Session, new_query_response: QueryResponse):
     response = client.get(f"/query/responses/{new_query_response.id}")
@@ -0,0 +1,106 @@
+# Specify version and import
+import asyncio  #  No specific version required
+import pytest  # Version: 8.3.3
+from api.src.config.settings import Settings  # Version: 2.9.2
+from api.src.core.utils.resilience import ResilientCaller  # Version: 2.9.2
+from api.src.core.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker  # Version: 2.9.2
+from api.src.core.exceptions.base_exception import CircuitOpenError  # Version: 2.9.2
+
+def make_caller(**overrides) -> ResilientCaller:
+    options = {"LLM_MAX_RETRIES": 2, "LLM_RETRY_BACKOFF_BASE": 0.001, "LLM_ATTEMPT_TIMEOUT": 1.0}
+    options.update(overrides)
+    return ResilientCaller(Settings(**options))
+
+# Test that retryable failures are retried until an attempt succeeds
+def test_call_retries_transient_failures():
+    caller = make_caller()
+    outcomes = [asyncio.TimeoutError(), asyncio.TimeoutError(), "ok"]
+
+    async def attempt():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    assert asyncio.run(caller.call("text-davinci-003", attempt)) == "ok"
+    assert caller.stats()["retries"] == 2
+
+# Test that non-retryable errors are raised immediately
+def test_call_does_not_retry_other_errors():
+    caller = make_caller()
+    attempts = 0
+
+    async def attempt():
+        nonlocal attempts
+        attempts += 1
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(caller.call("text-davinci-003", attempt))
+    assert attempts == 1
+
+# Test that a slow attempt is cut off by the per-attempt timeout and retried
+def test_call_attempt_timeout():
+    caller = make_caller(LLM_MAX_RETRIES=1, LLM_ATTEMPT_TIMEOUT=0.05)
+    delays = [1.0, 0.0]
+
+    async def attempt():
+        await asyncio.sleep(delays.pop(0))
+        return "ok"
+
+    assert asyncio.run(caller.call("text-davinci-003", attempt)) == "ok"
+    assert caller.stats()["timeouts"] == 1
+
+# Test that a hedge is sent once an attempt passes the latency percentile
+def test_call_hedges_slow_attempt():
+    caller = make_caller(LLM_HEDGE_ENABLED=True, LLM_HEDGE_MIN_SAMPLES=5)
+    delays = [0.01] * 5 + [0.5, 0.01]
+
+    async def attempt():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    async def run():
+        for _ in range(5):
+            await caller.call("text-davinci-003", attempt)
+        return await caller.call("text-davinci-003", attempt)
+
+    assert asyncio.run(run()) == 0.01
+    assert caller.stats()["hedges"] == 1
+    assert caller.stats()["hedge_wins"] == 1
+
+class FakeTimer:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+# Test that consecutive failures open the circuit and calls are refused
+def test_circuit_breaker_opens():
+    breaker = CircuitBreaker("text-davinci-003", failure_threshold=2, recovery_timeout=30, timer=FakeTimer())
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.stats()["rejected"] == 1
+
+# Test the half-open probe after the recovery timeout
+def test_circuit_breaker_half_open_probe():
+    timer = FakeTimer()
+    breaker = CircuitBreaker("text-davinci-003", failure_threshold=1, recovery_timeout=30, timer=timer)
+    breaker.record_failure()
+    timer.now = 30
+    assert breaker.state == HALF_OPEN
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    timer.now = 60
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
@@ -0,0 +1,67 @@
+# Specify version and import
+import asyncio  #  No specific version required
+from sqlalchemy import delete, func, select, text  # Version: 2.0.36
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # Version: 2.0.36
+from api.src.core.db.models import Base, QueryResponse, User  # Version: 2.0.36
+from api.src.core.db.models.response_body_model import ResponseBody  # Version: 2.0.36
+from api.src.core.db.utils import db_utils  # Version: 2.9.2
+from api.src.core.db.utils.response_bodies import body_hash, collect_response_bodies  # Version: 2.9.2
+from api.src.core.query.schemas import QueryRequest  # Version: 2.9.2
+
+# Test that identical responses share one stored body and still read back through the model
+def test_identical_responses_share_a_body(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            user = User(email="bodies@example.com", hashed_password="testpassword")
+            db.add(user)
+            await db.commit()
+            query_request = QueryRequest(query="What is the capital of France?", model="text-davinci-003", user_id=user.id)
+            first = await db_utils.create_query_response(db, query_request, "Paris")
+            await db_utils.create_query_responses(db, [(query_request, "Paris", None), (query_request, "Paris, France", None)])
+            # Written directly through the ORM: the text stays inline
+            db.add(QueryResponse(user_id=user.id, query="Hello", model="text-davinci-003", response="Hi"))
+            await db.commit()
+        async with Session() as db:
+            listed = await db_utils.get_query_responses(db, user_id=user.id)
+            fetched = await db_utils.get_query_response(db, first.id)
+            bodies = (await db.execute(select(func.count()).select_from(ResponseBody))).scalar()
+            inline = (await db.execute(text("SELECT response, response_hash FROM query_responses WHERE response IS NOT NULL"))).all()
+        await engine.dispose()
+        return first, listed, fetched, bodies, inline
+
+    first, listed, fetched, bodies, inline = asyncio.run(run())
+    assert first.response_hash == body_hash("Paris")
+    assert [query_response.response for query_response in listed] == ["Paris", "Paris", "Paris, France", "Hi"]
+    assert fetched.response == "Paris"
+    assert bodies == 2
+    assert [tuple(row) for row in inline] == [("Hi", None)]
+
+# Test that only bodies no row points at, and unused for the grace period, are collected
+def test_collect_response_bodies(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            user = User(email="collect@example.com", hashed_password="testpassword")
+            db.add(user)
+            await db.commit()
+            query_request = QueryRequest(query="What is the capital of France?", model="text-davinci-003", user_id=user.id)
+            await db_utils.create_query_responses(db, [(query_request, "Paris", None), (query_request, "Lyon", None)])
+            await db.execute(delete(QueryResponse).where(QueryResponse.response_hash == body_hash("Lyon")))
+            await db.commit()
+            kept_by_grace = await collect_response_bodies(db, batch_size=1, grace_seconds=3600)
+            collected = await collect_response_bodies(db, batch_size=1, grace_seconds=-1)
+            remaining = (await db.execute(select(ResponseBody.hash))).scalars().all()
+        await engine.dispose()
+        return kept_by_grace, collected, remaining
+
+    kept_by_grace, collected, remaining = asyncio.run(run())
+    assert kept_by_grace == 0
+    assert collected == 1
+    assert remaining == [body_hash("Paris")]
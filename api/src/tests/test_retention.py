@@ -0,0 +1,76 @@
+# Specify version and import
+import asyncio  #  No specific version required
+from datetime import date, datetime, timedelta, timezone  #  No specific version required
+import json  #  No specific version required
+from sqlalchemy import select, text  # Version: 2.0.36
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # Version: 2.0.36
+from api.src.core.db.models import Base, QueryResponse, User  # Version: 2.0.36
+from api.src.core.db.utils.retention import ResponseArchive, RetentionJob  # Version: 2.9.2
+from api.src.core.db.utils.search import index_query_responses  # Version: 2.9.2
+
+# Test that appended batches are read back per day, filtered by user and without repeated IDs
+def test_archive_append_and_read(tmp_path):
+    archive = ResponseArchive(str(tmp_path / "archive"))
+    day = datetime(2024, 1, 1, 12, tzinfo=timezone.utc)
+    rows = [
+        {"id": 1, "user_id": 1, "response": "First", "created_at": day},
+        {"id": 2, "user_id": 2, "response": "Second", "created_at": day},
+        {"id": 3, "user_id": 1, "response": "Next day", "created_at": day + timedelta(days=1)},
+    ]
+    archive.append(rows)
+    # A batch archived twice, e.g. after its delete failed
+    archive.append(rows[:1])
+    assert [entry["day"] for entry in archive.days()] == ["2024-01-01", "2024-01-02"]
+    assert [json.loads(line)["id"] for line in archive.read(date(2024, 1, 1))] == [1, 2]
+    assert [json.loads(line)["response"] for line in archive.read(date(2024, 1, 1), user_id=2)] == ["Second"]
+    assert list(archive.read(date(2023, 1, 1))) == []
+
+# Test that expired rows are archived and deleted in batches, honouring per-user periods
+def test_retention_job_prunes_expired_rows(tmp_path):
+    now = datetime.now(timezone.utc)
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            users = [User(email=f"retention{i}@example.com", hashed_password="testpassword") for i in range(3)]
+            db.add_all(users)
+            await db.commit()
+            rows = [
+                QueryResponse(user_id=user.id, query=f"Question {age}", model="text-davinci-003", response=f"Answer {age}", created_at=now - timedelta(days=age))
+                for user in users
+                for age in (1, 10, 40, 100)
+            ]
+            db.add_all(rows)
+            await db.flush()
+            await index_query_responses(db, rows)
+            await db.commit()
+        # Everyone keeps 30 days; the second user 60 days and the third forever.
+        job = RetentionJob(Session, days=30, user_days={users[1].id: 60, users[2].id: 0}, batch_size=1, interval_seconds=3600, pause_ms=0, archive=ResponseArchive(str(tmp_path / "archive")))
+        deleted = await job.run_once()
+        again = await job.run_once()
+        async with Session() as db:
+            remaining = (await db.execute(select(QueryResponse.user_id, QueryResponse.query).order_by(QueryResponse.id))).all()
+            indexed = (await db.execute(text("SELECT count(*) FROM query_responses_fts"))).scalar()
+        await engine.dispose()
+        return users, job, deleted, again, remaining, indexed
+
+    users, job, deleted, again, remaining, indexed = asyncio.run(run())
+    assert deleted == 3 and again == 0
+    assert [tuple(row) for row in remaining] == [
+        (users[0].id, "Question 1"), (users[0].id, "Question 10"),
+        (users[1].id, "Question 1"), (users[1].id, "Question 10"), (users[1].id, "Question 40"),
+        (users[2].id, "Question 1"), (users[2].id, "Question 10"), (users[2].id, "Question 40"), (users[2].id, "Question 100"),
+    ]
+    assert indexed == len(remaining)
+    archived = [json.loads(line) for entry in job.archive.days() for line in job.archive.read(date.fromisoformat(entry["day"]))]
+    assert sorted((row["user_id"], row["response"]) for row in archived) == [(users[0].id, "Answer 100"), (users[0].id, "Answer 40"), (users[1].id, "Answer 100")]
+    assert job.stats()["deleted"] == 3 and job.stats()["archived"] == 3
+
+# Test that nothing expires without a retention period
+def test_retention_job_disabled_by_default():
+    job = RetentionJob(None, days=0, user_days={1: 0}, batch_size=100, interval_seconds=3600, pause_ms=0)
+    assert not job.enabled
+    assert job.conditions(datetime.now(timezone.utc)) == []
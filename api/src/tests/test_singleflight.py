@@ -0,0 +1,53 @@
+# Specify version and import
+import asyncio  #  No specific version required
+import pytest  # Version: 8.3.3
+from api.src.core.utils.singleflight import SingleFlight  # Version: 2.9.2
+
+# Test that concurrent callers with the same key share one call
+def test_do_coalesces():
+    calls = 0
+
+    async def fetch():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        flight = SingleFlight()
+        results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(5)))
+        return flight, results
+
+    flight, results = asyncio.run(run())
+    assert results == ["result"] * 5
+    assert calls == 1
+    assert flight.stats() == {"calls": 1, "coalesced": 4, "in_flight": 0}
+
+# Test that a failure reaches every waiter
+def test_do_propagates_failure():
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError("upstream failed")
+
+    async def run():
+        flight = SingleFlight()
+        return await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in results)
+
+# Test that a cancelled waiter does not cancel the shared call
+def test_do_cancelled_waiter():
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def run():
+        flight = SingleFlight()
+        first = asyncio.ensure_future(flight.do("key", fetch))
+        second = asyncio.ensure_future(flight.do("key", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(run()) == ("result", True)
@@ -0,0 +1,81 @@
+# Specify version and import
+import asyncio  #  No specific version required
+from datetime import datetime, timedelta, timezone  #  No specific version required
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # Version: 2.0.36
+from fastapi.testclient import TestClient  # Version: 0.115.2
+from unittest.mock import patch  # Version: 3.11.1
+from api.src.core.auth.services.auth_service import create_access_token  # Version: 0.115.2
+from api.src.core.db.models import Base, User  # Version: 2.0.36
+from api.src.core.db.utils import db_utils  # Version: 2.9.2
+from api.src.core.db.utils.usage import get_usage  # Version: 2.9.2
+from api.src.core.db.utils.write_behind import insert_query_responses  # Version: 2.9.2
+from api.src.core.query.schemas import QueryRequest  # Version: 2.9.2
+from api.src.core.utils.token_utils import count_tokens  # Version: 2.9.2
+from api.src.tests.conftest import client, session, new_user  # Version: 2.9.2
+
+# Test that token counts are 0 for empty text and grow with the text
+def test_count_tokens():
+    assert count_tokens("", "text-davinci-003") == 0
+    assert 0 < count_tokens("Paris", "text-davinci-003") < count_tokens("Paris is the capital of France. " * 10, "text-davinci-003")
+
+# Test that single, batch and write-behind inserts all add to the per-day usage aggregates
+def test_usage_recorded_on_every_write_path(tmp_path):
+    yesterday = datetime.now(timezone.utc) - timedelta(days=1)
+
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            user = User(email="usage@example.com", hashed_password="testpassword")
+            db.add(user)
+            await db.commit()
+            davinci = QueryRequest(query="What is the capital of France?", model="text-davinci-003", user_id=user.id)
+            curie = QueryRequest(query="What is the capital of Spain?", model="text-curie-001", user_id=user.id)
+            await db_utils.create_query_response(db, davinci, "Paris")
+            await db_utils.create_query_responses(db, [(davinci, "Paris", None), (curie, "Madrid", None)])
+            # A write-behind batch written late, timestamped the day before
+            rows = [db_utils._new_query_response_row(curie, "Madrid", None) for _ in range(2)]
+            for row in rows:
+                row["created_at"] = row["updated_at"] = yesterday
+            with patch("api.src.core.db.utils.write_behind.AsyncSessionLocal", Session):
+                await insert_query_responses(rows)
+        async with Session() as db:
+            usage = await get_usage(db, user.id)
+            today_only = await get_usage(db, user.id, since=datetime.now(timezone.utc).date())
+        await engine.dispose()
+        return usage, today_only
+
+    usage, today_only = asyncio.run(run())
+    today = datetime.now(timezone.utc).date()
+    assert [(row.day, row.model, row.queries) for row in usage] == [
+        (yesterday.date(), "text-curie-001", 2),
+        (today, "text-curie-001", 1),
+        (today, "text-davinci-003", 2),
+    ]
+    davinci = usage[2]
+    assert davinci.prompt_tokens == 2 * count_tokens("What is the capital of France?", "text-davinci-003")
+    assert davinci.completion_tokens == 2 * count_tokens("Paris", "text-davinci-003")
+    assert [row.model for row in today_only] == ["text-curie-001", "text-davinci-003"]
+
+# Test that GET /usage reports the counters of the responses a user stored, and only to that user
+def test_get_usage_endpoint(client: TestClient, new_user: User):
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': new_user.email})}"}
+    answers = {"What is the capital of France?": "Paris", "What is the capital of Italy?": "Rome"}
+    with patch("api.src.core.query.services.query_service.make_openai_request", side_effect=lambda query, model, **kwargs: answers[query]):
+        for query in answers:
+            response = client.post("/query", json={"query": query, "model": "text-davinci-003", "user_id": new_user.id}, headers=headers)
+            assert response.status_code == 200
+    today = datetime.now(timezone.utc).date()
+    response = client.get("/usage", params={"user_id": new_user.id, "since": today.isoformat()}, headers=headers)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["user_id"] == new_user.id
+    assert report["queries"] == 2
+    assert report["prompt_tokens"] == sum(count_tokens(query, "text-davinci-003") for query in answers)
+    assert report["completion_tokens"] == sum(count_tokens(answer, "text-davinci-003") for answer in answers.values())
+    assert [(day["day"], day["model"], day["queries"]) for day in report["days"]] == [(today.isoformat(), "text-davinci-003", 2)]
+    assert client.get("/usage", params={"user_id": new_user.id, "model": "text-curie-001"}, headers=headers).json()["queries"] == 0
+    assert client.get("/usage", params={"user_id": new_user.id}).status_code == 401
+    assert client.get("/usage", params={"user_id": new_user.id + 1}, headers=headers).status_code == 403
@@ -0,0 +1,191 @@
+# Specify version and import
+import asyncio  #  No specific version required
+import pytest  # Version: 8.3.3
+from api.src.core.db.utils.id_utils import IdGenerator, default_worker_id, require_worker_id  # Version: 2.9.2
+from api.src.core.db.utils.write_behind import DeadLetterFile, WriteBehindQueue  # Version: 2.9.2
+
+class FakeTable:
+    def __init__(self, failures: int = 0, bad_ids=()):
+        self.batches = []
+        self.failures = failures
+        self.bad_ids = set(bad_ids)
+
+    async def insert(self, rows):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("database unavailable")
+        if any(row["id"] in self.bad_ids for row in rows):
+            raise RuntimeError("foreign key violation")
+        self.batches.append([row["id"] for row in rows])
+
+# Test that IDs are unique, increasing and carry the worker ID
+def test_id_generator_is_monotonic_and_unique():
+    generator = IdGenerator(worker_id=7)
+    ids = [generator.next_id() for _ in range(10000)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert all((query_id >> 12) & 0x3FF == 7 for query_id in ids)
+    assert ids[-1] < 2 ** 63
+
+# Test that a configured worker ID is used as is, and that write-behind cannot start without one
+def test_worker_id_configuration():
+    assert default_worker_id(5) == 5
+    assert 0 <= default_worker_id() <= 1023
+    require_worker_id(0)
+    with pytest.raises(RuntimeError):
+        require_worker_id(None)
+
+# Test that reaching the batch size triggers one multi-row flush
+def test_flushes_on_batch_size():
+    table = FakeTable()
+
+    async def run():
+        queue = WriteBehindQueue(table.insert, batch_size=3, flush_interval_ms=10000, max_queue=100)
+        await queue.start()
+        for query_id in range(3):
+            assert queue.enqueue({"id": query_id})
+        assert queue.pending(1) == {"id": 1}
+        await asyncio.sleep(0.05)
+        flushed = list(table.batches)
+        await queue.stop()
+        return queue, flushed
+
+    queue, flushed = asyncio.run(run())
+    assert flushed == [[0, 1, 2]]
+    assert queue.pending(1) is None
+
+# Test that rows below the batch size are flushed after the interval
+def test_flushes_on_interval():
+    table = FakeTable()
+
+    async def run():
+        queue = WriteBehindQueue(table.insert, batch_size=100, flush_interval_ms=20, max_queue=100)
+        await queue.start()
+        queue.enqueue({"id": 1})
+        await asyncio.sleep(0.1)
+        flushed = list(table.batches)
+        await queue.stop()
+        return flushed
+
+    assert asyncio.run(run()) == [[1]]
+
+# Test that a failed batch is retried and that stop drains every queued row
+def test_failed_batch_is_retried_and_drained_on_stop():
+    table = FakeTable(failures=1)
+
+    async def run():
+        queue = WriteBehindQueue(table.insert, batch_size=2, flush_interval_ms=10000, max_queue=100)
+        await queue.start()
+        for query_id in range(5):
+            queue.enqueue({"id": query_id})
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(run())
+    assert [query_id for batch in table.batches for query_id in batch] == [0, 1, 2, 3, 4]
+    assert queue.stats()["failures"] == 1
+    assert queue.stats()["depth"] == 0
+
+# Test that the queue refuses rows when full or not running so callers write them directly
+def test_enqueue_refused_when_full_or_stopped():
+    table = FakeTable()
+    queue = WriteBehindQueue(table.insert, batch_size=10, flush_interval_ms=10000, max_queue=1)
+    assert not queue.enqueue({"id": 1})
+
+    async def run():
+        await queue.start()
+        accepted = [queue.enqueue({"id": 1}), queue.enqueue({"id": 2})]
+        await queue.stop()
+        return accepted
+
+    assert asyncio.run(run()) == [True, False]
+    assert queue.stats()["rejected"] == 2
+
+# Test that a row that can never be inserted is dead-lettered without holding up the rows behind it
+def test_failing_row_is_dead_lettered(tmp_path):
+    table = FakeTable(bad_ids={2})
+    dead_letter = DeadLetterFile(str(tmp_path / "dead_letter.ndjson"))
+
+    async def run():
+        queue = WriteBehindQueue(table.insert, batch_size=3, flush_interval_ms=10000, max_queue=100, dead_letter=dead_letter, max_attempts=1)
+        await queue.start()
+        for query_id in range(6):
+            queue.enqueue({"id": query_id})
+        await asyncio.sleep(0.05)
+        stats = queue.stats()
+        await queue.stop()
+        return queue, stats
+
+    queue, stats = asyncio.run(run())
+    assert sorted(query_id for batch in table.batches for query_id in batch) == [0, 1, 3, 4, 5]
+    assert stats["depth"] == 0
+    assert stats["dead_lettered"] == 1
+    assert queue.pending(2) is None
+    [entry] = dead_letter.read()
+    assert entry["row"] == {"id": 2}
+    assert entry["error"] == "foreign key violation"
+
+# Test that a row failing on its own is kept for later flushes, then dead-lettered after max_attempts
+def test_row_dead_lettered_after_max_attempts(tmp_path):
+    table = FakeTable(bad_ids={7})
+    dead_letter = DeadLetterFile(str(tmp_path / "dead_letter.ndjson"))
+
+    async def run():
+        queue = WriteBehindQueue(table.insert, batch_size=10, flush_interval_ms=10000, max_queue=100, dead_letter=dead_letter, max_attempts=3)
+        # Not started, so the flushes below are the only ones; each has a good row for the bad one to fail next to
+        queue._rows.append({"id": 7})
+        results = []
+        for query_id in range(3):
+            queue._rows.append({"id": 100 + query_id})
+            results.append(await queue.flush())
+        return queue, results
+
+    queue, results = asyncio.run(run())
+    assert results == [False, False, True]
+    assert [query_id for batch in table.batches for query_id in batch] == [100, 101, 102]
+    assert queue.stats()["depth"] == 0
+    assert [entry["row"]["id"] for entry in dead_letter.read()] == [7]
+
+# Test that nothing is dead-lettered while the database is down, and everything is written once it recovers
+def test_outage_keeps_rows_queued(tmp_path):
+    table = FakeTable(failures=10 ** 6)
+    dead_letter = DeadLetterFile(str(tmp_path / "dead_letter.ndjson"))
+
+    async def run():
+        queue = WriteBehindQueue(table.insert, batch_size=4, flush_interval_ms=10000, max_queue=100, dead_letter=dead_letter, max_attempts=2)
+        for query_id in range(10):
+            queue._rows.append({"id": query_id})
+        during = [await queue.flush() for _ in range(12)]
+        depth = queue.stats()["depth"]
+        table.failures = 0
+        after = await queue.flush()
+        return queue, during, depth, after
+
+    queue, during, depth, after = asyncio.run(run())
+    assert during == [False] * 12
+    assert depth == 10
+    assert after
+    assert [query_id for batch in table.batches for query_id in batch] == list(range(10))
+    assert queue.stats()["dead_lettered"] == 0
+    assert dead_letter.read() == []
+
+# Test that rows still queued when the database is down at shutdown are written to the dead letter
+def test_stop_dead_letters_rows_when_database_down(tmp_path):
+    table = FakeTable(failures=1000)
+    dead_letter = DeadLetterFile(str(tmp_path / "dead_letter.ndjson"))
+
+    async def run():
+        queue = WriteBehindQueue(table.insert, batch_size=10, flush_interval_ms=1, max_queue=100, dead_letter=dead_letter, max_attempts=100)
+        await queue.start()
+        for query_id in range(4):
+            queue.enqueue({"id": query_id})
+        await queue.stop()
+        return queue
+
+    queue = asyncio.run(run())
+    assert table.batches == []
+    assert queue.stats()["depth"] == 0
+    assert queue.stats()["dead_lettered"] == 4
+    entries = dead_letter.read()
+    assert [entry["row"]["id"] for entry in entries] == [0, 1, 2, 3]
+    assert all(entry["error"].startswith("not written before shutdown") for entry in entries)